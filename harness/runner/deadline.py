@@ -0,0 +1,41 @@
+"""End-to-end deadline for one agent investigation.
+
+``AGENT_TIMEOUT`` used to be a per-request httpx timeout, so every model
+round and tool call could take the whole budget. A ``Deadline`` is created
+once per investigation and threaded through the agent loop and the tool
+calls. Each stage sizes its timeout from what is left. Tool calls forward the
+remainder to the tools server as ``X-Request-Deadline-Ms``, and the tools
+server shrinks its backend timeouts to fit.
+"""
+
+import time
+from typing import Optional
+
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+
+
+class Deadline:
+    """An absolute point in time, measured on the monotonic clock."""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self._expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left (0 once passed)."""
+        return max(self._expires - time.monotonic(), 0.0)
+
+    def elapsed(self) -> float:
+        return self.budget - (self._expires - time.monotonic())
+
+    def timeout(self, cap: Optional[float] = None, reserve: float = 0.0) -> float:
+        """Time a stage may use: what is left minus ``reserve``, at most ``cap``.
+
+        Zero means the stage should not start.
+        """
+        left = max(self.remaining() - reserve, 0.0)
+        return left if cap is None else min(cap, left)
+
+    def headers(self, cap: Optional[float] = None, reserve: float = 0.0) -> dict:
+        """The budget a downstream service gets (as ``timeout``), in its request header."""
+        return {DEADLINE_HEADER: str(int(self.timeout(cap, reserve) * 1000))}
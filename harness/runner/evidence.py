@@ -1,8 +1,11 @@
 """Evidence collection — gathers telemetry from the tools server and K8s API."""
 
+import asyncio
 import logging
 import os
+import time
 from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
 
 import httpx
 
@@ -13,6 +16,10 @@ TOOLS_SERVER_URL = os.environ.get(
     "http://aiops-tools-server.aiops-harness.svc:8000",
 )
 
+# Tool-by-tool fallback: concurrent calls in flight, and a per-call deadline
+EVIDENCE_CONCURRENCY = int(os.environ.get("EVIDENCE_CONCURRENCY", "6"))
+EVIDENCE_QUERY_TIMEOUT = float(os.environ.get("EVIDENCE_QUERY_TIMEOUT_SECONDS", "20"))
+
 
 async def collect_evidence(
     namespace: str,
@@ -23,65 +30,109 @@ async def collect_evidence(
 ) -> dict:
     """Collect evidence from Prometheus and K8s events during the fault window.
 
-    Returns an evidence bundle with metric summaries and event lists.
+    Returns an evidence bundle with metric summaries and event lists. One
+    /tools/evidencePack call gathers everything server-side; tools servers
+    without that endpoint are queried tool by tool instead.
     """
-    evidence = {
-        "collection_time": datetime.now(timezone.utc).isoformat(),
-        "window": {"start": start_time, "end": end_time},
-        "metrics": {},
-        "events": [],
-        "logs": [],
-    }
-
     async with httpx.AsyncClient(timeout=30.0) as client:
-        # Collect CPU metrics
-        evidence["metrics"]["cpu"] = await _query_metric(
-            client,
-            f'rate(container_cpu_usage_seconds_total{{namespace="{namespace}", '
-            f'pod=~"{deployment_name}.*"}}[5m])',
-            start_time, end_time,
-        )
-
-        # Collect memory metrics
-        evidence["metrics"]["memory"] = await _query_metric(
-            client,
-            f'container_memory_working_set_bytes{{namespace="{namespace}", '
-            f'pod=~"{deployment_name}.*"}}',
-            start_time, end_time,
+        try:
+            resp = await client.post(
+                f"{TOOLS_SERVER_URL}/tools/evidencePack",
+                json={
+                    "namespace": namespace,
+                    "target": deployment_name,
+                    "start": start_time,
+                    "end": end_time,
+                    "fault_type": fault_type,
+                    "events_since_minutes": 15,
+                },
+            )
+            resp.raise_for_status()
+            pack = resp.json()
+            pack.pop("tool", None)
+            log.info(f"Evidence pack collected in {pack.get('timings_ms', {}).get('total')} ms")
+            return pack
+        except Exception as e:
+            log.warning(f"Evidence pack unavailable, querying tools individually: {e}")
+
+        return await _collect_evidence_per_tool(
+            client, namespace, deployment_name, start_time, end_time, fault_type
         )
 
-        # Collect restart count
-        evidence["metrics"]["restarts"] = await _query_metric(
-            client,
-            f'kube_pod_container_status_restarts_total{{namespace="{namespace}", '
-            f'pod=~"{deployment_name}.*"}}',
-            start_time, end_time,
-        )
 
-        # Collect pod status
-        evidence["metrics"]["pod_status"] = await _query_metric(
-            client,
-            f'kube_pod_status_phase{{namespace="{namespace}", '
-            f'pod=~"{deployment_name}.*"}}',
-            start_time, end_time,
-        )
+async def _gather_bounded(calls: dict[str, tuple[Awaitable[Any], Callable[[str], Any]]]) -> tuple[dict, dict]:
+    """Await named calls concurrently, at most EVIDENCE_CONCURRENCY at a time.
 
-        # Collect container waiting reasons (for CrashLoopBackOff)
-        if fault_type == "crashloop_bad_config":
-            evidence["metrics"]["waiting_reason"] = await _query_metric(
-                client,
-                f'kube_pod_container_status_waiting_reason{{namespace="{namespace}", '
-                f'pod=~"{deployment_name}.*"}}',
-                start_time, end_time,
-            )
+    Each call gets EVIDENCE_QUERY_TIMEOUT seconds; one that overruns yields
+    ``on_timeout(message)`` instead of holding up the bundle. Returns the
+    results and per-call timings in ms (plus the whole gather as "total").
+    """
+    sem = asyncio.Semaphore(EVIDENCE_CONCURRENCY)
+    timings: dict[str, float] = {}
+
+    async def run(name: str, coro: Awaitable[Any], on_timeout: Callable[[str], Any]) -> Any:
+        async with sem:
+            start = time.perf_counter()
+            try:
+                return await asyncio.wait_for(coro, timeout=EVIDENCE_QUERY_TIMEOUT)
+            except asyncio.TimeoutError:
+                log.warning(f"Evidence query {name} timed out after {EVIDENCE_QUERY_TIMEOUT:g}s")
+                return on_timeout(f"timed out after {EVIDENCE_QUERY_TIMEOUT:g}s")
+            finally:
+                timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run(name, coro, on_timeout) for name, (coro, on_timeout) in calls.items()))
+    timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+    return dict(zip(calls, results)), timings
+
+
+async def _collect_evidence_per_tool(
+    client: httpx.AsyncClient,
+    namespace: str,
+    deployment_name: str,
+    start_time: str,
+    end_time: str,
+    fault_type: str,
+) -> dict:
+    """One tools-server call per signal (for tools servers without /tools/evidencePack).
 
-        # Collect K8s events
-        evidence["events"] = await _get_events(client, namespace, since_minutes=15)
+    The calls run concurrently, so collection takes about as long as the
+    slowest query rather than the sum of all of them.
+    """
+    pod = f'namespace="{namespace}", pod=~"{deployment_name}.*"'
+    metric_queries = {
+        "cpu": f"rate(container_cpu_usage_seconds_total{{{pod}}}[5m])",
+        "memory": f"container_memory_working_set_bytes{{{pod}}}",
+        "restarts": f"kube_pod_container_status_restarts_total{{{pod}}}",
+        "pod_status": f"kube_pod_status_phase{{{pod}}}",
+    }
+    # Fault-specific signals, the same as the tools server's evidence_pack.FAULT_QUERIES
+    if fault_type == "crashloop_bad_config":
+        # Container waiting reasons (for CrashLoopBackOff)
+        metric_queries["waiting_reason"] = f"kube_pod_container_status_waiting_reason{{{pod}}}"
+    elif fault_type == "cpu_saturation":
+        metric_queries["cpu_throttling"] = f"rate(container_cpu_cfs_throttled_periods_total{{{pod}}}[5m])"
+
+    calls = {
+        f"metrics.{key}": (_query_metric(client, query, start_time, end_time), lambda e: {"error": e})
+        for key, query in metric_queries.items()
+    }
+    calls["events"] = (_get_events(client, namespace, since_minutes=15), lambda e: [{"error": e}])
+    calls["logs"] = (_get_logs(client, namespace, deployment_name), lambda e: [{"error": e}])
 
-        # Collect logs (best effort)
-        evidence["logs"] = await _get_logs(client, namespace, deployment_name)
+    collection_time = datetime.now(timezone.utc).isoformat()
+    results, timings = await _gather_bounded(calls)
+    log.info(f"Evidence collected tool by tool in {timings['total']} ms")
 
-    return evidence
+    return {
+        "collection_time": collection_time,
+        "window": {"start": start_time, "end": end_time},
+        "metrics": {key: results[f"metrics.{key}"] for key in metric_queries},
+        "events": results["events"],
+        "logs": results["logs"],
+        "timings_ms": timings,
+    }
 
 
 async def _query_metric(client: httpx.AsyncClient, query: str, start: str, end: str) -> dict:
@@ -89,7 +140,7 @@ async def _query_metric(client: httpx.AsyncClient, query: str, start: str, end:
     try:
         resp = await client.post(
             f"{TOOLS_SERVER_URL}/tools/getMetricHistory",
-            json={"query": query, "start": start, "end": end, "step": "30s"},
+            json={"query": query, "start": start, "end": end},
         )
         resp.raise_for_status()
         return resp.json().get("result", {})
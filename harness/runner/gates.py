@@ -0,0 +1,202 @@
+"""Phase gates — readiness predicates that end a harness wait as soon as they hold.
+
+The baseline and fault-propagation phases used to be fixed sleeps. A gate
+instead names the signals that mean the phase is done. For example, "CPU has
+been stable for a few samples" for the baseline, or "a target pod is in
+CrashLoopBackOff" for the fault. The runner polls the gate until it holds or
+the phase's deadline (``timing.baselineSeconds`` /
+``timing.injectionWaitSeconds``) runs out.
+
+Gates are set per manifest under ``spec.timing.gates``:
+
+    timing:
+      baselineSeconds: 60          # deadline, not a fixed wait
+      injectionWaitSeconds: 120
+      pollSeconds: 5
+      gates:
+        baseline:
+          all:
+            - series: cpu
+              stddevBelow: 0.05    # per pod, over the last `samples` samples
+              samples: 3
+        fault:
+          any:
+            - series: cpu
+              above: 0.25          # some target pod's latest sample
+            - eventReason: BackOff # event on a target pod
+            - series: p99_latency  # custom series: give its query
+              query: 'histogram_quantile(0.99, sum by (pod, le) (rate(..._bucket{{selector}}[1m])))'
+              above: 0.5
+
+``{selector}`` in a query is replaced by the target's namespace/pod matchers
+(so ``metric{{selector}}`` selects the target's pods).
+Gates missing from the manifest fall back to DEFAULT_BASELINE_GATE and
+DEFAULT_FAULT_GATES. Dependency-free,
+so the benchmark scripts use the same predicates.
+"""
+
+import statistics
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# Instant PromQL for the built-in series; {selector} is the target's namespace/pod matcher.
+# Short rate windows so a change is visible within a couple of scrapes.
+SERIES_QUERIES = {
+    "cpu": 'sum by (pod) (rate(container_cpu_usage_seconds_total{{selector}, container!="", container!="POD"}[1m]))',
+    "restarts": "sum by (pod) (kube_pod_container_status_restarts_total{{selector}})",
+    "crashloop": 'sum by (pod) (kube_pod_container_status_waiting_reason{{selector}, reason="CrashLoopBackOff"})',
+}
+
+DEFAULT_BASELINE_GATE = {"all": [{"series": "cpu", "stddevBelow": 0.05, "samples": 3}]}
+DEFAULT_FAULT_GATES = {
+    "cpu_saturation": {"any": [{"series": "cpu", "above": 0.25}]},
+    "crashloop_bad_config": {"any": [{"series": "crashloop", "above": 0}, {"eventReason": "BackOff"}]},
+}
+
+
+def target_selector(namespace: str, target: str) -> str:
+    return f'namespace="{namespace}", pod=~"{target}.*"'
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+class SeriesBuffer:
+    """Per-pod time series of instant samples, plus the events seen while sampling."""
+
+    def __init__(self):
+        self.series: dict[str, dict[str, list]] = {}
+        self.events: dict[tuple, dict] = {}
+        self.samples = 0
+
+    def record_metric(self, name: str, data: list[dict], ts: str):
+        """Append one instant query result (summarized ``data`` items with a ``value``)."""
+        pods = self.series.setdefault(name, {})
+        for point in data:
+            try:
+                value = float(point.get("value"))
+            except (TypeError, ValueError):
+                continue
+            pods.setdefault(point.get("metric", {}).get("pod", ""), []).append([ts, value])
+
+    def record_events(self, events: list[dict], ts: str):
+        for ev in events:
+            if "reason" not in ev:
+                continue  # error entries
+            obj = ev.get("involved_object") or {}
+            key = (obj.get("kind"), obj.get("name"), ev.get("reason"), ev.get("first_timestamp"))
+            if key in self.events:
+                self.events[key].update(count=ev.get("count"), last_timestamp=ev.get("last_timestamp"))
+            else:
+                self.events[key] = {**ev, "first_sampled": ts}
+
+    def points(self, name: str, since: Optional[datetime] = None) -> dict[str, list]:
+        """Samples of ``name`` per pod, optionally only those taken at or after ``since``."""
+        pods = self.series.get(name, {})
+        if since is None:
+            return pods
+        return {pod: [p for p in points if _parse_time(p[0]) >= since] for pod, points in pods.items()}
+
+
+class Gate:
+    """A set of predicates over a SeriesBuffer, combined with ``all`` or ``any``."""
+
+    def __init__(self, name: str, predicates: list[dict], mode: str = "all"):
+        if mode not in ("all", "any"):
+            raise ValueError(f"gate {name}: mode must be 'all' or 'any', got {mode!r}")
+        self.name = name
+        self.predicates = predicates
+        self.mode = mode
+
+    @classmethod
+    def from_spec(cls, name: str, spec: Optional[dict], default: Optional[dict] = None) -> "Gate":
+        """Build a gate from ``{"all": [...]}`` / ``{"any": [...]}`` (or ``default`` if unset)."""
+        spec = spec or default or {}
+        mode = "any" if "any" in spec else "all"
+        return cls(name, list(spec.get(mode) or []), mode)
+
+    def queries(self, selector: str) -> dict[str, str]:
+        """Instant queries for every series the predicates read."""
+        out = {}
+        for pred in self.predicates:
+            name = pred.get("series")
+            if name:
+                template = pred.get("query") or SERIES_QUERIES.get(name)
+                if template is None:
+                    raise ValueError(f"gate {self.name}: series {name!r} has no query")
+                out[name] = template.replace("{selector}", selector)
+        return out
+
+    def evaluate(self, buffer: SeriesBuffer, target: str, since: Optional[datetime] = None) -> Optional[dict]:
+        """``{"time", "signal"}`` if the gate holds, else None. An empty gate never holds.
+
+        Only samples and events from ``since`` on are considered, so signals
+        left over from before a phase started do not open its gate.
+        """
+        if not self.predicates:
+            return None
+        matches = []
+        for pred in self.predicates:
+            match = self._evaluate_one(pred, buffer, target, since)
+            if match and self.mode == "any":
+                return match
+            if not match and self.mode == "all":
+                return None
+            matches.append(match)
+        if self.mode == "any":
+            return None
+        return {
+            "time": max((m["time"] for m in matches), key=_parse_time),
+            "signal": "; ".join(m["signal"] for m in matches),
+        }
+
+    def _evaluate_one(self, pred: dict, buffer: SeriesBuffer, target: str,
+                      since: Optional[datetime]) -> Optional[dict]:
+        if "eventReason" in pred:
+            for ev in buffer.events.values():
+                obj = ev.get("involved_object") or {}
+                if ev.get("reason") != pred["eventReason"] or not (obj.get("name") or "").startswith(target):
+                    continue
+                seen = _parse_time(ev.get("last_timestamp")) or _parse_time(ev["first_sampled"])
+                if since is None or seen >= since:
+                    onset = ev.get("first_timestamp") or ev.get("last_timestamp") or ev["first_sampled"]
+                    if since is not None and _parse_time(onset) < since:
+                        onset = ev["first_sampled"]
+                    return {"time": onset, "signal": f'event {ev["reason"]} on {obj.get("kind")}/{obj.get("name")}'}
+            return None
+
+        name = pred["series"]
+        pods = {pod: pts for pod, pts in buffer.points(name, since).items() if pts}
+        if "above" in pred or "below" in pred:
+            for pod, pts in pods.items():
+                ts, value = pts[-1]
+                if "above" in pred and value > pred["above"]:
+                    return {"time": ts, "signal": f'{name}{{pod="{pod}"}}={value:.3g} > {pred["above"]:g}'}
+                if "below" in pred and value < pred["below"]:
+                    return {"time": ts, "signal": f'{name}{{pod="{pod}"}}={value:.3g} < {pred["below"]:g}'}
+            return None
+        if "stddevBelow" in pred:
+            n = max(int(pred.get("samples", 3)), 2)
+            if not pods or any(len(pts) < n for pts in pods.values()):
+                return None
+            worst = max(statistics.pstdev(v for _, v in pts[-n:]) for pts in pods.values())
+            if worst >= pred["stddevBelow"]:
+                return None
+            ts = max(pts[-1][0] for pts in pods.values())
+            return {"time": ts, "signal": f"{name} stddev {worst:.3g} < {pred['stddevBelow']:g} over {n} samples"}
+        raise ValueError(f"gate {self.name}: predicate {pred} needs above, below, stddevBelow or eventReason")
+
+
+def phase_gates(timing: dict[str, Any], fault_type: str) -> tuple[Gate, Gate]:
+    """The (baseline, fault) gates for a manifest's ``spec.timing`` block."""
+    specs = timing.get("gates") or {}
+    baseline = Gate.from_spec("baseline", specs.get("baseline"), DEFAULT_BASELINE_GATE)
+    fault = Gate.from_spec("fault", specs.get("fault"), DEFAULT_FAULT_GATES.get(fault_type))
+    return baseline, fault
@@ -12,6 +12,7 @@ import sys
 import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Optional
 
 import httpx
 import yaml
@@ -22,7 +23,13 @@ from .inject import (
     remove_cpu_saturation,
     remove_crashloop,
 )
+from .deadline import Deadline
 from .evidence import collect_evidence, build_evidence_pointers
+from .gates import phase_gates
+from .prompts import PREFIX_DIGEST, TOOL_DEFINITIONS, agent_messages
+from .sampler import SAMPLE_INTERVAL, EvidenceSampler
+from .streaming import chat_completion, summarize_turns
+from .structured import RESPONSE_FORMAT_REJECTED, parse_answer, response_format
 from .score import score_run
 from .storage import write_all_artifacts
 
@@ -43,9 +50,34 @@ TOOLS_SERVER_URL = os.environ.get(
     "http://aiops-tools-server.aiops-harness.svc:8000",
 )
 MODEL_ID = os.environ.get("LLAMA_MODEL_ID", "granite-4")
+# End-to-end budget for one investigation (all model rounds and tool calls),
+# unless the manifest sets spec.timing.agentTimeoutSeconds.
 AGENT_TIMEOUT = int(os.environ.get("AGENT_TIMEOUT_SECONDS", "300"))
+# Phase deadlines when the manifest's spec.timing does not set them; each
+# phase ends early once its gate (gates.py) holds.
 BASELINE_WAIT = int(os.environ.get("BASELINE_WAIT_SECONDS", "60"))
 INJECTION_WAIT = int(os.environ.get("INJECTION_WAIT_SECONDS", "120"))
+# Token budget per tool result; the tools server trims its response to fit
+# (dropping the least informative series/events/lines) instead of the runner
+# slicing the JSON text.
+TOOL_RESULT_TOKEN_BUDGET = int(os.environ.get("TOOL_RESULT_TOKEN_BUDGET", "500"))
+# Agent loop bounds: tool-calling rounds (the last one is answer-only), and the
+# share of the deadline kept back for that final answer — once less than this
+# is left, the agent is asked to answer without further tool calls.
+AGENT_MAX_ROUNDS = max(int(os.environ.get("AGENT_MAX_ROUNDS", "5")), 1)
+AGENT_FINAL_ANSWER_RESERVE = float(os.environ.get("AGENT_FINAL_ANSWER_RESERVE_SECONDS", "45"))
+TOOL_CALL_TIMEOUT = float(os.environ.get("TOOL_CALL_TIMEOUT_SECONDS", "30"))
+FINAL_ANSWER_PROMPT = (
+    "Investigation budget reached — do not call more tools. Give your final answer "
+    "now as JSON with keys: incident_summary, rca_ranked (list of strings), "
+    "recommended_action, evidence_links (list of strings)"
+)
+# Stream model responses (SSE) to measure TTFT, inter-token latency and
+# tokens/s per turn; set false for servers without streaming support.
+AGENT_STREAMING = os.environ.get("AGENT_STREAMING", "true").lower() in ("1", "true", "yes")
+# Guided JSON for answer-only turns (response_format json_schema from
+# schemas/aiops_output.schema.json); needs a vLLM-compatible server.
+AGENT_STRUCTURED_OUTPUT = os.environ.get("AGENT_STRUCTURED_OUTPUT", "false").lower() in ("1", "true", "yes")
 
 # MLFlow experiment tracking (core component)
 MLFLOW_AIOPS_URL = os.environ.get(
@@ -83,205 +115,244 @@ async def invoke_agent(
     incident_description: str,
     tools_url: str,
     evidence: dict,
+    deadline: Optional[Deadline] = None,
 ) -> dict:
     """Invoke the Llama Stack agent to investigate the incident.
 
     Uses the Llama Stack /v1/inference/chat-completion endpoint with tool
-    definitions that point to the tools server.
+    definitions that point to the tools server. The agent gets up to
+    AGENT_MAX_ROUNDS rounds: each round's tool calls run concurrently and
+    their results are appended in call order.
+
+    Everything runs against one ``deadline`` (AGENT_TIMEOUT by default):
+    model and tool requests get only the time left, minus
+    AGENT_FINAL_ANSWER_RESERVE for the answer. The last round, or the first
+    round with no more than that reserve left, disables tool calls
+    (``tool_choice: "none"``) and asks for the final answer. The tools are
+    still sent so the prompt prefix stays cacheable (see prompts.py).
+
+    With AGENT_STRUCTURED_OUTPUT, that answer-only round is schema-guided
+    (structured.response_format). A free-text answer from a tool round is
+    taken as it is, without another completion. A server that rejects
+    ``response_format`` gets the answer round again without it, and the rest
+    of the run stays unguided.
+
+    Each model turn's latency and token usage (streaming.chat_completion) is
+    returned under ``llm_turns``, with totals under ``llm_stats``.
     """
-    tool_definitions = [
-        {
-            "type": "function",
-            "function": {
-                "name": "getMetricHistory",
-                "description": "Query Prometheus for metric history. Use PromQL queries to examine CPU, memory, latency, error rates, and other metrics for services in the bookinfo namespace.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "PromQL query string"},
-                        "start": {"type": "string", "description": "RFC-3339 start time"},
-                        "end": {"type": "string", "description": "RFC-3339 end time"},
-                    },
-                    "required": ["query"],
-                },
-            },
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "getK8sEvents",
-                "description": "Retrieve Kubernetes events filtered by namespace and optionally by resource type/name. Events show pod scheduling, crashes, restarts, image pull errors, and other cluster-level signals.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "namespace": {"type": "string", "description": "Kubernetes namespace", "default": "bookinfo"},
-                        "resource_type": {"type": "string", "description": "Filter by kind (Pod, Deployment, etc.)"},
-                        "resource_name": {"type": "string", "description": "Filter by resource name"},
-                        "since_minutes": {"type": "integer", "description": "Look back N minutes", "default": 30},
-                    },
-                },
-            },
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "searchLogs",
-                "description": "Search pod logs for error patterns, exceptions, or specific text within a time window.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "namespace": {"type": "string", "default": "bookinfo"},
-                        "pod_name": {"type": "string", "description": "Specific pod name"},
-                        "search_text": {"type": "string", "description": "Text pattern to search for"},
-                        "since_minutes": {"type": "integer", "default": 30},
-                    },
-                },
-            },
-        },
-    ]
+    deadline = deadline or Deadline(AGENT_TIMEOUT)
+    llm_turns: list[dict] = []
+    output = await _run_agent_loop(incident_description, evidence, deadline, llm_turns)
+    output["llm_turns"] = llm_turns
+    output["llm_stats"] = {**summarize_turns(llm_turns), "prefix_digest": PREFIX_DIGEST}
+    return output
 
-    evidence_summary = _build_evidence_summary(evidence)
-
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are an expert SRE AI agent investigating an operational incident "
-                "in a Kubernetes-based microservices application called Bookinfo. "
-                "The application has these services: productpage (frontend), details, "
-                "reviews (v1, v2, v3), and ratings. "
-                "Use the available tools to investigate the incident systematically. "
-                "Query metrics, check Kubernetes events, and search logs to identify "
-                "the root cause. Provide your findings in a structured format."
-            ),
-        },
-        {
-            "role": "user",
-            "content": (
-                f"INCIDENT REPORT:\n{incident_description}\n\n"
-                f"INITIAL EVIDENCE:\n{evidence_summary}\n\n"
-                "Please investigate this incident using the available tools. "
-                "After your investigation, provide:\n"
-                "1. An incident summary\n"
-                "2. Ranked root cause hypotheses (most likely first)\n"
-                "3. A recommended remediation action\n"
-                "4. List of evidence that supports your conclusion\n\n"
-                "Format your final answer as JSON with keys: "
-                "incident_summary, rca_ranked (list of strings), "
-                "recommended_action, evidence_links (list of strings)"
-            ),
-        },
-    ]
+
+async def _run_agent_loop(
+    incident_description: str,
+    evidence: dict,
+    deadline: Deadline,
+    llm_turns: list[dict],
+) -> dict:
+    messages = agent_messages(incident_description, _build_evidence_summary(evidence))
 
     tool_calls_log = []
+    message: dict = {}
+    guided = AGENT_STRUCTURED_OUTPUT
 
     async with httpx.AsyncClient(timeout=float(AGENT_TIMEOUT)) as client:
-        # Use OpenAI-compatible chat completion endpoint
-        try:
-            resp = await client.post(
-                f"{LLAMA_STACK_URL}/v1/chat/completions",
-                json={
-                    "model": MODEL_ID,
-                    "messages": messages,
-                    "tools": tool_definitions,
-                    "tool_choice": "auto",
-                    "max_tokens": 4096,
-                },
-            )
-            resp.raise_for_status()
-            result = resp.json()
-        except Exception as e:
-            log.error(f"Agent invocation failed: {e}")
-            return _fallback_output(str(e), evidence, tool_calls_log)
-
-        # Process response — handle tool calls if any
-        choices = result.get("choices", [])
-        if not choices:
-            return _fallback_output("No choices in response", evidence, tool_calls_log)
-
-        message = choices[0].get("message", {})
-
-        # Check for tool calls
-        if message.get("tool_calls"):
+        for round_no in range(1, AGENT_MAX_ROUNDS + 1):
+            # Last round (round cap or deadline nearly spent): no tool calls, answer now
+            final = round_no == AGENT_MAX_ROUNDS or deadline.remaining() <= AGENT_FINAL_ANSWER_RESERVE
+            timeout = deadline.timeout() if final else deadline.timeout(reserve=AGENT_FINAL_ANSWER_RESERVE)
+            if timeout <= 0:
+                log.warning(f"Agent deadline ({deadline.budget:g}s) exhausted before round {round_no}")
+                if round_no == 1:
+                    return _fallback_output("Agent deadline exceeded", evidence, tool_calls_log)
+                break
+            body = {"model": MODEL_ID, "messages": messages, "tools": TOOL_DEFINITIONS, "max_tokens": 4096}
+            if final:
+                if round_no > 1:
+                    messages.append({"role": "user", "content": FINAL_ANSWER_PROMPT})
+                body["tool_choice"] = "none"
+                if guided:
+                    body["response_format"] = response_format()
+            else:
+                body["tool_choice"] = "auto"
+
+            # Use OpenAI-compatible chat completion endpoint
+            try:
+                try:
+                    reply, stats = await chat_completion(
+                        client, f"{LLAMA_STACK_URL}/v1/chat/completions", body,
+                        timeout=timeout, stream=AGENT_STREAMING,
+                    )
+                except httpx.HTTPStatusError as e:
+                    if "response_format" not in body or e.response.status_code not in RESPONSE_FORMAT_REJECTED:
+                        raise
+                    # No guided decoding on this server: ask again for a free-text answer
+                    log.warning(f"Server rejected response_format ({e.response.status_code}), answering unguided")
+                    guided = False
+                    del body["response_format"]
+                    reply, stats = await chat_completion(
+                        client, f"{LLAMA_STACK_URL}/v1/chat/completions", body,
+                        timeout=deadline.timeout(), stream=AGENT_STREAMING,
+                    )
+            except Exception as e:
+                if round_no == 1:
+                    log.error(f"Agent invocation failed: {e}")
+                    return _fallback_output(str(e), evidence, tool_calls_log)
+                log.warning(f"Agent round {round_no} failed: {e}")
+                break
+
+            llm_turns.append({"round": round_no, **stats})
+            log.info(f"Agent round {round_no}: TTFT {stats['ttft_ms']}ms, "
+                     f"{stats['completion_tokens']} tokens at {stats['tokens_per_second']} tok/s")
+            if reply is None:
+                if round_no == 1:
+                    return _fallback_output("No choices in response", evidence, tool_calls_log)
+                log.warning(f"Agent round {round_no} returned no choices")
+                break
+
+            message = reply
+            if final:
+                break
+            if not message.get("tool_calls"):
+                break
+
+            # One assistant message per turn, then its tool results in call order
+            messages.append(message)
+            calls = []
             for tc in message["tool_calls"]:
                 fn = tc.get("function", {})
                 tool_name = fn.get("name", "")
                 try:
-                    tool_args = json.loads(fn.get("arguments", "{}"))
+                    tool_args = json.loads(fn.get("arguments") or "{}")
                 except json.JSONDecodeError:
                     tool_args = {}
 
-                log.info(f"Agent tool call: {tool_name}({tool_args})")
+                log.info(f"Agent tool call (round {round_no}): {tool_name}({tool_args})")
+                calls.append((tc, tool_name, tool_args))
+
+            # Execute all of this turn's tool calls against the tools server concurrently
+            tool_results = await _execute_tool_calls(
+                client, [(tool_name, tool_args) for _, tool_name, tool_args in calls], deadline
+            )
 
-                # Execute tool call against tools server
-                tool_result = await _execute_tool_call(client, tool_name, tool_args)
+            for (tc, tool_name, tool_args), tool_result in zip(calls, tool_results):
                 tool_calls_log.append({
                     "tool": tool_name,
                     "arguments": tool_args,
                     "result_summary": _truncate(str(tool_result), 500),
+                    "round": round_no,
                 })
-
-                # Add tool results to conversation
-                messages.append(message)
                 messages.append({
                     "role": "tool",
                     "tool_call_id": tc.get("id", ""),
-                    "content": json.dumps(tool_result, default=str)[:2000],
+                    "content": json.dumps(tool_result, default=str),
                 })
 
-            # Get final response with tool results
-            try:
-                resp2 = await client.post(
-                    f"{LLAMA_STACK_URL}/v1/chat/completions",
-                    json={
-                        "model": MODEL_ID,
-                        "messages": messages,
-                        "max_tokens": 4096,
-                    },
-                )
-                resp2.raise_for_status()
-                result2 = resp2.json()
-                choices = result2.get("choices", [])
-                if choices:
-                    message = choices[0].get("message", {})
-            except Exception as e:
-                log.warning(f"Follow-up call failed: {e}")
+        log.info(f"Agent finished after {round_no} round(s), {len(tool_calls_log)} tool calls, "
+                 f"{deadline.elapsed():.1f}s of {deadline.budget:g}s")
 
         # Parse the agent's response
-        content = message.get("content", "")
+        content = message.get("content") or ""
         return _parse_agent_response(content, evidence, tool_calls_log)
 
 
-async def _execute_tool_call(client: httpx.AsyncClient, tool_name: str, args: dict) -> dict:
-    """Execute a tool call against the tools server."""
-    endpoint_map = {
-        "getMetricHistory": "/tools/getMetricHistory",
-        "getK8sEvents": "/tools/getK8sEvents",
-        "searchLogs": "/tools/searchLogs",
-        "getTraceWaterfall": "/tools/getTraceWaterfall",
-    }
+TOOL_ENDPOINTS = {
+    "getMetricHistory": "/tools/getMetricHistory",
+    "getK8sEvents": "/tools/getK8sEvents",
+    "searchLogs": "/tools/searchLogs",
+    "getTraceWaterfall": "/tools/getTraceWaterfall",
+}
+
 
-    endpoint = endpoint_map.get(tool_name)
+def _tool_timeout(deadline: Optional[Deadline]) -> Optional[float]:
+    """Time a tool call may take: TOOL_CALL_TIMEOUT, cut to the deadline minus the answer reserve."""
+    if deadline is None:
+        return None
+    return deadline.timeout(cap=TOOL_CALL_TIMEOUT, reserve=AGENT_FINAL_ANSWER_RESERVE)
+
+
+async def _execute_tool_call(
+    client: httpx.AsyncClient, tool_name: str, args: dict, deadline: Optional[Deadline] = None
+) -> dict:
+    """Execute a tool call against the tools server, within ``deadline`` if given."""
+    endpoint = TOOL_ENDPOINTS.get(tool_name)
     if not endpoint:
         return {"error": f"Unknown tool: {tool_name}"}
 
+    timeout = _tool_timeout(deadline)
+    if timeout is not None and timeout <= 0:
+        return {"error": "Skipped: investigation deadline reached"}
+
     try:
-        resp = await client.post(f"{TOOLS_SERVER_URL}{endpoint}", json=args)
+        resp = await client.post(
+            f"{TOOLS_SERVER_URL}{endpoint}",
+            json={**args, "max_tokens": TOOL_RESULT_TOKEN_BUDGET},
+            **({"timeout": timeout, "headers": deadline.headers(cap=timeout)} if deadline else {}),
+        )
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
         return {"error": str(e)}
 
 
+async def _execute_tool_calls(
+    client: httpx.AsyncClient, calls: list[tuple[str, dict]], deadline: Optional[Deadline] = None
+) -> list[dict]:
+    """Execute several tool calls in one /tools/batch round trip.
+
+    Results come back in call order and have the same shape as
+    ``_execute_tool_call``. Falls back to concurrent single calls if the batch
+    request itself fails (e.g. an older tools server without /tools/batch).
+    """
+    if len(calls) <= 1:
+        return [await _execute_tool_call(client, name, args, deadline) for name, args in calls]
+
+    timeout = _tool_timeout(deadline)
+    if timeout is not None and timeout <= 0:
+        return [{"error": "Skipped: investigation deadline reached"} for _ in calls]
+
+    try:
+        resp = await client.post(
+            f"{TOOLS_SERVER_URL}/tools/batch",
+            json={
+                "calls": [
+                    {"id": str(i), "tool": name, "arguments": {**args, "max_tokens": TOOL_RESULT_TOKEN_BUDGET}}
+                    for i, (name, args) in enumerate(calls)
+                ],
+                "timeout_seconds": timeout,
+            },
+            **({"timeout": timeout, "headers": deadline.headers(cap=timeout)} if deadline else {}),
+        )
+        resp.raise_for_status()
+        items = resp.json().get("results", [])
+    except Exception as e:
+        log.warning(f"Batch tool call failed, executing individually: {e}")
+        return list(await asyncio.gather(
+            *(_execute_tool_call(client, name, args, deadline) for name, args in calls)
+        ))
+
+    return [
+        item.get("response", {}) if item.get("status") == "ok" else {"error": item.get("error", "unknown error")}
+        for item in items
+    ]
+
+
 def _parse_agent_response(content: str, evidence: dict, tool_calls: list) -> dict:
     """Parse the agent's text response into structured output."""
-    # Try to extract JSON from the response
+    # Schema-conforming JSON (always the case for a guided answer)
+    parsed = parse_answer(content)
     try:
-        # Look for JSON block in the response
-        json_start = content.find("{")
-        json_end = content.rfind("}") + 1
-        if json_start >= 0 and json_end > json_start:
-            parsed = json.loads(content[json_start:json_end])
+        if parsed is None:
+            # Look for JSON block in the response
+            json_start = content.find("{")
+            json_end = content.rfind("}") + 1
+            if json_start >= 0 and json_end > json_start:
+                parsed = json.loads(content[json_start:json_end])
+        if parsed is not None:
             parsed["tool_calls"] = tool_calls
             if "evidence_links" not in parsed:
                 parsed["evidence_links"] = build_evidence_pointers(
@@ -364,6 +435,18 @@ def _build_evidence_summary(evidence: dict) -> str:
         for ev in events[:5]:
             lines.append(f"  [{ev.get('type')}] {ev.get('reason')}: {ev.get('message', '')[:100]}")
 
+    timeline = evidence.get("timeline") or {}
+    if timeline.get("samples"):
+        lines.append(f"\nTimeline ({timeline['samples']} samples every "
+                     f"{timeline['interval_seconds']:g}s from {timeline['started']}):")
+        onset = evidence.get("fault_onset")
+        if onset:
+            lines.append(f"  fault onset: {onset['time']} ({onset['signal']})")
+        for name, pods in timeline.get("series", {}).items():
+            for pod, points in list(pods.items())[:3]:
+                values = [v for _, v in points]
+                lines.append(f"  {name} {pod}: first={values[0]:.3g} last={values[-1]:.3g} max={max(values):.3g}")
+
     return "\n".join(lines) if lines else "No evidence collected yet"
 
 
@@ -384,6 +467,10 @@ async def run_harness(manifest: dict) -> dict:
     deployment_name = target.get("name", "")
     fault_type = fault.get("type", "")
     params = fault.get("parameters", {})
+    timing = spec.get("timing", {})
+    baseline_deadline = float(timing.get("baselineSeconds", BASELINE_WAIT))
+    injection_deadline = float(timing.get("injectionWaitSeconds", INJECTION_WAIT))
+    baseline_gate, fault_gate = phase_gates(timing, fault_type)
 
     log.info(f"=== Harness Run: {run_id} ===")
     log.info(f"Scenario: {scenario.get('id')}")
@@ -436,10 +523,17 @@ async def run_harness(manifest: dict) -> dict:
             },
         }
 
-    # Phase 1: Baseline
-    log.info(f"Phase 1: Baseline ({BASELINE_WAIT}s)")
+    # Phase 1: Baseline — sample until the baseline gate holds (or its deadline passes)
+    log.info(f"Phase 1: Baseline (up to {baseline_deadline:g}s)")
     run_meta["timestamps"]["baseline_start"] = datetime.now(timezone.utc).isoformat()
-    await asyncio.sleep(BASELINE_WAIT)
+    sampler = EvidenceSampler(
+        namespace, deployment_name, fault_type,
+        gates=(baseline_gate, fault_gate),
+        interval=float(timing.get("pollSeconds", SAMPLE_INTERVAL)),
+    )
+    sampler.start()
+    if not await sampler.wait_for(baseline_gate, baseline_deadline):
+        log.info("Baseline gate did not hold before its deadline; injecting anyway")
     run_meta["timestamps"]["baseline_end"] = datetime.now(timezone.utc).isoformat()
 
     # Phase 2: Inject
@@ -463,15 +557,24 @@ async def run_harness(manifest: dict) -> dict:
         )
     else:
         log.error(f"Unknown fault type: {fault_type}")
+        await sampler.stop()
         run_meta["status"] = "error"
         return run_meta
 
     log.info(f"Injection result: {injection_result}")
     run_meta["timestamps"]["inject_end"] = datetime.now(timezone.utc).isoformat()
 
-    # Phase 3: Wait for fault to propagate
-    log.info(f"Phase 3: Waiting for fault propagation ({INJECTION_WAIT}s)")
-    await asyncio.sleep(INJECTION_WAIT)
+    # Phase 3: Wait for fault to propagate, until the fault gate holds
+    log.info(f"Phase 3: Waiting for fault propagation (up to {injection_deadline:g}s)")
+    try:
+        observed = await sampler.wait_for_fault(fault_gate, injection_deadline, since=injection_start)
+    finally:
+        await sampler.stop()
+    if observed:
+        run_meta["timestamps"]["fault_observed"] = sampler.fault_onset["time"]
+        log.info(f"Fault observable after {sampler.fault_onset['seconds_after_injection']}s")
+    else:
+        log.info("Fault gate did not hold within the propagation deadline")
 
     # Phase 4: Capture evidence
     log.info("Phase 4: Capture evidence")
@@ -486,6 +589,8 @@ async def run_harness(manifest: dict) -> dict:
         end_time=evidence_end.isoformat(),
         fault_type=fault_type,
     )
+    evidence["timeline"] = sampler.timeline()
+    evidence["fault_onset"] = sampler.fault_onset
     run_meta["timestamps"]["capture_end"] = datetime.now(timezone.utc).isoformat()
 
     # Phase 5: Invoke agent
@@ -494,7 +599,8 @@ async def run_harness(manifest: dict) -> dict:
 
     incident_description = _build_incident_description(scenario, fault, namespace, deployment_name)
     invoke_start = time.time()
-    aiops_output = await invoke_agent(incident_description, TOOLS_SERVER_URL, evidence)
+    agent_deadline = Deadline(float(timing.get("agentTimeoutSeconds", AGENT_TIMEOUT)))
+    aiops_output = await invoke_agent(incident_description, TOOLS_SERVER_URL, evidence, agent_deadline)
     invoke_elapsed = time.time() - invoke_start
     run_meta["timestamps"]["invoke_end"] = datetime.now(timezone.utc).isoformat()
 
@@ -506,6 +612,7 @@ async def run_harness(manifest: dict) -> dict:
             tool_calls=aiops_output.get("tool_calls", []),
             rca_output=aiops_output,
             investigation_time_seconds=invoke_elapsed,
+            llm_turns=aiops_output.get("llm_turns"),
             mlflow_url=MLFLOW_AIOPS_URL,
             tags={"run_id": run_id, "namespace": namespace, "target": deployment_name},
         )
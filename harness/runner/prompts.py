@@ -0,0 +1,118 @@
+"""Agent prompt layout, arranged for prefix caching.
+
+vLLM's automatic prefix caching reuses the KV cache of any prompt prefix it
+has seen before, token for token. The chat template renders the system
+prompt and the tool definitions first, so when those are byte-identical
+across rounds, runs and scenarios, only the incident-specific tail needs
+prefill. This module keeps that static part in one place:
+
+  1. SYSTEM_PROMPT: role, application and answer format (no run data)
+  2. TOOL_DEFINITIONS: canonically serialized (sorted keys, fixed order)
+  3. the incident report and evidence summary, in the first user message
+
+Every round sends the same tools, including answer-only rounds
+(``tool_choice: "none"``), because dropping them would change the rendered
+prefix. ``prefix_digest`` fingerprints the static part so runs can check it
+did not drift. Dependency-free, so the benchmark scripts share it.
+"""
+
+import hashlib
+import json
+
+SYSTEM_PROMPT = (
+    "You are an expert SRE AI agent investigating an operational incident "
+    "in a Kubernetes-based microservices application called Bookinfo. "
+    "The application has these services: productpage (frontend), details, "
+    "reviews (v1, v2, v3), and ratings. "
+    "Use the available tools to investigate the incident systematically. "
+    "Query metrics, check Kubernetes events, and search logs to identify "
+    "the root cause.\n\n"
+    "After your investigation, provide:\n"
+    "1. An incident summary\n"
+    "2. Ranked root cause hypotheses (most likely first)\n"
+    "3. A recommended remediation action\n"
+    "4. List of evidence that supports your conclusion\n\n"
+    "Format your final answer as JSON with keys: "
+    "incident_summary, rca_ranked (list of strings), "
+    "recommended_action, evidence_links (list of strings)"
+)
+
+
+def canonical_tools(tools: list[dict]) -> list[dict]:
+    """``tools`` with every object's keys sorted (list order is kept)."""
+    return json.loads(json.dumps(tools, sort_keys=True))
+
+
+def prefix_digest(system_prompt: str, tools: list[dict]) -> str:
+    """Short fingerprint of the static prompt prefix (system prompt + tools)."""
+    payload = json.dumps({"system": system_prompt, "tools": tools}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+TOOL_DEFINITIONS = canonical_tools([
+    {
+        "type": "function",
+        "function": {
+            "name": "getMetricHistory",
+            "description": "Query Prometheus for metric history. Use PromQL queries to examine CPU, memory, latency, error rates, and other metrics for services in the bookinfo namespace.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "PromQL query string"},
+                    "start": {"type": "string", "description": "RFC-3339 start time"},
+                    "end": {"type": "string", "description": "RFC-3339 end time"},
+                },
+                "required": ["query"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "getK8sEvents",
+            "description": "Retrieve Kubernetes events filtered by namespace and optionally by resource type/name. Events show pod scheduling, crashes, restarts, image pull errors, and other cluster-level signals.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "namespace": {"type": "string", "description": "Kubernetes namespace", "default": "bookinfo"},
+                    "resource_type": {"type": "string", "description": "Filter by kind (Pod, Deployment, etc.)"},
+                    "resource_name": {"type": "string", "description": "Filter by resource name"},
+                    "since_minutes": {"type": "integer", "description": "Look back N minutes", "default": 30},
+                },
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "searchLogs",
+            "description": "Search pod logs for error patterns, exceptions, or specific text within a time window.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "namespace": {"type": "string", "default": "bookinfo"},
+                    "pod_name": {"type": "string", "description": "Specific pod name"},
+                    "search_text": {"type": "string", "description": "Text pattern to search for"},
+                    "since_minutes": {"type": "integer", "default": 30},
+                },
+            },
+        },
+    },
+])
+
+PREFIX_DIGEST = prefix_digest(SYSTEM_PROMPT, TOOL_DEFINITIONS)
+
+
+def agent_messages(incident_description: str, evidence_summary: str) -> list[dict]:
+    """Opening conversation: static system prompt, then this incident's data."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": (
+                f"INCIDENT REPORT:\n{incident_description}\n\n"
+                f"INITIAL EVIDENCE:\n{evidence_summary}\n\n"
+                "Investigate this incident using the available tools."
+            ),
+        },
+    ]
@@ -0,0 +1,160 @@
+"""Evidence sampling across the baseline and fault-propagation phases.
+
+Instead of sleeping through the baseline and the propagation wait and then
+taking one snapshot, the runner starts an ``EvidenceSampler`` at the
+beginning of the baseline. Every poll interval it takes instant readings of a
+few key series for the target (plus namespace events) through one
+/tools/batch call and appends them to an in-memory time series
+(``gates.SeriesBuffer``). Each phase waits on its gate (see gates.py) over
+those samples, so it ends as soon as its condition holds. The samples are
+handed to the agent as a higher-resolution timeline with a measured fault
+onset.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from .gates import SERIES_QUERIES, Gate, SeriesBuffer, target_selector
+
+log = logging.getLogger(__name__)
+
+TOOLS_SERVER_URL = os.environ.get(
+    "TOOLS_SERVER_URL",
+    "http://aiops-tools-server.aiops-harness.svc:8000",
+)
+SAMPLE_INTERVAL = float(os.environ.get("EVIDENCE_SAMPLE_INTERVAL_SECONDS", "5"))
+# Seconds to keep sampling once the fault is visible, so the timeline shows it developing.
+SETTLE_SECONDS = float(os.environ.get("EVIDENCE_SETTLE_SECONDS", "10"))
+
+# Series always sampled for the timeline, on top of whatever the gates read.
+TIMELINE_SERIES = {
+    "": ("cpu", "restarts"),
+    "crashloop_bad_config": ("cpu", "restarts", "crashloop"),
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class EvidenceSampler:
+    """Background sampler of a fault target's key series and events."""
+
+    def __init__(self, namespace: str, target: str, fault_type: str,
+                 gates: tuple[Gate, ...] = (), interval: float = SAMPLE_INTERVAL):
+        self.namespace = namespace
+        self.target = target
+        self.interval = interval
+        selector = target_selector(namespace, target)
+        names = TIMELINE_SERIES.get(fault_type, TIMELINE_SERIES[""])
+        self.queries = {name: SERIES_QUERIES[name].replace("{selector}", selector) for name in names}
+        for gate in gates:
+            self.queries.update(gate.queries(selector))
+
+        self.buffer = SeriesBuffer()
+        self.started_at: Optional[str] = None
+        self.fault_onset: Optional[dict] = None
+        self._started_mono = 0.0
+        self._sampled = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.started_at = _now()
+        self._started_mono = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        log.info(f"Evidence sampler started ({len(self.queries)} series every {self.interval:g}s)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        log.info(f"Evidence sampler stopped after {self.buffer.samples} samples")
+
+    async def wait_for(self, gate: Gate, timeout: float, since: Optional[datetime] = None) -> Optional[dict]:
+        """Wait until ``gate`` holds over the samples taken from ``since`` on.
+
+        Returns the gate's match (``{"time", "signal"}``), or None once
+        ``timeout`` seconds pass without it holding.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            match = gate.evaluate(self.buffer, self.target, since)
+            if match:
+                log.info(f"Gate {gate.name} open: {match['signal']}")
+                return match
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._sampled.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    async def wait_for_fault(self, gate: Gate, timeout: float, since: datetime) -> bool:
+        """Wait for the fault gate (plus SETTLE_SECONDS) and record the fault onset."""
+        start = time.monotonic()
+        match = await self.wait_for(gate, timeout, since)
+        if match is None:
+            return False
+        self.fault_onset = {
+            **match,
+            "seconds_after_injection": round((datetime.fromisoformat(match["time"]) - since).total_seconds(), 1),
+        }
+        await asyncio.sleep(max(0.0, min(SETTLE_SECONDS, timeout - (time.monotonic() - start))))
+        return True
+
+    async def _run(self):
+        async with httpx.AsyncClient(timeout=max(self.interval * 2, 10.0)) as client:
+            while True:
+                tick = time.monotonic()
+                try:
+                    await self._sample(client)
+                except Exception as e:
+                    log.warning(f"Evidence sample failed: {e}")
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - tick)))
+
+    async def _sample(self, client: httpx.AsyncClient):
+        since_minutes = int((time.monotonic() - self._started_mono) // 60) + 2
+        calls = [
+            {"id": name, "tool": "getMetricHistory", "arguments": {"query": query, "max_tokens": 0}}
+            for name, query in self.queries.items()
+        ]
+        calls.append({"id": "events", "tool": "getK8sEvents",
+                      "arguments": {"namespace": self.namespace, "since_minutes": since_minutes, "max_tokens": 0}})
+        resp = await client.post(f"{TOOLS_SERVER_URL}/tools/batch", json={"calls": calls})
+        resp.raise_for_status()
+
+        ts = _now()
+        for item in resp.json().get("results", []):
+            if item.get("status") != "ok":
+                continue
+            body = item.get("response", {})
+            if item.get("id") == "events":
+                self.buffer.record_events(body.get("events", []), ts)
+            elif item.get("id") in self.queries:
+                self.buffer.record_metric(item["id"], body.get("result", {}).get("data", []), ts)
+        self.buffer.samples += 1
+
+        # Wake every waiter, then arm a fresh event for the next sample.
+        self._sampled.set()
+        self._sampled = asyncio.Event()
+
+    def timeline(self) -> dict:
+        """The sampled time series and events, for the evidence bundle."""
+        return {
+            "started": self.started_at,
+            "interval_seconds": self.interval,
+            "samples": self.buffer.samples,
+            "queries": self.queries,
+            "series": self.buffer.series,
+            "events": sorted(self.buffer.events.values(), key=lambda ev: ev["first_sampled"]),
+        }
@@ -0,0 +1,184 @@
+"""Streaming chat completions with per-turn latency and throughput stats.
+
+A non-streaming /chat/completions call only tells us how long the whole turn
+took. ``chat_completion`` sends ``stream: true`` and reads the server-sent
+events as they arrive. It assembles the assistant message (content and
+tool-call deltas) incrementally and times the stream:
+
+  ttft_ms               request sent -> first content/tool-call token
+  inter_token_ms_*      gaps between streamed chunks (one token each on vLLM)
+  tokens_per_second     completion tokens / time from first to last token
+  prompt/completion_tokens
+                        from the final usage chunk (``stream_options.include_usage``)
+  cached_tokens         prompt tokens served from the prefix cache
+                        (``usage.prompt_tokens_details``; vLLM needs
+                        --enable-prompt-tokens-details)
+
+Servers that answer a streaming request with a plain JSON body are handled
+too; those turns only get total latency and usage. Dependency-light
+(httpx only) so the benchmark scripts share it.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+from typing import Optional
+
+import httpx
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def _turn_stats(start: float, first: Optional[float], last: Optional[float],
+                gaps: list[float], chunks: int, usage: dict, finish_reason: Optional[str]) -> dict:
+    end = time.perf_counter()
+    completion_tokens = usage.get("completion_tokens")
+    stats = {
+        "total_ms": round((end - start) * 1000, 1),
+        "ttft_ms": round((first - start) * 1000, 1) if first is not None else None,
+        "inter_token_ms_mean": round(statistics.fmean(gaps) * 1000, 2) if gaps else None,
+        "inter_token_ms_p95": round(_percentile(gaps, 95) * 1000, 2) if gaps else None,
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": completion_tokens,
+        "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+        "streamed_chunks": chunks,
+        "finish_reason": finish_reason,
+        "tokens_per_second": None,
+    }
+    # Decode rate over the generation phase; chunk count stands in for usage if missing.
+    generated = completion_tokens if completion_tokens is not None else chunks
+    if first is not None and last is not None and last > first and generated:
+        stats["tokens_per_second"] = round(generated / (last - first), 2)
+    return stats
+
+
+async def chat_completion(
+    client: httpx.AsyncClient,
+    url: str,
+    body: dict,
+    headers: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    stream: bool = True,
+) -> tuple[Optional[dict], dict]:
+    """POST a chat completion and return ``(message, stats)``.
+
+    ``message`` has the shape of ``choices[0].message`` in a non-streaming
+    response (None when the server returned no choices). Raises
+    ``httpx.HTTPError`` like ``client.post(...).raise_for_status()`` would.
+
+    ``timeout`` bounds the whole call, not each read: a model that keeps
+    streaming tokens is cut off once it runs out (``httpx.TimeoutException``).
+    """
+    kwargs = {"json": body, "headers": headers}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    call = _stream(client, url, body, kwargs) if stream else _post(client, url, kwargs)
+    try:
+        return await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        raise httpx.TimeoutException(f"chat completion exceeded its {timeout:.3g}s deadline") from None
+
+
+async def _post(client: httpx.AsyncClient, url: str, kwargs: dict) -> tuple[Optional[dict], dict]:
+    start = time.perf_counter()
+    resp = await client.post(url, **kwargs)
+    resp.raise_for_status()
+    return _from_json(resp.json(), start)
+
+
+async def _stream(client: httpx.AsyncClient, url: str, body: dict,
+                  kwargs: dict) -> tuple[Optional[dict], dict]:
+    start = time.perf_counter()
+    kwargs["json"] = {**body, "stream": True, "stream_options": {"include_usage": True}}
+    content: list[str] = []
+    tool_calls: dict[int, dict] = {}
+    role, finish_reason, usage = "assistant", None, {}
+    first = last = None
+    gaps: list[float] = []
+    chunks = 0
+    seen_choice = False
+
+    async with client.stream("POST", url, **kwargs) as resp:
+        resp.raise_for_status()
+        if resp.headers.get("content-type", "").startswith("application/json"):
+            return _from_json(json.loads(await resp.aread()), start)
+
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            usage = chunk.get("usage") or usage
+            for choice in chunk.get("choices") or []:
+                if choice.get("index", 0) != 0:
+                    continue
+                seen_choice = True
+                delta = choice.get("delta") or {}
+                role = delta.get("role") or role
+                token = False
+                if delta.get("content"):
+                    content.append(delta["content"])
+                    token = True
+                for tc_delta in delta.get("tool_calls") or []:
+                    tc = tool_calls.setdefault(tc_delta.get("index", len(tool_calls)), {
+                        "id": "", "type": "function", "function": {"name": "", "arguments": ""},
+                    })
+                    tc["id"] = tc_delta.get("id") or tc["id"]
+                    fn = tc_delta.get("function") or {}
+                    tc["function"]["name"] += fn.get("name") or ""
+                    tc["function"]["arguments"] += fn.get("arguments") or ""
+                    token = True
+                finish_reason = choice.get("finish_reason") or finish_reason
+                if token:
+                    now = time.perf_counter()
+                    if first is None:
+                        first = now
+                    else:
+                        gaps.append(now - last)
+                    last = now
+                    chunks += 1
+
+    stats = _turn_stats(start, first, last, gaps, chunks, usage, finish_reason)
+    if not seen_choice:
+        return None, stats
+    message = {"role": role, "content": "".join(content) or None}
+    if tool_calls:
+        message["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
+    return message, stats
+
+
+def _from_json(result: dict, start: float) -> tuple[Optional[dict], dict]:
+    choices = result.get("choices") or []
+    finish_reason = choices[0].get("finish_reason") if choices else None
+    stats = _turn_stats(start, None, None, [], 0, result.get("usage") or {}, finish_reason)
+    return (choices[0].get("message", {}) if choices else None), stats
+
+
+def summarize_turns(turns: list[dict]) -> dict:
+    """Investigation-level totals and means over per-turn stats."""
+    def values(key):
+        return [t[key] for t in turns if t.get(key) is not None]
+
+    ttft, itl, tps = values("ttft_ms"), values("inter_token_ms_mean"), values("tokens_per_second")
+    # Share of prompt tokens served from the prefix cache, over turns that report it
+    reported = [t for t in turns if t.get("cached_tokens") is not None and t.get("prompt_tokens")]
+    prompt_reported = sum(t["prompt_tokens"] for t in reported)
+    return {
+        "turns": len(turns),
+        "ttft_ms_first": ttft[0] if ttft else None,
+        "ttft_ms_mean": round(statistics.fmean(ttft), 1) if ttft else None,
+        "inter_token_ms_mean": round(statistics.fmean(itl), 2) if itl else None,
+        "tokens_per_second_mean": round(statistics.fmean(tps), 2) if tps else None,
+        "prompt_tokens": sum(values("prompt_tokens")),
+        "completion_tokens": sum(values("completion_tokens")),
+        "cached_tokens": sum(values("cached_tokens")),
+        "cached_token_ratio": (round(sum(t["cached_tokens"] for t in reported) / prompt_reported, 3)
+                               if prompt_reported else None),
+        "llm_time_ms": round(sum(values("total_ms")), 1),
+    }
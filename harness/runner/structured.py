@@ -0,0 +1,87 @@
+"""Structured (schema-guided) final answers.
+
+The agent's final answer used to be free text that we mined for a JSON
+object (``find("{")``/``rfind("}")``, regexes) and, failing that, for
+keywords. With structured output on, the answer turn sends the answer part
+of ``schemas/aiops_output.schema.json`` as an OpenAI ``response_format``
+(``json_schema``, strict). vLLM enforces it with guided decoding, so the reply
+is the JSON object itself and a single ``json.loads`` reads it.
+
+Guided decoding and tool calling don't mix (the grammar would rule out the
+tool-call syntax), so only answer-only turns carry the schema: the round
+that hits the round cap or the deadline reserve is answer-only and guided, so
+the answer comes back in the schema without an extra turn. The harness
+fills in the remaining fields (tool_calls, llm_turns, error, ...).
+Dependency-free, so the benchmark scripts share it.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "schemas" / "aiops_output.schema.json"
+
+# Fields the model writes; everything else in the output schema is filled in by the harness.
+ANSWER_FIELDS = ("incident_summary", "rca_ranked", "recommended_action", "evidence_links")
+
+# Answer-only turn that asks for nothing but the answer; the schema carries the format.
+ANSWER_PROMPT = "Give your final answer now as a JSON object matching the response schema."
+
+# Statuses an OpenAI-compatible server answers a ``response_format`` it can't
+# honour with (no guided decoding backend); callers resend the turn without it.
+RESPONSE_FORMAT_REJECTED = (400, 422, 501)
+
+_JSON_TYPES = {"string": str, "array": list, "object": dict, "integer": int, "number": (int, float)}
+
+
+@lru_cache(maxsize=None)
+def _output_schema() -> dict:
+    return json.loads(SCHEMA_PATH.read_text())
+
+
+@lru_cache(maxsize=None)
+def answer_schema() -> dict:
+    """The model-written subset of the AIOps output schema, strict."""
+    full = _output_schema()
+    return {
+        "type": "object",
+        "properties": {name: full["properties"][name] for name in ANSWER_FIELDS},
+        "required": list(ANSWER_FIELDS),
+        "additionalProperties": False,
+    }
+
+
+def response_format() -> dict:
+    """``response_format`` for an OpenAI-compatible /chat/completions request."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "aiops_output", "schema": answer_schema(), "strict": True},
+    }
+
+
+def _matches(value: Any, spec: dict) -> bool:
+    expected = _JSON_TYPES.get(spec.get("type"))
+    if expected is None:
+        return True
+    if not isinstance(value, expected) or isinstance(value, bool):
+        return False
+    if isinstance(value, list) and "items" in spec:
+        return all(_matches(item, spec["items"]) for item in value)
+    return True
+
+
+def parse_answer(content: Optional[str]) -> Optional[dict]:
+    """The answer as a dict if ``content`` is exactly a schema-conforming JSON object, else None."""
+    try:
+        parsed = json.loads(content or "")
+    except ValueError:
+        return None
+    if not isinstance(parsed, dict):
+        return None
+    if any(name not in parsed for name in _output_schema()["required"]):
+        return None
+    for name, spec in answer_schema()["properties"].items():
+        if name in parsed and not _matches(parsed[name], spec):
+            return None
+    return parsed
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """Distributed harness benchmark — staggered dual-fault cascade scenario.
 
-Injects two independent faults with a 60-second stagger:
+Injects two independent faults, staggered:
   1. T+0:  Bad config env var into ratings-v1 → CrashLoopBackOff
-  2. T+60: CPU stress sidecar into reviews-v2 → CPU saturation
+  2. Once ratings-v1 is crash-looping (at most T+60): CPU stress sidecar
+     into reviews-v2 → CPU saturation
 
 The agent must identify BOTH root causes and their temporal ordering.
 
@@ -33,6 +34,16 @@ from local_benchmark import (
     TOOL_DEFINITIONS,
     RAG_TOOL_DEFINITION,
     WEIGHTS,
+    TOOL_RESULT_TOKEN_BUDGET,
+    fit_to_budget,
+    gather_evidence,
+    evidence_list,
+    wait_for_gate,
+    wait_for_rollout,
+    DEFAULT_BASELINE_GATE,
+    DEFAULT_FAULT_GATES,
+    FAULT_SETTLE_SECONDS,
+    Gate,
     query_prometheus,
     get_k8s_events,
     search_pod_logs,
@@ -67,9 +78,11 @@ NAMESPACE = "bookinfo"
 RATINGS_DEPLOYMENT = "ratings-v1"
 REVIEWS_DEPLOYMENT = "reviews-v2"
 
+# Phase deadlines — each phase ends as soon as its gate (runner/gates.py) holds
 BASELINE_WAIT = 30        # seconds
-STAGGER_WAIT = 60         # delay between fault #1 and fault #2
-CASCADE_WAIT = 120        # time for both faults to propagate
+STAGGER_WAIT = 60         # max delay between fault #1 and fault #2
+CASCADE_WAIT = 120        # max time for fault #2 to propagate
+ROLLOUT_WAIT = 15         # seconds for a cleanup rollout to finish
 
 # MLFlow experiment tracking
 from mlflow_utils import (
@@ -356,7 +369,7 @@ async def invoke_agent(model_key: str, model_cfg: dict, evidence: dict,
                 messages.append({
                     "role": "tool",
                     "tool_call_id": tc.get("id", f"call_{round_num}"),
-                    "content": json.dumps(tool_result, default=str)[:3000],
+                    "content": json.dumps(fit_to_budget(tool_result, TOOL_RESULT_TOKEN_BUDGET), default=str),
                 })
 
             try:
@@ -774,44 +787,40 @@ async def run_judge_matrix(results: dict, truth: dict) -> dict:
 
 async def collect_evidence(namespace: str,
                            start_time: str, end_time: str) -> dict:
-    """Collect evidence covering both fault targets."""
-    evidence = {
-        "collection_time": datetime.now(timezone.utc).isoformat(),
-        "window": {"start": start_time, "end": end_time},
-        "metrics": {}, "events": [], "logs": [], "topology": {},
+    """Collect evidence covering both fault targets (queries run concurrently)."""
+    collection_time = datetime.now(timezone.utc).isoformat()
+    metric_queries = {
+        # Ratings-v1 signals
+        "ratings_restarts": (
+            f'kube_pod_container_status_restarts_total{{namespace="{namespace}", pod=~"ratings-v1.*"}}',),
+        "ratings_waiting": (
+            f'kube_pod_container_status_waiting_reason{{namespace="{namespace}", pod=~"ratings-v1.*"}}',),
+        # Reviews-v2 signals
+        "reviews_cpu": (
+            f'rate(container_cpu_usage_seconds_total{{namespace="{namespace}", pod=~"reviews-v2.*"}}[5m])',
+            start_time, end_time),
+        "reviews_memory": (
+            f'container_memory_working_set_bytes{{namespace="{namespace}", pod=~"reviews-v2.*"}}',
+            start_time, end_time),
+        # Cross-service signals
+        "all_restarts": (f'kube_pod_container_status_restarts_total{{namespace="{namespace}"}}',),
+        "all_pod_status": (f'kube_pod_status_phase{{namespace="{namespace}"}}',),
     }
+    calls = {f"metrics.{key}": query_prometheus(*args) for key, args in metric_queries.items()}
+    calls["events"] = asyncio.to_thread(get_k8s_events, namespace, since_minutes=30)
+    calls["logs"] = asyncio.to_thread(search_pod_logs, namespace, "error", 50)
+    calls["topology"] = asyncio.to_thread(get_node_topology, namespace)
 
-    # Ratings-v1 signals
-    evidence["metrics"]["ratings_restarts"] = await query_prometheus(
-        f'kube_pod_container_status_restarts_total{{namespace="{namespace}", pod=~"ratings-v1.*"}}',
-    )
-    evidence["metrics"]["ratings_waiting"] = await query_prometheus(
-        f'kube_pod_container_status_waiting_reason{{namespace="{namespace}", pod=~"ratings-v1.*"}}',
-    )
-
-    # Reviews-v2 signals
-    evidence["metrics"]["reviews_cpu"] = await query_prometheus(
-        f'rate(container_cpu_usage_seconds_total{{namespace="{namespace}", pod=~"reviews-v2.*"}}[5m])',
-        start_time, end_time,
-    )
-    evidence["metrics"]["reviews_memory"] = await query_prometheus(
-        f'container_memory_working_set_bytes{{namespace="{namespace}", pod=~"reviews-v2.*"}}',
-        start_time, end_time,
-    )
-
-    # Cross-service signals
-    evidence["metrics"]["all_restarts"] = await query_prometheus(
-        f'kube_pod_container_status_restarts_total{{namespace="{namespace}"}}',
-    )
-    evidence["metrics"]["all_pod_status"] = await query_prometheus(
-        f'kube_pod_status_phase{{namespace="{namespace}"}}',
-    )
-
-    evidence["events"] = get_k8s_events(namespace, since_minutes=30)
-    evidence["logs"] = search_pod_logs(namespace, "error", 50)
-    evidence["topology"] = get_node_topology(namespace)
-
-    return evidence
+    results, timings = await gather_evidence(calls)
+    return {
+        "collection_time": collection_time,
+        "window": {"start": start_time, "end": end_time},
+        "metrics": {key: results[f"metrics.{key}"] for key in metric_queries},
+        "events": evidence_list(results["events"]),
+        "logs": evidence_list(results["logs"]),
+        "topology": results["topology"],
+        "timings_ms": timings,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -822,7 +831,7 @@ async def run_benchmark():
     log.info("=" * 70)
     log.info("AIOps Harness — Distributed Benchmark: Staggered Dual-Fault Cascade")
     log.info("  Fault #1: CrashLoopBackOff on ratings-v1 (T+0)")
-    log.info("  Fault #2: CPU saturation on reviews-v2 (T+60)")
+    log.info(f"  Fault #2: CPU saturation on reviews-v2 (once #1 shows, at most T+{STAGGER_WAIT})")
     log.info("=" * 70)
 
     # --- Resolve endpoints (same as local_benchmark) ---
@@ -867,7 +876,7 @@ async def run_benchmark():
         if "stress-injector" in container_names:
             log.warning("Leftover stress-injector on reviews-v2 — cleaning up...")
             remove_cpu_saturation(NAMESPACE, REVIEWS_DEPLOYMENT)
-            await asyncio.sleep(15)
+            await wait_for_rollout(NAMESPACE, REVIEWS_DEPLOYMENT, ROLLOUT_WAIT)
     except Exception:
         pass
 
@@ -880,7 +889,7 @@ async def run_benchmark():
             if c.command and "exit 1" in " ".join(c.args or []):
                 log.warning("Leftover bad config on ratings-v1 — rolling back...")
                 remove_bad_config(NAMESPACE, RATINGS_DEPLOYMENT)
-                await asyncio.sleep(15)
+                await wait_for_rollout(NAMESPACE, RATINGS_DEPLOYMENT, ROLLOUT_WAIT)
                 break
     except Exception:
         pass
@@ -923,10 +932,14 @@ async def run_benchmark():
 
     # --- Phase 1: Baseline ---
     log.info(f"\n{'='*60}")
-    log.info(f"Phase 1: Baseline ({BASELINE_WAIT}s)")
+    log.info(f"Phase 1: Baseline (up to {BASELINE_WAIT}s, until CPU is stable)")
     log.info(f"{'='*60}")
     baseline_start = datetime.now(timezone.utc)
-    await asyncio.sleep(BASELINE_WAIT)
+    baseline_gate = Gate.from_spec("baseline", DEFAULT_BASELINE_GATE)
+    await asyncio.gather(
+        wait_for_gate(baseline_gate, NAMESPACE, RATINGS_DEPLOYMENT, BASELINE_WAIT),
+        wait_for_gate(baseline_gate, NAMESPACE, REVIEWS_DEPLOYMENT, BASELINE_WAIT),
+    )
 
     # --- Phase 2: Inject fault #1 — bad config into ratings-v1 ---
     log.info(f"\n{'='*60}")
@@ -941,15 +954,21 @@ async def run_benchmark():
 
     # --- Phase 3: Wait for first fault to propagate ---
     log.info(f"\n{'='*60}")
-    log.info(f"Phase 3: Waiting {STAGGER_WAIT}s for fault #1 to propagate...")
+    log.info(f"Phase 3: Waiting up to {STAGGER_WAIT}s for fault #1 to propagate...")
     log.info(f"{'='*60}")
-    await asyncio.sleep(STAGGER_WAIT)
+    fault1_onset = await wait_for_gate(
+        Gate.from_spec("fault", DEFAULT_FAULT_GATES["crashloop_bad_config"]),
+        NAMESPACE, RATINGS_DEPLOYMENT, STAGGER_WAIT, since=fault1_time,
+    )
 
     # --- Phase 4: Inject fault #2 — CPU saturation into reviews-v2 ---
     log.info(f"\n{'='*60}")
     log.info("Phase 4: Inject fault #2 — CPU saturation into reviews-v2")
     log.info(f"{'='*60}")
     fault2_time = datetime.now(timezone.utc)
+    stagger_seconds = round((fault2_time - fault1_time).total_seconds())
+    truth["root_causes"][1]["inject_offset_seconds"] = stagger_seconds
+    truth["fault"]["stagger_seconds"] = stagger_seconds
     try:
         inject_cpu_saturation(NAMESPACE, REVIEWS_DEPLOYMENT)
     except Exception as e:
@@ -958,9 +977,14 @@ async def run_benchmark():
 
     # --- Phase 5: Wait for cascade to develop ---
     log.info(f"\n{'='*60}")
-    log.info(f"Phase 5: Waiting {CASCADE_WAIT}s for cascade to develop (both faults active)...")
+    log.info(f"Phase 5: Waiting up to {CASCADE_WAIT}s for cascade to develop (both faults active)...")
     log.info(f"{'='*60}")
-    await asyncio.sleep(CASCADE_WAIT)
+    fault2_onset = await wait_for_gate(
+        Gate.from_spec("fault", DEFAULT_FAULT_GATES["cpu_saturation"]),
+        NAMESPACE, REVIEWS_DEPLOYMENT, CASCADE_WAIT, since=fault2_time,
+    )
+    if fault2_onset:
+        await asyncio.sleep(FAULT_SETTLE_SECONDS)
 
     # --- Phase 6: Collect evidence ---
     log.info(f"\n{'='*60}")
@@ -972,6 +996,7 @@ async def run_benchmark():
         NAMESPACE,
         evidence_start.isoformat(), evidence_end.isoformat(),
     )
+    evidence["fault_onsets"] = {RATINGS_DEPLOYMENT: fault1_onset, REVIEWS_DEPLOYMENT: fault2_onset}
     log.info(f"Evidence collected: {len(evidence.get('metrics', {}))} metric types, "
              f"{len(evidence.get('events', []))} events, {len(evidence.get('logs', []))} log entries")
 
@@ -1033,7 +1058,7 @@ async def run_benchmark():
             rca_completeness=mc.get("rca_completeness", 0.0),
             fault1_time=fault1_time.isoformat(),
             fault2_time=fault2_time.isoformat(),
-            stagger_seconds=STAGGER_WAIT,
+            stagger_seconds=stagger_seconds,
             mlflow_url=MLFLOW_AIOPS_URL,
         )
 
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Stand-in observability backends for exercising the tools server without a cluster.
+
+Serves synthetic Bookinfo traces over either the Tempo or the Jaeger query
+API (both use /api/traces/{id}, with different payloads, hence --flavor).
+Every third trace has a slow reviews-v2 -> ratings call and every fifth an
+erroring ratings span, so the waterfall, critical path and per-service
+breakdown have something to find.
+
+A fake Loki is served alongside on /loki/api/v1/query_range. It understands
+the LogQL subset the tools server emits: label equality selectors plus
+``|=``/``|~`` line filters. Its logs include a crash-looping ratings
+container that no longer exists in the cluster.
+
+Usage:
+    python3 scripts/fake_observability_backends.py --flavor tempo --port 3200
+    TRACE_BACKEND=tempo TRACE_QUERY_URL=http://127.0.0.1:3200 TRACE_USE_SA_TOKEN=false \\
+    LOG_BACKEND=loki LOKI_URL=http://127.0.0.1:3200 LOKI_USE_SA_TOKEN=false \\
+        uvicorn otel_tools_server.main:app --app-dir tools
+
+tests/ starts the same server in-process (``make_server``) on a free port.
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# (service, operation, offset ms into parent, duration ms, children)
+_BOOKINFO_SHAPE = (
+    "productpage.bookinfo", "GET /productpage", 0, 40, [
+        ("details.bookinfo", "GET /details/0", 3, 6, []),
+        ("reviews.bookinfo", "GET /reviews/0", 12, 22, [
+            ("ratings.bookinfo", "GET /ratings/0", 4, 8, []),
+        ]),
+    ],
+)
+
+
+def _build_trace(rng: random.Random, index: int, start_s: float) -> list[dict]:
+    """Flat span dicts (ids, parent, service, operation, start/end in microseconds)."""
+    slow = index % 3 == 0
+    failing = index % 5 == 0
+    trace_id = f"{rng.getrandbits(128):032x}"
+    spans = []
+
+    def add(node, parent_id, parent_start_us):
+        service, operation, offset_ms, duration_ms, children = node
+        if slow and service in ("reviews.bookinfo", "ratings.bookinfo"):
+            duration_ms *= 25
+        duration_ms *= rng.uniform(0.8, 1.2)
+        span_id = f"{rng.getrandbits(64):016x}"
+        start_us = parent_start_us + offset_ms * 1000
+        end_us = start_us + duration_ms * 1000
+        child_end = start_us
+        for child in children:
+            child_end = max(child_end, add(child, span_id, start_us))
+        end_us = max(end_us, child_end + 1000)
+        spans.append({
+            "traceId": trace_id, "spanId": span_id, "parentSpanId": parent_id,
+            "service": service, "operation": operation,
+            "startUs": start_us, "endUs": end_us,
+            "error": failing and service == "ratings.bookinfo",
+        })
+        return end_us
+
+    add(_BOOKINFO_SHAPE, None, start_s * 1e6)
+    return spans
+
+
+def _tempo_trace(spans: list[dict]) -> dict:
+    by_service: dict[str, list] = {}
+    for s in spans:
+        by_service.setdefault(s["service"], []).append({
+            "traceId": s["traceId"],
+            "spanId": s["spanId"],
+            **({"parentSpanId": s["parentSpanId"]} if s["parentSpanId"] else {}),
+            "name": s["operation"],
+            "startTimeUnixNano": str(int(s["startUs"] * 1000)),
+            "endTimeUnixNano": str(int(s["endUs"] * 1000)),
+            "status": {"code": "STATUS_CODE_ERROR"} if s["error"] else {},
+        })
+    return {"batches": [
+        {"resource": {"attributes": [{"key": "service.name", "value": {"stringValue": svc}}]},
+         "scopeSpans": [{"spans": svc_spans}]}
+        for svc, svc_spans in by_service.items()
+    ]}
+
+
+def _jaeger_trace(spans: list[dict]) -> dict:
+    processes = {}
+    out = []
+    for s in spans:
+        pid = processes.setdefault(s["service"], f"p{len(processes) + 1}")
+        out.append({
+            "traceID": s["traceId"],
+            "spanID": s["spanId"],
+            "operationName": s["operation"],
+            "references": [{"refType": "CHILD_OF", "traceID": s["traceId"], "spanID": s["parentSpanId"]}]
+            if s["parentSpanId"] else [],
+            "startTime": int(s["startUs"]),
+            "duration": int(s["endUs"] - s["startUs"]),
+            "processID": pid,
+            "tags": [{"key": "error", "type": "bool", "value": True}] if s["error"] else [],
+        })
+    return {"traceID": spans[0]["traceId"], "spans": out,
+            "processes": {pid: {"serviceName": svc} for svc, pid in processes.items()}}
+
+
+_LOG_PODS = {
+    "productpage-v1-7d9c7b8f5-x2kqp": ("productpage", ["GET /productpage HTTP/1.1 200", "Fetching reviews"]),
+    "details-v1-6b8d9f7c4-m4n8z": ("details", ["GET /details/0 200"]),
+    "reviews-v2-5c8f7d6b9-h7j2k": ("reviews", ["GET /reviews/0 200", "Calling ratings service"]),
+    "ratings-v1-84f7c9d6b-q9w3e": ("ratings", [
+        "Server listening on 9080",
+        "Error: invalid configuration: MYSQL_DB_HOST is not set",
+        "FATAL: exiting with status 1",
+    ]),
+}
+
+_LABEL = re.compile(r'(\w+)\s*=\s*(`[^`]*`|"(?:[^"\\]|\\.)*")')
+_FILTER = re.compile(r'\|([=~])\s*(`[^`]*`|"(?:[^"\\]|\\.)*")')
+
+
+def _unquote(literal: str) -> str:
+    return literal[1:-1] if literal.startswith("`") else json.loads(literal)
+
+
+def _build_logs(rng: random.Random, now: float) -> list[dict]:
+    """One line every ~10s per pod over the last 30 minutes."""
+    entries = []
+    for pod, (container, lines) in _LOG_PODS.items():
+        ts = now - 1800
+        while ts < now:
+            entries.append({"ts": int(ts * 1e9), "pod": pod, "container": container, "line": rng.choice(lines)})
+            ts += rng.uniform(5, 15)
+    return entries
+
+
+class FakeBackends:
+    def __init__(self, flavor: str, traces: int, seed: int):
+        rng = random.Random(seed)
+        now = time.time()
+        self.flavor = flavor
+        self.traces = {}
+        for i in range(traces):
+            spans = _build_trace(rng, i, now - (traces - i) * 5)
+            self.traces[spans[0]["traceId"]] = spans
+        self.logs = _build_logs(rng, now)
+
+    def loki_query_range(self, query: dict) -> dict:
+        logql = query.get("query", [""])[0]
+        selector, _, pipeline = logql.partition("}")
+        labels = {k: _unquote(v) for k, v in _LABEL.findall(selector)}
+        filters = [(op, _unquote(v)) for op, v in _FILTER.findall(pipeline)]
+        start = int(query.get("start", ["0"])[0])
+        end = int(query.get("end", [str(time.time_ns())])[0])
+        limit = int(query.get("limit", ["100"])[0])
+        backward = query.get("direction", ["backward"])[0] == "backward"
+
+        matched = []
+        for e in self.logs:
+            stream = {"namespace": "bookinfo", "pod": e["pod"], "container": e["container"]}
+            if any(stream.get(k) != v for k, v in labels.items()) or not start <= e["ts"] <= end:
+                continue
+            if all((v in e["line"]) if op == "=" else re.search(v, e["line"]) for op, v in filters):
+                matched.append((stream, e))
+        matched.sort(key=lambda m: m[1]["ts"], reverse=backward)
+
+        streams: dict[tuple, dict] = {}
+        for stream, e in matched[:limit]:
+            key = tuple(sorted(stream.items()))
+            streams.setdefault(key, {"stream": stream, "values": []})["values"].append([str(e["ts"]), e["line"]])
+        return {"status": "success", "data": {"resultType": "streams", "result": list(streams.values())}}
+
+    def handle(self, path: str, query: dict) -> tuple[int, dict]:
+        if path == "/loki/api/v1/query_range":
+            return 200, self.loki_query_range(query)
+        if path.startswith("/api/traces/"):
+            spans = self.traces.get(path.rsplit("/", 1)[1])
+            if spans is None:
+                return 404, {"error": "trace not found"}
+            if self.flavor == "jaeger":
+                return 200, {"data": [_jaeger_trace(spans)]}
+            return 200, _tempo_trace(spans)
+        if path == "/api/traces" and self.flavor == "jaeger":
+            service = query.get("service", [""])[0]
+            limit = int(query.get("limit", ["20"])[0])
+            matching = [s for s in self.traces.values() if any(x["service"] == service for x in s)]
+            return 200, {"data": [_jaeger_trace(s) for s in matching[-limit:]]}
+        if path == "/api/search" and self.flavor == "tempo":
+            tags = query.get("tags", [""])[0]
+            service = tags.split("=", 1)[1] if tags.startswith("service.name=") else None
+            limit = int(query.get("limit", ["20"])[0])
+            found = []
+            for trace_id, spans in self.traces.items():
+                root = min(spans, key=lambda s: s["startUs"])
+                if service and not any(s["service"] == service for s in spans):
+                    continue
+                found.append({
+                    "traceID": trace_id,
+                    "rootServiceName": root["service"],
+                    "rootTraceName": root["operation"],
+                    "startTimeUnixNano": str(int(root["startUs"] * 1000)),
+                    "durationMs": int((root["endUs"] - root["startUs"]) / 1000),
+                })
+            return 200, {"traces": found[-limit:]}
+        return 404, {"error": f"unknown path {path}"}
+
+
+def make_server(backends: FakeBackends, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """HTTP server for ``backends`` (port 0 picks a free port; tests read it from server_address)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            status, body = backends.handle(url.path, parse_qs(url.query))
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flavor", choices=("tempo", "jaeger"), default="tempo")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3200)
+    parser.add_argument("--traces", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    backends = FakeBackends(args.flavor, args.traces, args.seed)
+    print(f"Serving {len(backends.traces)} fake {args.flavor} traces and {len(backends.logs)} "
+          f"Loki log lines on http://{args.host}:{args.port}")
+    make_server(backends, args.host, args.port).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,12 +18,29 @@ import re
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import httpx
 from kubernetes import client, config
 
+# Vectorized Prometheus summarizer shared with the tools server
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+from otel_tools_server.steps import format_step, parse_timestamp, plan_step
+from otel_tools_server.summarize import summarize_response
+from otel_tools_server.truncation import fit_to_budget
+
+# Phase gates shared with the harness runner
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "harness"))
+from runner.gates import (
+    DEFAULT_BASELINE_GATE, DEFAULT_FAULT_GATES,
+    Gate, SeriesBuffer, target_selector,
+)
+from runner.prompts import canonical_tools, prefix_digest
+from runner.streaming import chat_completion, summarize_turns
+from runner.structured import ANSWER_PROMPT, RESPONSE_FORMAT_REJECTED, parse_answer, response_format
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
@@ -58,8 +75,19 @@ NAMESPACE = "bookinfo"
 DEPLOYMENT = "reviews-v2"
 FAULT_TYPE = "cpu_saturation"
 
+# Phase deadlines — each phase ends as soon as its gate (runner/gates.py) holds
 BASELINE_WAIT = 30      # seconds (shortened for local run)
 INJECTION_WAIT = 90     # seconds for fault to propagate
+ROLLOUT_WAIT = 30       # seconds for a cleanup rollout to finish
+GATE_POLL_SECONDS = 5
+FAULT_SETTLE_SECONDS = 10  # keep the fault running briefly after it first shows
+LOG_FANOUT_WORKERS = 8  # concurrent pod log reads in search_pod_logs
+TOOL_RESULT_TOKEN_BUDGET = 750  # per tool message, enforced by fit_to_budget
+EVIDENCE_CONCURRENCY = 6        # evidence queries in flight at once
+EVIDENCE_QUERY_TIMEOUT = 30     # seconds per evidence query
+# Guided-JSON final answers (runner/structured.py); a model config's
+# "structured_output" key overrides this per endpoint.
+STRUCTURED_OUTPUT = os.environ.get("AGENT_STRUCTURED_OUTPUT", "false").lower() in ("1", "true", "yes")
 
 # MLFlow experiment tracking (opinionated — every run logs to MLFlow)
 from mlflow_utils import (
@@ -182,9 +210,10 @@ async def query_prometheus(query: str, start: str = None, end: str = None,
     async with httpx.AsyncClient(verify=False, timeout=30.0) as c:
         try:
             if start and end:
+                step = format_step(plan_step(query, parse_timestamp(start), parse_timestamp(end)))
                 resp = await c.get(
                     f"{THANOS_ROUTE}/api/v1/query_range",
-                    params={"query": query, "start": start, "end": end, "step": "30s"},
+                    params={"query": query, "start": start, "end": end, "step": step},
                     headers=headers,
                 )
             else:
@@ -208,30 +237,8 @@ async def query_prometheus(query: str, start: str = None, end: str = None,
 
 
 def _summarize_prom(prom_response: dict) -> dict:
-    """Compact summary of Prometheus response."""
-    result_type = prom_response.get("data", {}).get("resultType", "unknown")
-    results = prom_response.get("data", {}).get("result", [])
-    summarized = []
-    for r in results[:20]:
-        metric = r.get("metric", {})
-        if result_type == "matrix":
-            values = r.get("values", [])
-            nums = [float(v[1]) for v in values if v[1] != "NaN"]
-            summarized.append({
-                "metric": metric,
-                "samples": len(values),
-                "min": round(min(nums), 4) if nums else None,
-                "max": round(max(nums), 4) if nums else None,
-                "avg": round(sum(nums) / len(nums), 4) if nums else None,
-                "latest": values[-1][1] if values else None,
-            })
-        elif result_type == "vector":
-            value = r.get("value", [None, None])
-            summarized.append({"metric": metric, "value": value[1] if len(value) > 1 else None})
-        else:
-            summarized.append({"metric": metric, "raw": r})
-    return {"status": prom_response.get("status"), "resultType": result_type,
-            "resultCount": len(results), "data": summarized}
+    """Compact summary of Prometheus response (same summarizer as the tools server)."""
+    return summarize_response(prom_response)
 
 
 # ---------------------------------------------------------------------------
@@ -269,25 +276,39 @@ def get_k8s_events(namespace: str, since_minutes: int = 30) -> list:
 
 
 def search_pod_logs(namespace: str, search_text: str = "error", limit: int = 50) -> list:
+    """Grep recent logs of every Running pod, reading pods concurrently.
+
+    Results keep pod-list order; pods not yet started once ``limit`` lines are
+    collected are cancelled.
+    """
     load_k8s()
     v1 = client.CoreV1Api()
     pod_list = v1.list_namespaced_pod(namespace=namespace)
-    results = []
-    for p in pod_list.items:
-        if p.status.phase != "Running":
-            continue
+    pods = [p.metadata.name for p in pod_list.items if p.status.phase == "Running"]
+
+    def _read(pod_name: str) -> list:
         try:
             log_text = v1.read_namespaced_pod_log(
-                name=p.metadata.name, namespace=namespace,
+                name=pod_name, namespace=namespace,
                 since_seconds=1800, tail_lines=100,
             )
-            lines = log_text.strip().split("\n") if log_text else []
-            if search_text:
-                lines = [l for l in lines if search_text.lower() in l.lower()]
-            for line in lines[:10]:
-                results.append({"pod": p.metadata.name, "log": line})
         except Exception:
-            pass
+            return []
+        lines = log_text.strip().split("\n") if log_text else []
+        if search_text:
+            lines = [l for l in lines if search_text.lower() in l.lower()]
+        return [{"pod": pod_name, "log": line} for line in lines[:10]]
+
+    results = []
+    pool = ThreadPoolExecutor(max_workers=LOG_FANOUT_WORKERS)
+    try:
+        futures = [pool.submit(_read, name) for name in pods]
+        for fut in futures:
+            results.extend(fut.result())
+            if len(results) >= limit:
+                break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
     return results[:limit]
 
 
@@ -385,37 +406,123 @@ def _c2d(c) -> dict:
     return d
 
 
+# ---------------------------------------------------------------------------
+# Phase gates
+# ---------------------------------------------------------------------------
+
+async def wait_for_gate(gate: Gate, namespace: str, target: str, deadline: float,
+                        since: datetime = None) -> dict:
+    """Poll Thanos (and events) until ``gate`` holds for ``target`` or ``deadline`` seconds pass.
+
+    Returns the gate's match ({"time", "signal"}) or None on deadline.
+    """
+    buffer = SeriesBuffer()
+    queries = gate.queries(target_selector(namespace, target))
+    needs_events = any("eventReason" in p for p in gate.predicates)
+    end = time.monotonic() + deadline
+    while True:
+        ts = datetime.now(timezone.utc).isoformat()
+        results = await asyncio.gather(*(query_prometheus(q) for q in queries.values()))
+        for name, result in zip(queries, results):
+            buffer.record_metric(name, result.get("data", []), ts)
+        if needs_events:
+            buffer.record_events(await asyncio.to_thread(get_k8s_events, namespace, 5), ts)
+        buffer.samples += 1
+
+        match = gate.evaluate(buffer, target, since)
+        if match:
+            log.info(f"Gate {gate.name} open for {target}: {match['signal']}")
+            return match
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            log.info(f"Gate {gate.name} for {target} did not hold within {deadline:g}s; continuing")
+            return None
+        await asyncio.sleep(min(GATE_POLL_SECONDS, remaining))
+
+
+async def wait_for_rollout(namespace: str, name: str, deadline: float) -> bool:
+    """Poll until the deployment's new ReplicaSet is fully rolled out and ready."""
+    apps_v1 = client.AppsV1Api()
+    end = time.monotonic() + deadline
+    while time.monotonic() < end:
+        d = await asyncio.to_thread(apps_v1.read_namespaced_deployment, name, namespace)
+        st = d.status
+        want = d.spec.replicas or 0
+        if ((st.observed_generation or 0) >= d.metadata.generation
+                and (st.updated_replicas or 0) == want
+                and (st.ready_replicas or 0) == want
+                and (st.replicas or 0) == want):
+            return True
+        await asyncio.sleep(min(GATE_POLL_SECONDS, max(end - time.monotonic(), 0)))
+    log.warning(f"{namespace}/{name} rollout not finished after {deadline:g}s; continuing")
+    return False
+
+
 # ---------------------------------------------------------------------------
 # Evidence collection
 # ---------------------------------------------------------------------------
 
+async def gather_evidence(calls: dict) -> tuple[dict, dict]:
+    """Run named evidence calls concurrently with a bound and a per-call timeout.
+
+    ``calls`` maps a name to an awaitable; sync K8s helpers are passed as
+    ``asyncio.to_thread(...)``. A call that fails or times out yields
+    ``{"error": ...}``. Returns (results, timings_ms incl. "total").
+    """
+    sem = asyncio.Semaphore(EVIDENCE_CONCURRENCY)
+    timings = {}
+
+    async def run(name, coro):
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                return await asyncio.wait_for(coro, timeout=EVIDENCE_QUERY_TIMEOUT)
+            except asyncio.TimeoutError:
+                log.warning(f"Evidence query {name} timed out after {EVIDENCE_QUERY_TIMEOUT}s")
+                return {"error": f"timed out after {EVIDENCE_QUERY_TIMEOUT}s"}
+            except Exception as e:
+                log.warning(f"Evidence query {name} failed: {e}")
+                return {"error": str(e)}
+            finally:
+                timings[name] = round((time.perf_counter() - t0) * 1000, 1)
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(run(name, coro) for name, coro in calls.items()))
+    timings["total"] = round((time.perf_counter() - t0) * 1000, 1)
+    log.info(f"Evidence collected in {timings['total']} ms (slowest: "
+             f"{max((k for k in timings if k != 'total'), key=timings.get, default='-')})")
+    return dict(zip(calls, results)), timings
+
+
 async def collect_evidence(namespace: str, deployment_name: str,
                            start_time: str, end_time: str) -> dict:
-    evidence = {
-        "collection_time": datetime.now(timezone.utc).isoformat(),
+    collection_time = datetime.now(timezone.utc).isoformat()
+    metric_queries = {
+        "cpu": (f'rate(container_cpu_usage_seconds_total{{namespace="{namespace}"}}[5m])',
+                start_time, end_time),
+        "memory": (f'container_memory_working_set_bytes{{namespace="{namespace}", '
+                   f'pod=~"{deployment_name}.*"}}', start_time, end_time),
+        "restarts": (f'kube_pod_container_status_restarts_total{{namespace="{namespace}"}}',),
+        "pod_status": (f'kube_pod_status_phase{{namespace="{namespace}"}}',),
+    }
+    calls = {f"metrics.{key}": query_prometheus(*args) for key, args in metric_queries.items()}
+    calls["events"] = asyncio.to_thread(get_k8s_events, namespace, since_minutes=15)
+    calls["logs"] = asyncio.to_thread(search_pod_logs, namespace, "error", 30)
+
+    results, timings = await gather_evidence(calls)
+    return {
+        "collection_time": collection_time,
         "window": {"start": start_time, "end": end_time},
-        "metrics": {}, "events": [], "logs": [],
+        "metrics": {key: results[f"metrics.{key}"] for key in metric_queries},
+        "events": evidence_list(results["events"]),
+        "logs": evidence_list(results["logs"]),
+        "timings_ms": timings,
     }
 
-    evidence["metrics"]["cpu"] = await query_prometheus(
-        f'rate(container_cpu_usage_seconds_total{{namespace="{namespace}"}}[5m])',
-        start_time, end_time,
-    )
-    evidence["metrics"]["memory"] = await query_prometheus(
-        f'container_memory_working_set_bytes{{namespace="{namespace}", '
-        f'pod=~"{deployment_name}.*"}}',
-        start_time, end_time,
-    )
-    evidence["metrics"]["restarts"] = await query_prometheus(
-        f'kube_pod_container_status_restarts_total{{namespace="{namespace}"}}',
-    )
-    evidence["metrics"]["pod_status"] = await query_prometheus(
-        f'kube_pod_status_phase{{namespace="{namespace}"}}',
-    )
-    evidence["events"] = get_k8s_events(namespace, since_minutes=15)
-    evidence["logs"] = search_pod_logs(namespace, "error", 30)
 
-    return evidence
+def evidence_list(result) -> list:
+    """Events/logs are lists; a failed call's {"error": ...} becomes a one-item list."""
+    return result if isinstance(result, list) else [result]
 
 
 def build_evidence_summary(evidence: dict) -> str:
@@ -555,13 +662,22 @@ RAG_TOOL_DEFINITION = {
 }
 
 
-RAG_SYSTEM_PROMPT = (
+DEFAULT_SYSTEM_PROMPT = (
     "You are an expert SRE AI agent investigating an operational incident "
     "in a Kubernetes-based microservices application called Bookinfo. "
     "Services: productpage (frontend), details, reviews (v1, v2, v3), ratings. "
     "Dependency chain: productpage -> reviews -> ratings. "
     "You MUST use the available tools to gather evidence before drawing conclusions. "
     "Do not guess — query metrics, check events, and search logs to build your case. "
+    "After investigation, provide your findings as JSON with keys: "
+    "incident_summary, rca_ranked (list of strings like 'bookinfo/reviews-v2:cpu_saturation'), "
+    "recommended_action, evidence_links (list of strings referencing specific "
+    "metrics or events you discovered)."
+)
+
+# The Lightspeed prompt extends the default one, so both variants share the
+# default prompt as a cached prefix on the same endpoint (runner/prompts.py).
+RAG_SYSTEM_PROMPT = DEFAULT_SYSTEM_PROMPT + (
     "\n\n"
     "You have access to a searchDocumentation tool containing curated OpenShift "
     "and Kubernetes documentation (powered by OpenShift Lightspeed). If you are "
@@ -569,25 +685,17 @@ RAG_SYSTEM_PROMPT = (
     "documentation search first, then immediately move on to querying live systems. "
     "Do NOT spend more than one tool call on documentation — your primary job is "
     "to investigate the actual incident using getMetricHistory, getK8sEvents, and "
-    "searchLogs. "
-    "\n\n"
-    "After investigation, provide your findings as JSON with keys: "
-    "incident_summary, rca_ranked (list of strings like 'bookinfo/reviews-v2:cpu_saturation'), "
-    "recommended_action, evidence_links (list of strings referencing specific "
-    "metrics or events you discovered)."
+    "searchLogs."
 )
 
-DEFAULT_SYSTEM_PROMPT = (
-    "You are an expert SRE AI agent investigating an operational incident "
-    "in a Kubernetes-based microservices application called Bookinfo. "
-    "Services: productpage (frontend), details, reviews (v1, v2, v3), ratings. "
-    "Dependency chain: productpage -> reviews -> ratings. "
-    "You MUST use the available tools to gather evidence before drawing conclusions. "
-    "Do not guess — query metrics, check events, and search logs to build your case. "
-    "After investigation, provide your findings as JSON with keys: "
-    "incident_summary, rca_ranked (list of strings like 'bookinfo/reviews-v2:cpu_saturation'), "
-    "recommended_action, evidence_links (list of strings referencing specific "
-    "metrics or events you discovered)."
+# Canonically serialized once, so every request carries byte-identical tools
+AGENT_TOOLS = canonical_tools(TOOL_DEFINITIONS)
+RAG_AGENT_TOOLS = canonical_tools(TOOL_DEFINITIONS + [RAG_TOOL_DEFINITION])
+
+AGENT_INSTRUCTIONS = (
+    "Use the available tools to investigate this incident. "
+    "Query Prometheus metrics, check Kubernetes events, and search pod logs "
+    "to determine the root cause. Provide your root cause analysis as JSON."
 )
 
 
@@ -599,55 +707,82 @@ async def invoke_agent(model_key: str, model_cfg: dict, evidence: dict,
     The agent must discover all evidence through tool calls. This prevents
     models from simply parroting back handed answers and ensures the harness
     tests genuine investigative ability.
+
+    Responses are streamed (unless the model config sets ``"stream": False``)
+    so each turn's TTFT, inter-token latency, tokens/s and token usage are
+    returned under ``llm_turns`` / ``llm_stats``.
     """
+    llm_turns: list[dict] = []
+    output = await _invoke_agent_turns(model_key, model_cfg, incident_desc, llm_turns)
+    output["llm_turns"] = llm_turns
+    rag_enabled = model_cfg.get("rag_enabled", False)
+    output["llm_stats"] = {
+        **summarize_turns(llm_turns),
+        "prefix_digest": prefix_digest(RAG_SYSTEM_PROMPT if rag_enabled else DEFAULT_SYSTEM_PROMPT,
+                                       RAG_AGENT_TOOLS if rag_enabled else AGENT_TOOLS),
+    }
+    return output
+
+
+async def _invoke_agent_turns(model_key: str, model_cfg: dict, incident_desc: str,
+                              llm_turns: list[dict]) -> dict:
     rag_enabled = model_cfg.get("rag_enabled", False)
     system_prompt = RAG_SYSTEM_PROMPT if rag_enabled else DEFAULT_SYSTEM_PROMPT
-    tools = TOOL_DEFINITIONS + ([RAG_TOOL_DEFINITION] if rag_enabled else [])
+    tools = RAG_AGENT_TOOLS if rag_enabled else AGENT_TOOLS
 
+    # Static instructions before the incident text, so only the tail differs per incident
     messages = [
         {"role": "system", "content": system_prompt},
-        {
-            "role": "user",
-            "content": (
-                f"INCIDENT ALERT:\n{incident_desc}\n\n"
-                "Use the available tools to investigate this incident. "
-                "Query Prometheus metrics, check Kubernetes events, and search pod logs "
-                "to determine the root cause. Provide your root cause analysis as JSON."
-            ),
-        },
+        {"role": "user", "content": f"{AGENT_INSTRUCTIONS}\n\nINCIDENT ALERT:\n{incident_desc}"},
     ]
 
     tool_calls_log = []
     base_url = model_cfg["base_url"]
     headers = {**model_cfg["headers"], "Content-Type": "application/json"}
+    structured = model_cfg.get("structured_output", STRUCTURED_OUTPUT)
 
     async with httpx.AsyncClient(timeout=300.0, verify=False) as c:
+        async def chat(body: dict):
+            nonlocal structured
+            request = {"model": model_cfg["model_id"], **body}
+            try:
+                message, stats = await chat_completion(
+                    c, f"{base_url}/chat/completions", request,
+                    headers=headers, stream=model_cfg.get("stream", True),
+                )
+            except httpx.HTTPStatusError as e:
+                if "response_format" not in body or e.response.status_code not in RESPONSE_FORMAT_REJECTED:
+                    raise
+                # No guided decoding on this endpoint: resend the turn unguided
+                log.warning(f"[{model_key}] Server rejected response_format ({e.response.status_code}), "
+                            f"answering unguided")
+                structured = False
+                del request["response_format"]
+                message, stats = await chat_completion(
+                    c, f"{base_url}/chat/completions", request,
+                    headers=headers, stream=model_cfg.get("stream", True),
+                )
+            llm_turns.append({"round": len(llm_turns) + 1, **stats})
+            log.info(f"[{model_key}] Turn {len(llm_turns)}: TTFT {stats['ttft_ms']}ms, "
+                     f"{stats['completion_tokens']} tokens at {stats['tokens_per_second']} tok/s")
+            return message
+
         # --- First call: with tools ---
         log.info(f"[{model_key}] Sending initial request with tools...")
         try:
-            resp = await c.post(
-                f"{base_url}/chat/completions",
-                headers=headers,
-                json={
-                    "model": model_cfg["model_id"],
-                    "messages": messages,
-                    "tools": tools,
-                    "tool_choice": "auto",
-                    "max_tokens": model_cfg["max_tokens"],
-                },
-            )
-            resp.raise_for_status()
-            result = resp.json()
+            message = await chat({
+                "messages": messages,
+                "tools": tools,
+                "tool_choice": "auto",
+                "max_tokens": model_cfg["max_tokens"],
+            })
         except Exception as e:
             log.error(f"[{model_key}] Initial call failed: {e}")
             return _fallback_output(str(e), tool_calls_log)
 
-        choices = result.get("choices", [])
-        if not choices:
+        if message is None:
             return _fallback_output("No choices in response", tool_calls_log)
 
-        message = choices[0].get("message", {})
-
         # --- Process tool calls ---
         max_rounds = 3
         round_num = 0
@@ -685,57 +820,55 @@ async def invoke_agent(model_key: str, model_cfg: dict, evidence: dict,
                 messages.append({
                     "role": "tool",
                     "tool_call_id": tc.get("id", f"call_{round_num}"),
-                    "content": json.dumps(tool_result, default=str)[:3000],
+                    "content": json.dumps(fit_to_budget(tool_result, TOOL_RESULT_TOKEN_BUDGET), default=str),
                 })
 
-            # --- Follow-up call ---
+            # --- Follow-up call; with structured output the last one is the guided answer ---
+            body = {
+                "messages": messages,
+                "tools": tools,
+                "tool_choice": "auto",
+                "max_tokens": model_cfg["max_tokens"],
+            }
+            if structured and round_num == max_rounds:
+                messages.append({"role": "user", "content": ANSWER_PROMPT})
+                body.update(tool_choice="none", response_format=response_format())
             try:
-                resp2 = await c.post(
-                    f"{base_url}/chat/completions",
-                    headers=headers,
-                    json={
-                        "model": model_cfg["model_id"],
-                        "messages": messages,
-                        "tools": tools,
-                        "tool_choice": "auto",
-                        "max_tokens": model_cfg["max_tokens"],
-                    },
-                )
-                resp2.raise_for_status()
-                result2 = resp2.json()
-                choices = result2.get("choices", [])
-                if choices:
-                    message = choices[0].get("message", {})
+                reply = await chat(body)
+                if reply is not None:
+                    message = reply
                 else:
                     break
             except Exception as e:
                 log.warning(f"[{model_key}] Follow-up call failed: {e}")
                 break
 
-        # --- If content is empty after tool rounds, make a final call without tools ---
-        content = message.get("content", "")
-        if not content or len(content) < 10:
+        content = message.get("content") or ""
+        final_body = None
+        if structured and not content:
+            # --- No answer at all (e.g. a failed follow-up): one guided-JSON answer-only call ---
+            # A free-text answer is parsed as it is rather than paying for a restate.
+            log.info(f"[{model_key}] Empty response after tool rounds, making final guided-JSON call...")
+            messages.append({"role": "user", "content": ANSWER_PROMPT})
+            final_body = {"messages": messages, "max_tokens": model_cfg["max_tokens"],
+                          "response_format": response_format()}
+        elif not content or len(content) < 10:
+            # --- If content is empty after tool rounds, make a final answer-only call ---
             log.info(f"[{model_key}] Empty response after tool rounds, making final text-only call...")
             messages.append({"role": "user", "content": (
                 "Based on all the tool results above, please provide your final root cause analysis "
                 "as a JSON object with keys: incident_summary, rca_ranked (list of strings like "
                 "'bookinfo/reviews-v2:cpu_saturation'), recommended_action, evidence_links (list of strings)."
             )})
+            final_body = {"messages": messages, "max_tokens": model_cfg["max_tokens"]}
+
+        if final_body is not None:
+            # Same tools as the earlier turns (calls disabled) so the cached prefix still matches
+            final_body.update(tools=tools, tool_choice="none")
             try:
-                resp_final = await c.post(
-                    f"{base_url}/chat/completions",
-                    headers=headers,
-                    json={
-                        "model": model_cfg["model_id"],
-                        "messages": messages,
-                        "max_tokens": model_cfg["max_tokens"],
-                    },
-                )
-                resp_final.raise_for_status()
-                result_final = resp_final.json()
-                choices = result_final.get("choices", [])
-                if choices:
-                    content = choices[0].get("message", {}).get("content", "")
+                reply = await chat(final_body)
+                if reply is not None:
+                    content = reply.get("content") or ""
             except Exception as e:
                 log.warning(f"[{model_key}] Final text call failed: {e}")
 
@@ -745,6 +878,12 @@ async def invoke_agent(model_key: str, model_cfg: dict, evidence: dict,
 
 def _parse_response(content: str, tool_calls: list) -> dict:
     """Parse LLM response into structured aiops_output."""
+    # Schema-conforming JSON (always the case for a guided answer)
+    parsed = parse_answer(content)
+    if parsed is not None:
+        parsed["tool_calls"] = tool_calls
+        parsed["raw_response"] = content[:2000]
+        return parsed
     # Try JSON extraction
     try:
         # Find JSON block (possibly in markdown code fence)
@@ -1028,7 +1167,11 @@ average. Weight rca_accuracy and evidence_quality most heavily.\
 
 
 def _format_judge_input(truth: dict, subject_output: dict) -> str:
-    """Build the user message for the judge, containing ground truth + agent output."""
+    """Build the user message for the judge, containing ground truth + agent output.
+
+    Ground truth comes first: it is identical for every subject a judge scores
+    in a run, so it extends the judge's cached system-prompt prefix.
+    """
     # Summarize tool calls concisely
     tool_summary = []
     for tc in subject_output.get("tool_calls", []):
@@ -1198,8 +1341,8 @@ async def run_benchmark():
         if "stress-injector" in container_names:
             log.warning("Leftover stress-injector found — cleaning up before benchmark...")
             remove_cpu_saturation(NAMESPACE, DEPLOYMENT)
-            log.info("Waiting 30s for clean pods to stabilize...")
-            await asyncio.sleep(30)
+            log.info(f"Waiting up to {ROLLOUT_WAIT}s for clean pods to roll out...")
+            await wait_for_rollout(NAMESPACE, DEPLOYMENT, ROLLOUT_WAIT)
     except Exception:
         pass
     pods = v1.list_namespaced_pod(namespace=NAMESPACE)
@@ -1222,10 +1365,11 @@ async def run_benchmark():
 
     # --- Phase 1: Baseline ---
     log.info(f"\n{'='*60}")
-    log.info(f"Phase 1: Baseline ({BASELINE_WAIT}s)")
+    log.info(f"Phase 1: Baseline (up to {BASELINE_WAIT}s, until CPU is stable)")
     log.info(f"{'='*60}")
     baseline_start = datetime.now(timezone.utc)
-    await asyncio.sleep(BASELINE_WAIT)
+    await wait_for_gate(Gate.from_spec("baseline", DEFAULT_BASELINE_GATE),
+                        NAMESPACE, DEPLOYMENT, BASELINE_WAIT)
 
     # --- Phase 2: Inject ---
     log.info(f"\n{'='*60}")
@@ -1240,9 +1384,12 @@ async def run_benchmark():
 
     # --- Phase 3: Wait for propagation ---
     log.info(f"\n{'='*60}")
-    log.info(f"Phase 3: Waiting {INJECTION_WAIT}s for fault to propagate...")
+    log.info(f"Phase 3: Waiting up to {INJECTION_WAIT}s for fault to propagate...")
     log.info(f"{'='*60}")
-    await asyncio.sleep(INJECTION_WAIT)
+    fault_onset = await wait_for_gate(Gate.from_spec("fault", DEFAULT_FAULT_GATES[FAULT_TYPE]),
+                                      NAMESPACE, DEPLOYMENT, INJECTION_WAIT, since=inject_start)
+    if fault_onset:
+        await asyncio.sleep(FAULT_SETTLE_SECONDS)
 
     # --- Phase 4: Collect evidence ---
     log.info(f"\n{'='*60}")
@@ -1254,6 +1401,7 @@ async def run_benchmark():
         NAMESPACE, DEPLOYMENT,
         evidence_start.isoformat(), evidence_end.isoformat(),
     )
+    evidence["fault_onset"] = fault_onset
     log.info(f"Evidence collected: {len(evidence.get('metrics', {}))} metric types, "
              f"{len(evidence.get('events', []))} events, {len(evidence.get('logs', []))} log entries")
 
@@ -1307,6 +1455,7 @@ async def run_benchmark():
             tool_calls=aiops_output.get("tool_calls", []),
             rca_output=aiops_output,
             investigation_time_seconds=elapsed,
+            llm_turns=aiops_output.get("llm_turns"),
             mlflow_url=MLFLOW_AIOPS_URL,
             tags={"model_key": model_key, "rag_enabled": str(model_cfg.get("rag_enabled", False))},
         )
@@ -150,11 +150,14 @@ def log_aiops_run(
     mttd_seconds: float | None = None,
     mlflow_url: str | None = None,
     tags: dict[str, str] | None = None,
+    llm_turns: list[dict[str, Any]] | None = None,
 ) -> str | None:
     """Log an AIOps pipeline investigation run to the AIOps MLFlow instance.
 
     Tracks the pipeline's behavior: what model was used, what tools were
     called, how long the investigation took, and what the pipeline concluded.
+    ``llm_turns`` (per-turn TTFT, inter-token latency, tokens/s and token
+    usage) is logged as stepped ``llm_*`` metrics, one step per model turn.
 
     Returns the MLFlow run ID, or None if logging failed/unavailable.
     """
@@ -197,6 +200,24 @@ def log_aiops_run(
             # Distinct tool types used
             mlflow.log_metric("tool_types_used", len(tool_type_counts))
 
+            # Model serving latency/throughput, per turn and totals
+            if llm_turns:
+                for step, turn in enumerate(llm_turns):
+                    for key in ("ttft_ms", "inter_token_ms_mean", "inter_token_ms_p95", "tokens_per_second",
+                                "prompt_tokens", "completion_tokens", "cached_tokens", "total_ms"):
+                        if turn.get(key) is not None:
+                            mlflow.log_metric(f"llm_{key}", turn[key], step=step)
+                mlflow.log_metric("llm_turns", len(llm_turns))
+                for key in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+                    mlflow.log_metric(f"llm_{key}_total", sum(t.get(key) or 0 for t in llm_turns))
+                if llm_turns[0].get("ttft_ms") is not None:
+                    mlflow.log_metric("llm_ttft_ms_first", llm_turns[0]["ttft_ms"])
+                cache_reported = [t for t in llm_turns if t.get("cached_tokens") is not None]
+                prompt_reported = sum(t.get("prompt_tokens") or 0 for t in cache_reported)
+                if prompt_reported:
+                    mlflow.log_metric("llm_cached_token_ratio",
+                                      sum(t["cached_tokens"] for t in cache_reported) / prompt_reported)
+
             # RCA output
             if rca_output:
                 rca_ranked = rca_output.get("rca_ranked", [])
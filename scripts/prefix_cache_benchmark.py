@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Prefix-cache benchmark — cached prompt tokens for the agent's prompt layout.
+
+Replays short agent conversations against an OpenAI-compatible endpoint
+(vLLM with automatic prefix caching) and reports how many prompt tokens each
+request got from the prefix cache. Each conversation is one synthetic
+incident with two turns: a tool round, then the answer round with one tool
+result added. Two layouts are compared:
+
+  stable  the runner's layout (runner/prompts.py): static system prompt and
+          canonical tools first, tools sent on every turn (answer round uses
+          tool_choice "none")
+  legacy  the answer round drops the tools, as the runner used to, which
+          changes the rendered prefix of the whole conversation
+
+Cached-token counts come from ``usage.prompt_tokens_details.cached_tokens``,
+which vLLM only reports when started with ``--enable-prompt-tokens-details``.
+When the server's /metrics endpoint is reachable, the prefix-cache
+hit/query counters are shown as a cross-check.
+
+Usage:
+    python3 scripts/prefix_cache_benchmark.py --base-url https://granite.example/v1 \\
+        [--model granite-4] [--incidents 4] [--layout both] [--insecure]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "harness"))
+from runner.prompts import PREFIX_DIGEST, TOOL_DEFINITIONS, agent_messages
+from runner.streaming import chat_completion
+
+PREFIX_CACHE_COUNTERS = ("vllm:prefix_cache_queries_total", "vllm:prefix_cache_hits_total")
+
+
+def synthetic_incident(index: int, layout: str) -> tuple[str, str]:
+    """An incident description and evidence summary unique to (index, layout)."""
+    rng = random.Random(f"{layout}-{index}")
+    pod = f"reviews-v{rng.randint(1, 3)}-{rng.randrange(16**5):05x}"
+    description = (
+        f"[{layout} #{index}] An operational incident has been detected in the 'bookinfo' "
+        f"namespace. Users report increased latency on the product page."
+    )
+    lines = [f"Pod {pod} status: Running, restarts={rng.randint(0, 5)}"]
+    for minute in range(20):
+        lines.append(f"  t-{20 - minute}m cpu={rng.uniform(0.05, 0.9):.3f} "
+                     f"mem={rng.randint(80, 400)}Mi p99={rng.uniform(0.05, 2.0):.3f}s")
+    return description, "\n".join(lines)
+
+
+async def scrape_counters(client: httpx.AsyncClient, metrics_url: str) -> dict | None:
+    try:
+        resp = await client.get(metrics_url)
+        resp.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    totals = {}
+    for name in PREFIX_CACHE_COUNTERS:
+        values = re.findall(rf"^{re.escape(name)}(?:{{[^}}]*}})? (\S+)$", resp.text, re.MULTILINE)
+        if values:
+            totals[name] = sum(float(v) for v in values)
+    return totals or None
+
+
+async def run_layout(client: httpx.AsyncClient, url: str, model: str, layout: str,
+                     incidents: int, headers: dict) -> list[dict]:
+    rows = []
+    for index in range(incidents):
+        messages = agent_messages(*synthetic_incident(index, layout))
+        for turn in (1, 2):
+            body = {"model": model, "messages": messages, "max_tokens": 16}
+            if turn == 1 or layout == "stable":
+                body.update(tools=TOOL_DEFINITIONS, tool_choice="auto" if turn == 1 else "none")
+            _, stats = await chat_completion(client, url, body, headers=headers)
+            rows.append({"layout": layout, "incident": index, "turn": turn, **stats})
+            # Turn 2 continues the conversation with a canned tool exchange
+            messages = messages + [
+                {"role": "assistant", "content": None, "tool_calls": [{
+                    "id": "call_0", "type": "function",
+                    "function": {"name": "getK8sEvents", "arguments": '{"namespace": "bookinfo"}'},
+                }]},
+                {"role": "tool", "tool_call_id": "call_0", "content": '{"events": [], "resultCount": 0}'},
+                {"role": "user", "content": "Give your final answer now."},
+            ]
+    return rows
+
+
+def ratio(cached, prompt) -> str:
+    return f"{cached / prompt:6.1%}" if cached is not None and prompt else "   n/a"
+
+
+async def main_async(args):
+    url = f"{args.base_url.rstrip('/')}/chat/completions"
+    metrics_url = re.sub(r"/v1/?$", "", args.base_url.rstrip("/")) + "/metrics"
+    headers = {"Authorization": f"Bearer {args.api_key}"} if args.api_key else {}
+    layouts = ["stable", "legacy"] if args.layout == "both" else [args.layout]
+
+    print(f"Static prefix digest: {PREFIX_DIGEST}")
+    async with httpx.AsyncClient(timeout=120.0, verify=not args.insecure) as client:
+        before = await scrape_counters(client, metrics_url)
+        rows = []
+        for layout in layouts:
+            rows += await run_layout(client, url, args.model, layout, args.incidents, headers)
+        after = await scrape_counters(client, metrics_url)
+
+    print(f"\n{'layout':<8} {'incident':>8} {'turn':>4} {'prompt':>7} {'cached':>7} {'ratio':>7} {'ttft_ms':>8}")
+    for row in rows:
+        cached = row["cached_tokens"]
+        print(f"{row['layout']:<8} {row['incident']:>8} {row['turn']:>4} {row['prompt_tokens'] or 0:>7} "
+              f"{'-' if cached is None else cached:>7} {ratio(cached, row['prompt_tokens']):>7} "
+              f"{row['ttft_ms'] if row['ttft_ms'] is not None else '-':>8}")
+
+    print()
+    for layout in layouts:
+        subset = [r for r in rows if r["layout"] == layout]
+        reported = [r for r in subset if r["cached_tokens"] is not None]
+        if not reported:
+            print(f"{layout}: server did not report cached tokens "
+                  f"(start vLLM with --enable-prompt-tokens-details)")
+            continue
+        prompt = sum(r["prompt_tokens"] or 0 for r in reported)
+        cached = sum(r["cached_tokens"] for r in reported)
+        warm = [r for r in reported if (r["incident"], r["turn"]) != (0, 1)]
+        warm_prompt = sum(r["prompt_tokens"] or 0 for r in warm)
+        print(f"{layout}: {cached}/{prompt} prompt tokens cached ({ratio(cached, prompt).strip()}), "
+              f"excluding the first request {ratio(sum(r['cached_tokens'] for r in warm), warm_prompt).strip()}")
+
+    if before and after:
+        queries, hits = (after.get(n, 0) - before.get(n, 0) for n in PREFIX_CACHE_COUNTERS)
+        print(f"\nvLLM /metrics: {hits:.0f}/{queries:.0f} prefix-cache tokens hit "
+              f"({ratio(hits, queries).strip()}) during the benchmark")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", required=True, help="OpenAI-compatible base URL, e.g. https://host/v1")
+    parser.add_argument("--model", default=os.environ.get("LLAMA_MODEL_ID", "granite-4"))
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY", ""))
+    parser.add_argument("--incidents", type=int, default=4)
+    parser.add_argument("--layout", choices=("stable", "legacy", "both"), default="both")
+    parser.add_argument("--insecure", action="store_true", help="skip TLS verification (self-signed routes)")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
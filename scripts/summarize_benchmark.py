@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Summarizer micro-benchmark — per-sample Python loop vs. vectorized NumPy.
+
+Builds a synthetic Prometheus matrix response (20 series x 10,000 samples by
+default, values as strings exactly as Thanos returns them) and times the
+original list-comprehension summarizer against
+``otel_tools_server.summarize.summarize_response``. A parse-only pass
+(string -> float for every sample, no statistics) is timed as well: it is the
+floor for any summarizer working on Thanos' JSON, since values arrive as
+strings.
+
+Usage:
+    python3 scripts/summarize_benchmark.py [--series 20] [--samples 10000] [--repeat 5]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+from otel_tools_server.summarize import summarize_response
+
+
+def legacy_summarize(prom_response: dict) -> dict:
+    """The pre-NumPy summarizer (min/max/avg only), kept here as the baseline."""
+    result_type = prom_response.get("data", {}).get("resultType", "unknown")
+    results = prom_response.get("data", {}).get("result", [])
+    summarized = []
+    for r in results[:20]:
+        metric = r.get("metric", {})
+        values = r.get("values", [])
+        nums = [float(v[1]) for v in values if v[1] != "NaN"]
+        summarized.append({
+            "metric": metric,
+            "samples": len(values),
+            "min": round(min(nums), 4) if nums else None,
+            "max": round(max(nums), 4) if nums else None,
+            "avg": round(sum(nums) / len(nums), 4) if nums else None,
+            "latest": values[-1][1] if values else None,
+        })
+    return {"status": prom_response.get("status"), "resultType": result_type,
+            "resultCount": len(results), "data": summarized}
+
+
+def build_matrix(series: int, samples: int, step: float = 15.0) -> dict:
+    """Synthetic CPU-like series with a step change halfway through."""
+    rng = random.Random(42)
+    start = time.time() - samples * step
+    result = []
+    for s in range(series):
+        base = rng.uniform(0.01, 0.2)
+        values = []
+        for i in range(samples):
+            level = base + (0.45 if i >= samples // 2 and s == 0 else 0.0)
+            values.append([start + i * step, f"{level + rng.gauss(0, 0.01):.6f}"])
+        result.append({"metric": {"pod": f"reviews-v2-{s}"}, "values": values})
+    return {"status": "success", "data": {"resultType": "matrix", "result": result}}
+
+
+def parse_only(prom_response: dict) -> None:
+    for r in prom_response["data"]["result"]:
+        [float(v[1]) for v in r["values"]]
+
+
+def _time(fn, arg, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    matrix = build_matrix(args.series, args.samples)
+    parse_ms = statistics.median(_time(parse_only, matrix, args.repeat)) * 1000
+    legacy_ms = statistics.median(_time(legacy_summarize, matrix, args.repeat)) * 1000
+    vectorized_ms = statistics.median(_time(summarize_response, matrix, args.repeat)) * 1000
+
+    print(f"Matrix: {args.series} series x {args.samples} samples, median of {args.repeat} runs")
+    print(f"  parse only (floor):                     {parse_ms:8.2f} ms")
+    print(f"  legacy loop (min/max/avg):              {legacy_ms:8.2f} ms")
+    print(f"  vectorized (+percentiles/slope/change): {vectorized_ms:8.2f} ms")
+    print(f"  statistics cost above parse floor:      "
+          f"legacy {legacy_ms - parse_ms:.2f} ms, vectorized {vectorized_ms - parse_ms:.2f} ms")
+
+    first = summarize_response(matrix)["data"][0]
+    print(f"\nSample summary for {first['metric']['pod']}:")
+    for key in ("min", "max", "avg", "p50", "p95", "p99", "slope_per_s", "change_point"):
+        print(f"  {key}: {first.get(key)}")
+
+
+if __name__ == "__main__":
+    main()
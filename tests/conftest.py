@@ -0,0 +1,50 @@
+"""Shared test setup: import paths, the in-process fake backends and a clean event loop per run."""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "tools"), str(ROOT / "scripts")]
+
+from fake_observability_backends import FakeBackends, make_server  # noqa: E402
+from otel_tools_server import admission, http_pool  # noqa: E402
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh loop, then drop the pooled clients and limiters bound to it."""
+
+    def _run(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await http_pool.close_all()
+                http_pool._POOLS.clear()
+                admission._LIMITERS.clear()
+
+        return asyncio.run(main())
+
+    return _run
+
+
+@pytest.fixture
+def fake_backends():
+    """Start ``FakeBackends`` on a free local port; returns ``start(flavor=..., backends=...) -> base URL``."""
+    servers = []
+
+    def start(flavor: str = "tempo", backends: FakeBackends = None) -> str:
+        server = make_server(backends or FakeBackends(flavor, traces=30, seed=7))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
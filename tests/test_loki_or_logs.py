@@ -0,0 +1,166 @@
+"""searchLogs' Loki backend: LogQL generation, the query itself and the pod-log fallback."""
+
+import re
+
+import pytest
+
+from fake_observability_backends import _FILTER, FakeBackends, _unquote
+from otel_tools_server import loki_or_logs
+from otel_tools_server.admission import BackendSaturated
+from otel_tools_server.deadline import DeadlineExceeded
+from otel_tools_server.loki_or_logs import _query_loki, build_logql, compile_matcher, search_logs
+
+RATINGS_POD = "ratings-v1-84f7c9d6b-q9w3e"
+
+LINES = [
+    "Error: invalid configuration: MYSQL_DB_HOST is not set",
+    "FATAL: exiting with status 1",
+    "GET /reviews/0 200",
+    "price is $5.00 (approx)",
+    "a`b and a\"b",
+]
+
+
+@pytest.fixture
+def loki(monkeypatch, fake_backends):
+    """Point the Loki backend at a fake server; returns ``start(backends=None) -> base URL``."""
+
+    def start(backends=None):
+        url = fake_backends(backends=backends)
+        monkeypatch.setattr(loki_or_logs, "LOG_BACKEND", "loki")
+        monkeypatch.setattr(loki_or_logs, "LOKI_URL", url)
+        monkeypatch.setattr(loki_or_logs, "LOKI_USE_SA_TOKEN", False)
+        return url
+
+    return start
+
+
+@pytest.fixture
+def pod_logs(monkeypatch):
+    """Stub the Kubernetes pod-log path with one pod that always has one line."""
+    monkeypatch.setattr(loki_or_logs, "_resolve_targets", lambda ns, pod, ctr: [("pod-a", "app")])
+    monkeypatch.setattr(
+        loki_or_logs, "_read_target",
+        lambda ns, pod, ctr, since, matcher, limit, scan: [{"pod": pod, "container": ctr, "log": "from pod logs"}],
+    )
+
+
+def _line_filter(query: str) -> str:
+    """The regex of the query's ``|~`` filter, unquoted as Loki would."""
+    (op, literal), = _FILTER.findall(query.partition("}")[2])
+    assert op == "~"
+    return _unquote(literal)
+
+
+# ---------- build_logql ----------
+
+def test_selectors_only():
+    assert build_logql("bookinfo") == "{namespace=`bookinfo`}"
+    assert build_logql("bookinfo", "ratings-v1", "ratings") == (
+        "{namespace=`bookinfo`, pod=`ratings-v1`, container=`ratings`}"
+    )
+
+
+def test_search_text_is_escaped_and_case_insensitive():
+    assert build_logql("bookinfo", search_text="$5.00 (approx)") == (
+        r"{namespace=`bookinfo`} |~ `(?i)\$5\.00\ \(approx\)`"
+    )
+
+
+def test_search_regex_is_passed_through():
+    assert build_logql("bookinfo", search_regex="err(or)?|fatal") == "{namespace=`bookinfo`} |~ `(?i)err(or)?|fatal`"
+
+
+@pytest.mark.parametrize("value", ["a`b", 'a`"b', "a`\\d"])
+def test_backticks_fall_back_to_double_quotes(value):
+    query = build_logql("bookinfo", search_regex=value)
+    assert query.endswith(' |~ "' + ("(?i)" + value).replace("\\", "\\\\").replace('"', '\\"') + '"')
+    assert _line_filter(query) == "(?i)" + value
+
+
+@pytest.mark.parametrize("search_text, search_regex", [
+    ("error", None),
+    ("FATAL", None),
+    ("$5.00 (approx)", None),
+    ("a`b", None),
+    (None, "mysql_db_\\w+"),
+    (None, "^get .* 200$"),
+    (None, 'a"b'),
+])
+def test_line_filter_matches_like_compile_matcher(search_text, search_regex):
+    pattern = re.compile(_line_filter(build_logql("bookinfo", search_text=search_text, search_regex=search_regex)))
+    matcher = compile_matcher(search_text, search_regex)
+    assert [bool(pattern.search(line)) for line in LINES] == [bool(matcher.search(line)) for line in LINES]
+
+
+# ---------- _query_loki against the fake Loki ----------
+
+def test_query_loki_filters_and_orders(run, loki):
+    loki()
+    items = run(_query_loki("bookinfo", None, None, "fatal", None, 30, 5, "backward"))
+
+    assert 0 < len(items) <= 5
+    assert {(i["pod"], i["container"]) for i in items} == {(RATINGS_POD, "ratings")}
+    assert all(i["log"] == "FATAL: exiting with status 1" for i in items)
+    timestamps = [i["timestamp"] for i in items]
+    assert timestamps == sorted(timestamps, reverse=True)
+
+
+def test_query_loki_forward_and_selectors(run, loki):
+    loki()
+    items = run(_query_loki("bookinfo", RATINGS_POD, "ratings", None, "^error:", 30, 100, "forward"))
+
+    assert items and all(i["log"].startswith("Error:") for i in items)
+    timestamps = [i["timestamp"] for i in items]
+    assert timestamps == sorted(timestamps)
+
+
+def test_search_logs_uses_loki(run, loki, pod_logs):
+    loki()
+    items = run(search_logs(namespace="bookinfo", search_text="MYSQL_DB_HOST", limit=3))
+
+    assert len(items) == 3
+    assert all(i["pod"] == RATINGS_POD for i in items)
+
+
+# ---------- Fallback to pod logs ----------
+
+class BrokenLoki(FakeBackends):
+    """Fake Loki answering every query with a fixed status and body."""
+
+    def __init__(self, status, body):
+        super().__init__("tempo", traces=0, seed=0)
+        self.reply = status, body
+
+    def handle(self, path, query):
+        return self.reply
+
+
+@pytest.mark.parametrize("status, body", [
+    (500, {"status": "error", "error": "internal"}),
+    (200, {"data": {"result": [{"stream": {}, "values": [["not-a-timestamp", "line"]]}]}}),
+    (200, {"data": {"result": [{"stream": {}, "values": [["1700000000000000000"]]}]}}),
+    (200, {"data": {"result": [{"stream": {}, "values": [[None, "line"]]}]}}),
+    (200, {"data": ["not", "an", "object"]}),
+])
+def test_falls_back_to_pod_logs_on_bad_responses(run, loki, pod_logs, status, body):
+    loki(BrokenLoki(status, body))
+    items = run(search_logs(namespace="bookinfo", search_text="error"))
+
+    assert items == [{"pod": "pod-a", "container": "app", "log": "from pod logs"}]
+
+
+@pytest.mark.parametrize("error", [
+    BackendSaturated("loki", 429, 1, "queue full"),
+    DeadlineExceeded("deadline exceeded before loki query_range"),
+])
+def test_falls_back_to_pod_logs_on_admission_rejections(run, loki, pod_logs, monkeypatch, error):
+    loki()
+
+    async def refused(*args):
+        raise error
+
+    monkeypatch.setattr(loki_or_logs, "_query_loki", refused)
+    items = run(search_logs(namespace="bookinfo", search_text="error"))
+
+    assert items == [{"pod": "pod-a", "container": "app", "log": "from pod logs"}]
@@ -0,0 +1,60 @@
+"""searchLogs ``stream`` mode: errors before the first line keep their status, later ones end the stream."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from otel_tools_server import main
+from otel_tools_server.admission import BackendSaturated
+from otel_tools_server.deadline import DeadlineExceeded
+
+
+def stream_logs(monkeypatch, lines, error=None):
+    async def fake_iter_logs(**kwargs):
+        for line in lines:
+            yield {"pod": "pod-a", "container": "app", "log": line}
+        if error is not None:
+            raise error
+
+    monkeypatch.setattr(main, "iter_logs", fake_iter_logs)
+    return TestClient(main.app).post("/tools/searchLogs", json={"namespace": "bookinfo", "stream": True})
+
+
+def ndjson(resp):
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_streams_all_lines(monkeypatch):
+    resp = stream_logs(monkeypatch, ["one", "two"])
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert [item["log"] for item in ndjson(resp)] == ["one", "two"]
+
+
+def test_no_matches_is_an_empty_stream(monkeypatch):
+    resp = stream_logs(monkeypatch, [])
+
+    assert resp.status_code == 200
+    assert resp.text == ""
+
+
+@pytest.mark.parametrize("error, status", [
+    (BackendSaturated("kubernetes", 429, 2, "queue full"), 429),
+    (DeadlineExceeded("deadline exceeded waiting for _resolve_targets"), 504),
+])
+def test_errors_before_the_first_line_keep_their_status(monkeypatch, error, status):
+    resp = stream_logs(monkeypatch, [], error)
+
+    assert resp.status_code == status
+    assert resp.json()["error"] == str(error)
+
+
+def test_errors_after_the_first_line_end_with_an_error_line(monkeypatch):
+    resp = stream_logs(monkeypatch, ["one"], BackendSaturated("kubernetes", 503, 2, "queue wait expired"))
+
+    assert resp.status_code == 200
+    items = ndjson(resp)
+    assert items[0]["log"] == "one"
+    assert items[-1] == {"error": "kubernetes backend saturated (queue wait expired), retry after 2s"}
@@ -0,0 +1,166 @@
+"""getTraceWaterfall: span tree analysis on fixed traces, and the Tempo/Jaeger paths against the fake backends."""
+
+import pytest
+
+from fake_observability_backends import FakeBackends
+from otel_tools_server import tempo_or_traces
+from otel_tools_server.tempo_or_traces import Span, analyze_trace, get_trace_waterfall
+
+
+def span(span_id, parent_id, service, start_ms, end_ms, error=False):
+    return Span(span_id, parent_id, service, f"GET /{service}", start_ms * 1000, end_ms * 1000, error)
+
+
+# productpage [0, 40) -> details [3, 9), reviews [12, 34) -> ratings [16, 24)
+BOOKINFO = [
+    span("a", None, "productpage", 0, 40),
+    span("b", "a", "details", 3, 9),
+    span("c", "a", "reviews", 12, 34),
+    span("d", "c", "ratings", 16, 24, error=True),
+]
+
+
+def by_service(result):
+    return {s["service"]: s for s in result["services"]}
+
+
+# ---------- Span tree analysis ----------
+
+def test_span_tree_waterfall():
+    result = analyze_trace("t1", BOOKINFO)
+
+    assert result["rootService"] == "productpage"
+    assert result["durationMs"] == 40
+    assert (result["spanCount"], result["errorCount"]) == (4, 1)
+    assert [(w["depth"], w["service"], w["offsetMs"]) for w in result["waterfall"]] == [
+        (0, "productpage", 0), (1, "details", 3), (1, "reviews", 12), (2, "ratings", 16),
+    ]
+    assert result["waterfall"][3]["error"] is True
+    assert result["waterfallOmittedSpans"] == 0
+
+
+def test_critical_path_follows_the_last_finishing_child():
+    result = analyze_trace("t1", BOOKINFO)
+
+    assert [(c["service"], c["durationMs"], c["contributionMs"]) for c in result["criticalPath"]] == [
+        ("productpage", 40, 18), ("reviews", 22, 14), ("ratings", 8, 8),
+    ]
+    services = by_service(result)
+    assert {name: s["criticalPathMs"] for name, s in services.items()} == {
+        "productpage": 18, "reviews": 14, "ratings": 8, "details": 0,
+    }
+    assert result["services"][0]["service"] == "productpage"
+
+
+def test_self_time_excludes_children():
+    services = by_service(analyze_trace("t1", BOOKINFO))
+
+    assert {name: s["selfMs"] for name, s in services.items()} == {
+        "productpage": 12, "details": 6, "reviews": 14, "ratings": 8,
+    }
+
+
+def test_self_time_merges_overlapping_children_and_clips_to_the_parent():
+    spans = [
+        span("p", None, "parent", 0, 100),
+        span("k1", "p", "child", 10, 50),
+        span("k2", "p", "child", 30, 70),   # overlaps k1: together they cover [10, 70)
+        span("k3", "p", "child", 90, 120),  # runs past the parent: counts [90, 100)
+    ]
+    services = by_service(analyze_trace("t2", spans))
+
+    assert services["parent"]["selfMs"] == 30
+    assert services["child"]["selfMs"] == 40 + 40 + 30
+
+
+def test_orphans_become_roots():
+    spans = BOOKINFO + [span("x", "missing", "orphan", 50, 60)]
+    result = analyze_trace("t3", spans)
+
+    assert [(w["depth"], w["service"]) for w in result["waterfall"]][-1] == (0, "orphan")
+    assert result["durationMs"] == 60
+    assert result["criticalPath"][0]["service"] == "orphan"
+
+
+@pytest.mark.parametrize("spans", [
+    [span("x", "y", "svc-x", 5, 20), span("y", "x", "svc-y", 0, 30)],
+    [span("z", "z", "svc-z", 0, 10)],
+    [span("a", None, "root", 0, 40), span("b", "a", "mid", 5, 30), span("a", "b", "dup", 10, 20)],
+], ids=["two-span-cycle", "self-parent", "duplicate-id-loop"])
+def test_parent_cycles_do_not_break_the_analysis(spans):
+    result = analyze_trace("t4", spans)
+
+    assert result["status"] == "ok"
+    assert result["rootService"] == min(spans, key=lambda s: s.start_us).service
+    assert len(result["waterfall"]) == len(spans)
+    assert len(result["criticalPath"]) <= len(spans)
+
+
+# ---------- Tempo / Jaeger against the fake backends ----------
+
+@pytest.fixture
+def traces(monkeypatch, fake_backends):
+    """Point the trace backend at a fake server; returns ``start(flavor, backends=None)``."""
+
+    def start(flavor, backends=None):
+        url = fake_backends(flavor, backends)
+        monkeypatch.setattr(tempo_or_traces, "TRACE_BACKEND", flavor)
+        monkeypatch.setattr(tempo_or_traces, "TRACE_QUERY_URL", url)
+        monkeypatch.setattr(tempo_or_traces, "TRACE_USE_SA_TOKEN", False)
+        tempo_or_traces._trace_cache.clear()
+
+    yield start
+    tempo_or_traces._trace_cache.clear()
+
+
+@pytest.mark.parametrize("flavor", ["tempo", "jaeger"])
+def test_slowest_traces_through_a_service(run, traces, flavor):
+    traces(flavor)
+    results = run(get_trace_waterfall(service="reviews.bookinfo"))
+
+    assert len(results) == tempo_or_traces.TRACE_MAX_TRACES
+    assert all(r["status"] == "ok" for r in results)
+    durations = [r["durationMs"] for r in results]
+    assert durations == sorted(durations, reverse=True)
+    slowest = results[0]
+    assert [c["service"] for c in slowest["criticalPath"]] == [
+        "productpage.bookinfo", "reviews.bookinfo", "ratings.bookinfo",
+    ]
+    assert sum(c["contributionMs"] for c in slowest["criticalPath"]) == pytest.approx(slowest["durationMs"], abs=0.05)
+
+
+@pytest.mark.parametrize("flavor", ["tempo", "jaeger"])
+def test_trace_by_id(run, traces, flavor):
+    backends = FakeBackends(flavor, traces=30, seed=7)
+    traces(flavor, backends)
+    trace_id = next(iter(backends.traces))
+    result, = run(get_trace_waterfall(trace_id=trace_id))
+
+    assert result["status"] == "ok"
+    assert result["traceId"] == trace_id
+    assert result["spanCount"] == len(backends.traces[trace_id])
+    assert result["errorCount"] == 1  # trace 0 has the erroring ratings span
+
+
+def test_unknown_trace_id(run, traces):
+    traces("tempo")
+    assert run(get_trace_waterfall(trace_id="0" * 32)) == [{"status": "not_found", "traceId": "0" * 32}]
+
+
+class FailingSearch(FakeBackends):
+    """Fake backend whose trace search answers 503."""
+
+    def handle(self, path, query):
+        if path in ("/api/search", "/api/traces"):
+            return 503, {"error": "search unavailable"}
+        return super().handle(path, query)
+
+
+@pytest.mark.parametrize("flavor", ["tempo", "jaeger"])
+def test_search_failure_is_an_error_record(run, traces, flavor):
+    traces(flavor, FailingSearch(flavor, traces=3, seed=7))
+    result, = run(get_trace_waterfall(service="reviews.bookinfo", since_minutes=10))
+
+    assert result["status"] == "error"
+    assert result["requested_service"] == "reviews.bookinfo"
+    assert "503" in result["error"]
@@ -0,0 +1,41 @@
+"""Per-tool HTTP metrics recorded by ToolMetricsMiddleware."""
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from otel_tools_server import main
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_streamed_response_is_measured_end_to_end(monkeypatch):
+    async def fake_iter_logs(**kwargs):
+        for i in range(3):
+            yield {"pod": "pod-a", "container": "app", "log": f"line {i}"}
+
+    monkeypatch.setattr(main, "iter_logs", fake_iter_logs)
+    before = {
+        "ok": sample("aiops_tools_tool_requests_total", tool="searchLogs", status="2xx"),
+        "bytes": sample("aiops_tools_tool_response_bytes_sum", tool="searchLogs"),
+    }
+
+    resp = TestClient(main.app).post("/tools/searchLogs", json={"stream": True})
+
+    assert resp.status_code == 200
+    assert sample("aiops_tools_tool_requests_total", tool="searchLogs", status="2xx") == before["ok"] + 1
+    assert sample("aiops_tools_tool_response_bytes_sum", tool="searchLogs") == before["bytes"] + len(resp.content)
+    assert sample("aiops_tools_tool_requests_in_flight", tool="searchLogs") == 0
+
+
+def test_errors_and_unknown_tools_settle_the_gauge():
+    client = TestClient(main.app)
+    before = sample("aiops_tools_tool_requests_total", tool="unknown", status="4xx")
+
+    assert client.post("/tools/noSuchTool", json={}).status_code == 404
+    assert client.post("/tools/getK8sEvents", json={"since_minutes": "soon"}).status_code == 422
+
+    assert sample("aiops_tools_tool_requests_total", tool="unknown", status="4xx") == before + 1
+    assert sample("aiops_tools_tool_requests_in_flight", tool="unknown") == 0
+    assert sample("aiops_tools_tool_requests_in_flight", tool="getK8sEvents") == 0
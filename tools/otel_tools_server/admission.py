@@ -0,0 +1,135 @@
+"""Per-backend admission control.
+
+Each backend (Thanos, Loki, traces, the Kubernetes API) gets a limiter that
+admits at most ``max_concurrency`` calls at once and queues up to
+``max_queue`` more for at most ``max_wait`` seconds. Beyond that the call is
+rejected immediately with ``BackendSaturated`` — 429 when the queue is full,
+503 when the wait expired — carrying a Retry-After estimate derived from how
+long calls have recently been holding a slot. A burst of agent sessions then
+degrades into fast, retryable errors instead of piling load onto the cluster
+monitoring stack.
+
+Queue waits are also cut short by the request's deadline (deadline.py);
+running out of deadline raises ``DeadlineExceeded`` rather than a 503.
+
+Limits are read per backend from ``ADMISSION_<BACKEND>_MAX_CONCURRENCY`` /
+``_MAX_QUEUE`` / ``_MAX_WAIT_SECONDS`` (backend name upper-cased), falling
+back to the ``ADMISSION_*`` defaults.
+"""
+
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from .deadline import DeadlineExceeded, remaining
+from .metrics import (
+    ADMISSION_ACTIVE,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT,
+)
+
+ADMISSION_MAX_CONCURRENCY = int(os.environ.get("ADMISSION_MAX_CONCURRENCY", "8"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_MAX_WAIT = float(os.environ.get("ADMISSION_MAX_WAIT_SECONDS", "10"))
+
+
+class BackendSaturated(Exception):
+    """A backend's limiter refused the call; maps to an HTTP 429/503 with Retry-After."""
+
+    def __init__(self, backend: str, status_code: int, retry_after: int, reason: str):
+        super().__init__(f"{backend} backend saturated ({reason}), retry after {retry_after}s")
+        self.backend = backend
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class BackendLimiter:
+    """Bounded concurrency plus a bounded, time-limited wait queue for one backend."""
+
+    def __init__(self, backend: str, max_concurrency: int, max_queue: int, max_wait: float):
+        self.backend = backend
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self.max_wait = max_wait
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self._hold_ewma = 1.0  # seconds a call holds its slot, smoothed
+
+    def _retry_after(self) -> int:
+        """Seconds until the current queue should have drained through the slots."""
+        return max(1, math.ceil(self._hold_ewma * (self._waiting + 1) / self.max_concurrency))
+
+    def _reject(self, status_code: int, reason: str):
+        ADMISSION_REJECTED.labels(backend=self.backend, reason=reason).inc()
+        raise BackendSaturated(self.backend, status_code, self._retry_after(), reason)
+
+    async def acquire(self) -> float:
+        """Take a slot (queueing or rejecting as ``slot`` does); returns the hold start for ``release``."""
+        if self._sem.locked():
+            if self._waiting >= self.max_queue:
+                self._reject(429, "queue_full")
+            self._waiting += 1
+            ADMISSION_QUEUE_DEPTH.labels(backend=self.backend).set(self._waiting)
+            start = time.monotonic()
+            left = remaining()
+            deadline_bound = left is not None and left < self.max_wait
+            try:
+                await asyncio.wait_for(self._sem.acquire(), timeout=max(left, 0) if deadline_bound else self.max_wait)
+            except asyncio.TimeoutError:
+                if deadline_bound:
+                    ADMISSION_REJECTED.labels(backend=self.backend, reason="deadline").inc()
+                    raise DeadlineExceeded(f"deadline exceeded waiting for a {self.backend} slot")
+                self._reject(503, "wait_timeout")
+            finally:
+                self._waiting -= 1
+                ADMISSION_QUEUE_DEPTH.labels(backend=self.backend).set(self._waiting)
+            ADMISSION_WAIT.labels(backend=self.backend).observe(time.monotonic() - start)
+        else:
+            await self._sem.acquire()
+            ADMISSION_WAIT.labels(backend=self.backend).observe(0.0)
+
+        ADMISSION_ACTIVE.labels(backend=self.backend).inc()
+        return time.monotonic()
+
+    def release(self, held_from: float):
+        self._hold_ewma = 0.8 * self._hold_ewma + 0.2 * (time.monotonic() - held_from)
+        ADMISSION_ACTIVE.labels(backend=self.backend).dec()
+        self._sem.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        held_from = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(held_from)
+
+
+_LIMITERS: dict[str, BackendLimiter] = {}
+
+
+def _env(backend: str, suffix: str, default):
+    value = os.environ.get(f"ADMISSION_{backend.upper()}_{suffix}")
+    return type(default)(value) if value is not None else default
+
+
+def get_limiter(backend: str, max_concurrency: Optional[int] = None) -> BackendLimiter:
+    """Return the shared limiter for ``backend``, creating it from the environment on first use.
+
+    ``max_concurrency`` overrides the global default (not a per-backend env var).
+    """
+    limiter = _LIMITERS.get(backend)
+    if limiter is None:
+        limiter = BackendLimiter(
+            backend,
+            max_concurrency=_env(backend, "MAX_CONCURRENCY", max_concurrency or ADMISSION_MAX_CONCURRENCY),
+            max_queue=_env(backend, "MAX_QUEUE", ADMISSION_MAX_QUEUE),
+            max_wait=_env(backend, "MAX_WAIT_SECONDS", ADMISSION_MAX_WAIT),
+        )
+        _LIMITERS[backend] = limiter
+    return limiter
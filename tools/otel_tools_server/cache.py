@@ -0,0 +1,61 @@
+"""In-process result caches for tool responses.
+
+``TTLCache`` is a size-bounded LRU whose entries each carry their own expiry,
+so callers can give volatile results (windows touching "now") a shorter life
+than historical ones. Hits and misses are counted per cache in metrics.py.
+
+The server runs a single event loop and cache operations never await, so no
+locking is needed.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from .metrics import CACHE_HIT_RATIO, CACHE_REQUESTS
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU cache with a per-entry time-to-live."""
+
+    def __init__(self, name: str, max_entries: int = 512):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._hits = 0
+        self._lookups = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on miss/expiry. Callers must not mutate it."""
+        entry = self._entries.get(key, _MISSING)
+        if entry is not _MISSING:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._record(hit=True)
+                return value
+            del self._entries[key]
+        self._record(hit=False)
+        return None
+
+    def _record(self, hit: bool):
+        self._lookups += 1
+        self._hits += hit
+        CACHE_REQUESTS.labels(cache=self.name, result="hit" if hit else "miss").inc()
+        CACHE_HIT_RATIO.labels(cache=self.name).set(self._hits / self._lookups)
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: float):
+        if ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
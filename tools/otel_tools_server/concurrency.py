@@ -0,0 +1,75 @@
+"""Event-loop hygiene — keeps blocking Kubernetes client calls off the uvicorn loop.
+
+The kubernetes Python client is synchronous. Calling it from an ``async def``
+endpoint stalls every other request on the loop (including Thanos queries)
+until the API server answers, so Kubernetes-backed tools run on a bounded
+thread pool sized by ``K8S_MAX_WORKERS``. A background task samples how late
+the loop wakes up from a short sleep and exports it as event-loop lag.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .admission import get_limiter
+from .deadline import DeadlineExceeded, remaining
+from .metrics import EVENT_LOOP_LAG
+
+K8S_MAX_WORKERS = int(os.environ.get("K8S_MAX_WORKERS", "16"))
+EVENT_LOOP_LAG_INTERVAL = float(os.environ.get("EVENT_LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+
+_k8s_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _k8s_executor
+    if _k8s_executor is None:
+        _k8s_executor = ThreadPoolExecutor(max_workers=K8S_MAX_WORKERS, thread_name_prefix="k8s")
+    return _k8s_executor
+
+
+async def run_k8s(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking Kubernetes client call on the bounded K8s thread pool.
+
+    Admission-controlled as the "kubernetes" backend (one slot per worker by
+    default), so excess calls queue briefly or fail fast with BackendSaturated
+    instead of piling up in the executor's unbounded queue. With a request
+    deadline the caller stops waiting when it passes. The thread itself
+    cannot be interrupted, so the slot stays held until it finishes and the
+    limiter keeps counting it against the backend.
+    """
+    loop = asyncio.get_running_loop()
+    limiter = get_limiter("kubernetes", max_concurrency=K8S_MAX_WORKERS)
+    held_from = await limiter.acquire()
+    try:
+        future = loop.run_in_executor(_executor(), functools.partial(fn, *args, **kwargs))
+    except BaseException:
+        limiter.release(held_from)
+        raise
+    future.add_done_callback(lambda _: limiter.release(held_from))
+    # shield: abandoning the wait must not cancel the future (and release the slot) early
+    left = remaining()
+    if left is None:
+        return await asyncio.shield(future)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout=max(left, 0))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"deadline exceeded waiting for {getattr(fn, '__name__', 'kubernetes call')}")
+
+
+def shutdown_k8s_executor():
+    global _k8s_executor
+    if _k8s_executor is not None:
+        _k8s_executor.shutdown(wait=False, cancel_futures=True)
+        _k8s_executor = None
+
+
+async def monitor_event_loop_lag(interval: float = EVENT_LOOP_LAG_INTERVAL):
+    """Record how far past ``interval`` each wake-up lands (runs until cancelled)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0.0))
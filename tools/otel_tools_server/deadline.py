@@ -0,0 +1,52 @@
+"""Per-request deadlines propagated from the caller.
+
+The harness runs each investigation against an end-to-end budget and sends
+the time it has left with every tool request (``X-Request-Deadline-Ms``,
+milliseconds remaining). The ``request_deadline`` middleware in main.py turns
+that into an absolute deadline in a context variable. Everything below it
+then shrinks its own timeouts to fit: backend HTTP calls, admission-queue
+waits, Kubernetes API calls and batch items. A request whose caller has
+already given up fails fast with ``DeadlineExceeded`` (504) instead of
+holding backend capacity.
+
+Without the header there is no deadline and the usual per-backend timeouts
+apply. Tasks inherit the deadline of the request that created them. A
+single-flight call therefore runs under its leader's deadline.
+"""
+
+import time
+from contextvars import ContextVar, Token
+from typing import Optional
+
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The caller's deadline passed (or would pass) before the work could finish; maps to 504."""
+
+
+def set_deadline(remaining_seconds: float) -> Token:
+    """Start a deadline ``remaining_seconds`` from now for the current context."""
+    return _deadline.set(time.monotonic() + remaining_seconds)
+
+
+def reset_deadline(token: Token):
+    _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def clamp_timeout(timeout: float, what: str = "request") -> float:
+    """``timeout`` shrunk to the time left; raises DeadlineExceeded if none is left."""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded(f"deadline exceeded before {what}")
+    return min(timeout, left)
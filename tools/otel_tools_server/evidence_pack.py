@@ -0,0 +1,103 @@
+"""Evidence packs — the harness's initial evidence bundle, assembled server-side.
+
+The harness used to make one tools-server call per signal (CPU, memory,
+restarts, pod phase, waiting reason, events, logs), one after another. An
+evidence pack runs the fault type's query set concurrently inside the server,
+where the metric queries share the range cache, single-flight coalescing and
+pooled Thanos connections, and returns a single bundle in the shape
+``harness/runner/evidence.collect_evidence`` has always produced. A failing
+component is reported inline (``{"error": ...}``) without failing the pack.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable
+
+from .k8s_events import query_k8s_events
+from .loki_or_logs import search_logs
+from .promql import query_prometheus_range
+
+# PromQL per evidence key; {namespace} and {target} (deployment name) are filled in.
+BASE_QUERIES = {
+    "cpu": 'rate(container_cpu_usage_seconds_total{{namespace="{namespace}", pod=~"{target}.*"}}[5m])',
+    "memory": 'container_memory_working_set_bytes{{namespace="{namespace}", pod=~"{target}.*"}}',
+    "restarts": 'kube_pod_container_status_restarts_total{{namespace="{namespace}", pod=~"{target}.*"}}',
+    "pod_status": 'kube_pod_status_phase{{namespace="{namespace}", pod=~"{target}.*"}}',
+}
+
+FAULT_QUERIES = {
+    "crashloop_bad_config": {
+        "waiting_reason": 'kube_pod_container_status_waiting_reason{{namespace="{namespace}", pod=~"{target}.*"}}',
+    },
+    "cpu_saturation": {
+        "cpu_throttling": (
+            'rate(container_cpu_cfs_throttled_periods_total{{namespace="{namespace}", pod=~"{target}.*"}}[5m])'
+        ),
+    },
+}
+
+
+def evidence_queries(namespace: str, target: str, fault_type: str) -> dict[str, str]:
+    """The metric query set for a fault type (base signals plus fault-specific ones)."""
+    templates = {**BASE_QUERIES, **FAULT_QUERIES.get(fault_type, {})}
+    return {key: t.format(namespace=namespace, target=target) for key, t in templates.items()}
+
+
+async def _timed(name: str, coro: Awaitable[Any], timings: dict, on_error: Any) -> Any:
+    start = time.perf_counter()
+    try:
+        return await coro
+    except Exception as e:
+        return on_error(e)
+    finally:
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+async def build_evidence_pack(
+    namespace: str,
+    target: str,
+    start: str,
+    end: str,
+    fault_type: str = "",
+    events_since_minutes: int = 15,
+    log_search_text: str = "error",
+    log_limit: int = 50,
+) -> dict:
+    """Collect metrics, events and logs for one fault window concurrently."""
+    timings: dict[str, float] = {}
+    queries = evidence_queries(namespace, target, fault_type)
+
+    metric_tasks = [
+        _timed(f"metrics.{key}", query_prometheus_range(query, start, end), timings,
+               lambda e: {"error": str(e)})
+        for key, query in queries.items()
+    ]
+    events_task = _timed(
+        "events",
+        query_k8s_events(namespace=namespace, since_minutes=events_since_minutes),
+        timings,
+        lambda e: [{"error": str(e)}],
+    )
+    logs_task = _timed(
+        "logs",
+        search_logs(namespace=namespace, search_text=log_search_text,
+                    since_minutes=events_since_minutes, limit=log_limit),
+        timings,
+        lambda e: [{"error": str(e)}],
+    )
+
+    start_t = time.perf_counter()
+    *metric_results, events, logs = await asyncio.gather(*metric_tasks, events_task, logs_task)
+    timings["total"] = round((time.perf_counter() - start_t) * 1000, 1)
+
+    return {
+        "collection_time": datetime.now(timezone.utc).isoformat(),
+        "window": {"start": start, "end": end},
+        "fault_type": fault_type,
+        "target": target,
+        "metrics": dict(zip(queries, metric_results)),
+        "events": events,
+        "logs": logs,
+        "timings_ms": timings,
+    }
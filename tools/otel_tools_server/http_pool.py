@@ -0,0 +1,150 @@
+"""Shared HTTP client pools — one keep-alive client per backend for the process lifetime.
+
+Creating an ``httpx.AsyncClient`` per tool call pays a fresh TCP + TLS
+handshake every time. Instead each backend gets a single pooled client
+(HTTP/2 when ``h2`` is installed) that is opened lazily and closed from the
+FastAPI lifespan. The service-account token and CA bundle are re-read only
+when the files change on disk; a CA change rebuilds the client.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+from .admission import get_limiter
+from .deadline import clamp_timeout
+from .metrics import BACKEND_CLIENT_BUILDS, observe_backend
+
+try:
+    import h2  # noqa: F401
+    _H2_AVAILABLE = True
+except ImportError:
+    _H2_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
+# When running in-cluster, use the SA token for auth
+TOKEN_PATH = "/var/run/secrets/kubernetes.io/serviceaccount/token"
+SERVICE_CA_PATH = "/var/run/secrets/kubernetes.io/serviceaccount/service-ca.crt"
+CLUSTER_CA_PATH = "/var/run/secrets/kubernetes.io/serviceaccount/ca.crt"
+
+POOL_MAX_CONNECTIONS = int(os.environ.get("HTTP_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.environ.get("HTTP_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_POOL_KEEPALIVE_EXPIRY_SECONDS", "60"))
+HTTP2_ENABLED = os.environ.get("HTTP_POOL_HTTP2", "true").lower() in ("1", "true", "yes")
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class _WatchedFile:
+    """File contents cached until the file's mtime changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mtime: Optional[int] = None
+        self._value: Optional[str] = None
+
+    def read(self) -> Optional[str]:
+        mtime = _mtime(self.path)
+        if mtime is None:
+            self._mtime, self._value = None, None
+        elif mtime != self._mtime:
+            with open(self.path) as f:
+                self._value = f.read().strip()
+            self._mtime = mtime
+        return self._value
+
+
+class PooledClient:
+    """Process-lifetime async HTTP client for one backend."""
+
+    def __init__(self, name: str, base_url: str, timeout: float = 30.0, use_sa_token: bool = True):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._token = _WatchedFile(TOKEN_PATH) if use_sa_token else None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._verify_key: Optional[tuple] = None
+        self._retired: list[httpx.AsyncClient] = []
+
+    def _headers(self) -> dict:
+        """Build auth headers using the in-cluster service account token."""
+        token = self._token.read() if self._token else None
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    @staticmethod
+    def _verify_source() -> tuple:
+        """Return (CA bundle path, mtime), or (False, None) to disable TLS verify for dev."""
+        for path in (SERVICE_CA_PATH, CLUSTER_CA_PATH):
+            mtime = _mtime(path)
+            if mtime is not None:
+                return path, mtime
+        return False, None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        verify_key = self._verify_source()
+        if self._client is not None and verify_key == self._verify_key:
+            return self._client
+
+        if self._client is not None:
+            # In-flight requests may still hold the old client; close it at shutdown.
+            log.info(f"[{self.name}] CA bundle changed, rebuilding HTTP client")
+            self._retired.append(self._client)
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            verify=verify_key[0],
+            timeout=self.timeout,
+            http2=HTTP2_ENABLED and _H2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+            ),
+        )
+        self._verify_key = verify_key
+        BACKEND_CLIENT_BUILDS.labels(backend=self.name).inc()
+        return self._client
+
+    async def get(self, path: str, params: Optional[dict] = None, operation: str = "get") -> httpx.Response:
+        """GET ``path`` on the backend, recording latency per operation.
+
+        Admission-controlled per backend; raises ``BackendSaturated`` when full.
+        The timeout is shrunk to the caller's deadline, if the request has one.
+        """
+        async with get_limiter(self.name).slot():
+            client = self._ensure_client()
+            timeout = clamp_timeout(self.timeout, f"{self.name} {operation}")
+            with observe_backend(self.name, operation):
+                return await client.get(path, params=params, headers=self._headers(), timeout=timeout)
+
+    async def aclose(self):
+        for c in [*self._retired, self._client]:
+            if c is not None:
+                await c.aclose()
+        self._client, self._verify_key, self._retired = None, None, []
+
+
+_POOLS: dict[str, PooledClient] = {}
+
+
+def get_pool(name: str, base_url: str, timeout: float = 30.0, use_sa_token: bool = True) -> PooledClient:
+    """Return the shared client for ``name``, creating it on first use."""
+    pool = _POOLS.get(name)
+    if pool is None:
+        pool = PooledClient(name, base_url, timeout=timeout, use_sa_token=use_sa_token)
+        _POOLS[name] = pool
+    return pool
+
+
+async def close_all():
+    """Close every pooled client (called from the FastAPI lifespan on shutdown)."""
+    for pool in _POOLS.values():
+        await pool.aclose()
@@ -1,10 +1,36 @@
-"""Kubernetes events query — retrieves events from the K8s API."""
+"""Kubernetes events query — retrieves events from the K8s API.
 
+Namespaces listed in ``EVENT_WATCH_NAMESPACES`` are served from an in-memory
+informer: a background thread lists the namespace's events once, then follows
+a watch from that resourceVersion, keeping a time-indexed store that
+``get_k8s_events`` queries without touching the API server. When the watch
+expires (410 Gone) the informer relists. Other namespaces, or a watched
+namespace whose informer has not synced yet, fall back to a direct list call.
+``query_k8s_events`` is the async entry point: it answers informer hits on
+the event loop and sends only the list call to the Kubernetes thread pool.
+"""
+
+import bisect
+import logging
 import os
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from kubernetes import client, config
+from kubernetes import client, config, watch
+from kubernetes.client.rest import ApiException
+
+from .concurrency import run_k8s
+from .metrics import CACHE_REQUESTS, observe_backend
+
+log = logging.getLogger(__name__)
+
+EVENT_WATCH_NAMESPACES = [
+    ns.strip() for ns in os.environ.get("EVENT_WATCH_NAMESPACES", "bookinfo").split(",") if ns.strip()
+]
+EVENT_WATCH_TIMEOUT = int(os.environ.get("EVENT_WATCH_TIMEOUT_SECONDS", "300"))
+# Query cap; responses are trimmed to the token budget by truncation.fit_to_budget.
+EVENT_RESULT_LIMIT = int(os.environ.get("EVENT_RESULT_LIMIT", "200"))
 
 
 def _load_k8s():
@@ -15,6 +41,220 @@ def _load_k8s():
         config.load_kube_config()
 
 
+def _event_to_dict(ev) -> tuple[dict, Optional[datetime]]:
+    """Convert a CoreV1Event into the tool's event dict plus its effective timestamp."""
+    event_time = ev.last_timestamp or ev.event_time or ev.metadata.creation_timestamp
+    if event_time:
+        event_time = event_time.replace(tzinfo=timezone.utc)
+    return {
+        "type": ev.type,
+        "reason": ev.reason,
+        "message": ev.message,
+        "count": ev.count,
+        "involved_object": {
+            "kind": ev.involved_object.kind,
+            "name": ev.involved_object.name,
+            "namespace": ev.involved_object.namespace,
+        },
+        "first_timestamp": ev.first_timestamp.isoformat() if ev.first_timestamp else None,
+        "last_timestamp": event_time.isoformat() if event_time else None,
+        "source": ev.source.component if ev.source else None,
+    }, event_time
+
+
+def _store_time(event_time: Optional[datetime]) -> float:
+    """Index time for the store; events with no timestamp at all count from when they arrived."""
+    return (event_time or datetime.now(timezone.utc)).timestamp()
+
+
+# ---------- Informer-backed store ----------
+
+class EventStore:
+    """Events for one namespace, indexed by time, involved-object kind and name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: dict[str, tuple[float, dict]] = {}
+        self._by_time: list[tuple[float, str]] = []
+        self._by_kind: dict[str, set[str]] = {}
+        self._by_name: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def upsert(self, uid: str, record: dict, ts: float):
+        with self._lock:
+            self._remove(uid)
+            self._events[uid] = (ts, record)
+            bisect.insort(self._by_time, (ts, uid))
+            obj = record["involved_object"]
+            self._by_kind.setdefault(obj["kind"], set()).add(uid)
+            self._by_name.setdefault(obj["name"], set()).add(uid)
+
+    def delete(self, uid: str):
+        with self._lock:
+            self._remove(uid)
+
+    def replace(self, entries: list[tuple[str, dict, float]]):
+        """Swap in a fresh listing (initial sync or relist after watch expiry)."""
+        store = EventStore()
+        for uid, record, ts in entries:
+            store.upsert(uid, record, ts)
+        with self._lock:
+            self._events, self._by_time = store._events, store._by_time
+            self._by_kind, self._by_name = store._by_kind, store._by_name
+
+    def _remove(self, uid: str):
+        entry = self._events.pop(uid, None)
+        if entry is None:
+            return
+        ts, record = entry
+        i = bisect.bisect_left(self._by_time, (ts, uid))
+        if i < len(self._by_time) and self._by_time[i] == (ts, uid):
+            del self._by_time[i]
+        obj = record["involved_object"]
+        for index, value in ((self._by_kind, obj["kind"]), (self._by_name, obj["name"])):
+            uids = index.get(value)
+            if uids is not None:
+                uids.discard(uid)
+                if not uids:
+                    del index[value]
+
+    def query(
+        self,
+        since_ts: float,
+        kind: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: int = EVENT_RESULT_LIMIT,
+    ) -> list[dict]:
+        """Newest-first events at or after ``since_ts`` matching the optional filters."""
+        with self._lock:
+            candidates = None
+            for index, value in ((self._by_kind, kind), (self._by_name, name)):
+                if value:
+                    uids = index.get(value, set())
+                    candidates = uids if candidates is None else candidates & uids
+            start = bisect.bisect_left(self._by_time, (since_ts, ""))
+            results = []
+            for i in range(len(self._by_time) - 1, start - 1, -1):
+                uid = self._by_time[i][1]
+                if candidates is not None and uid not in candidates:
+                    continue
+                results.append(self._events[uid][1])
+                if len(results) >= limit:
+                    break
+            return results
+
+
+class EventInformer(threading.Thread):
+    """List + watch the events of one namespace into an ``EventStore``."""
+
+    def __init__(self, namespace: str):
+        super().__init__(name=f"event-informer-{namespace}", daemon=True)
+        self.namespace = namespace
+        self.store = EventStore()
+        self.synced = threading.Event()
+        self._stopped = threading.Event()
+        self._watch: Optional[watch.Watch] = None
+
+    def stop(self):
+        self._stopped.set()
+        if self._watch is not None:
+            self._watch.stop()
+
+    def run(self):
+        v1 = client.CoreV1Api()
+        resource_version = None
+        backoff = 1.0
+        while not self._stopped.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._relist(v1)
+                resource_version = self._follow(v1, resource_version)
+                backoff = 1.0
+            except ApiException as e:
+                if e.status == 410:
+                    log.info(f"[events:{self.namespace}] watch expired, relisting")
+                else:
+                    log.warning(f"[events:{self.namespace}] watch failed: {e}")
+                    self._stopped.wait(backoff)
+                    backoff = min(backoff * 2, 30.0)
+                resource_version = None
+            except Exception as e:
+                log.warning(f"[events:{self.namespace}] informer error: {e}")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+                resource_version = None
+
+    def _relist(self, v1) -> str:
+        events_list = v1.list_namespaced_event(namespace=self.namespace)
+        entries = []
+        for ev in events_list.items:
+            record, event_time = _event_to_dict(ev)
+            entries.append((ev.metadata.uid, record, _store_time(event_time)))
+        self.store.replace(entries)
+        self.synced.set()
+        log.info(f"[events:{self.namespace}] synced {len(entries)} events")
+        return events_list.metadata.resource_version
+
+    def _follow(self, v1, resource_version: str) -> str:
+        """Apply watch events until the server closes the watch; return the last resourceVersion."""
+        self._watch = watch.Watch()
+        for item in self._watch.stream(
+            v1.list_namespaced_event,
+            namespace=self.namespace,
+            resource_version=resource_version,
+            timeout_seconds=EVENT_WATCH_TIMEOUT,
+            allow_watch_bookmarks=True,
+        ):
+            ev = item["object"]
+            resource_version = ev.metadata.resource_version
+            if item["type"] == "BOOKMARK":
+                continue
+            if item["type"] == "DELETED":
+                self.store.delete(ev.metadata.uid)
+            else:
+                record, event_time = _event_to_dict(ev)
+                self.store.upsert(ev.metadata.uid, record, _store_time(event_time))
+        return resource_version
+
+
+_INFORMERS: dict[str, EventInformer] = {}
+
+
+def start_event_informers(namespaces: Optional[list[str]] = None):
+    """Start one informer thread per watched namespace (called from the app lifespan)."""
+    _load_k8s()
+    for ns in namespaces if namespaces is not None else EVENT_WATCH_NAMESPACES:
+        if ns not in _INFORMERS:
+            informer = EventInformer(ns)
+            informer.start()
+            _INFORMERS[ns] = informer
+
+
+def stop_event_informers():
+    for informer in _INFORMERS.values():
+        informer.stop()
+    _INFORMERS.clear()
+
+
+# ---------- Query ----------
+
+def _from_informer(
+    namespace: str,
+    resource_type: Optional[str],
+    resource_name: Optional[str],
+    cutoff: datetime,
+) -> Optional[list[dict]]:
+    """Events from the namespace's synced informer store, or None on a miss."""
+    informer = _INFORMERS.get(namespace)
+    if informer is None or not informer.synced.is_set():
+        CACHE_REQUESTS.labels(cache="k8s_events", result="miss").inc()
+        return None
+    CACHE_REQUESTS.labels(cache="k8s_events", result="hit").inc()
+    return informer.store.query(cutoff.timestamp(), kind=resource_type, name=resource_name)
+
+
 def get_k8s_events(
     namespace: str = "bookinfo",
     resource_type: Optional[str] = None,
@@ -22,10 +262,41 @@ def get_k8s_events(
     since_minutes: int = 30,
 ) -> list[dict]:
     """Retrieve Kubernetes events, optionally filtered by resource."""
-    _load_k8s()
-    v1 = client.CoreV1Api()
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=since_minutes)
+    events = _from_informer(namespace, resource_type, resource_name, cutoff)
+    if events is not None:
+        return events
+    return _list_k8s_events(namespace, resource_type, resource_name, cutoff)
+
 
+async def query_k8s_events(
+    namespace: str = "bookinfo",
+    resource_type: Optional[str] = None,
+    resource_name: Optional[str] = None,
+    since_minutes: int = 30,
+) -> list[dict]:
+    """``get_k8s_events`` for async callers.
+
+    Informer hits are in-memory lookups and run inline, so they never wait
+    for (or get refused) a Kubernetes admission slot; only the direct list
+    call goes through ``run_k8s``.
+    """
     cutoff = datetime.now(timezone.utc) - timedelta(minutes=since_minutes)
+    events = _from_informer(namespace, resource_type, resource_name, cutoff)
+    if events is not None:
+        return events
+    return await run_k8s(_list_k8s_events, namespace, resource_type, resource_name, cutoff)
+
+
+def _list_k8s_events(
+    namespace: str,
+    resource_type: Optional[str],
+    resource_name: Optional[str],
+    cutoff: datetime,
+) -> list[dict]:
+    """Direct list call for namespaces without a synced informer."""
+    _load_k8s()
+    v1 = client.CoreV1Api()
 
     field_selectors = []
     if resource_type:
@@ -39,29 +310,16 @@ def get_k8s_events(
     if field_selector:
         kwargs["field_selector"] = field_selector
 
-    events_list = v1.list_namespaced_event(**kwargs)
+    with observe_backend("kubernetes", "list_events"):
+        events_list = v1.list_namespaced_event(**kwargs)
 
     results = []
     for ev in events_list.items:
-        event_time = ev.last_timestamp or ev.event_time or ev.metadata.creation_timestamp
-        if event_time and event_time.replace(tzinfo=timezone.utc) < cutoff:
+        record, event_time = _event_to_dict(ev)
+        if event_time and event_time < cutoff:
             continue
-
-        results.append({
-            "type": ev.type,
-            "reason": ev.reason,
-            "message": ev.message,
-            "count": ev.count,
-            "involved_object": {
-                "kind": ev.involved_object.kind,
-                "name": ev.involved_object.name,
-                "namespace": ev.involved_object.namespace,
-            },
-            "first_timestamp": ev.first_timestamp.isoformat() if ev.first_timestamp else None,
-            "last_timestamp": event_time.isoformat() if event_time else None,
-            "source": ev.source.component if ev.source else None,
-        })
+        results.append(record)
 
     # Sort by timestamp descending
     results.sort(key=lambda e: e.get("last_timestamp") or "", reverse=True)
-    return results[:50]  # cap to avoid context overflow
+    return results[:EVENT_RESULT_LIMIT]
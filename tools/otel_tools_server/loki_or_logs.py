@@ -1,13 +1,67 @@
-"""Logs integration — queries pod logs via Kubernetes API.
+"""Logs integration — queries Loki, or pod logs via the Kubernetes API.
 
-Falls back to direct pod log reading when Loki is not available.
+With ``LOG_BACKEND=loki`` searches are one LogQL range query against
+``LOKI_URL``: namespace/pod/container become stream selectors and the search
+text or regex becomes a ``|~`` line filter, so Loki does the filtering and
+can also find lines from crashed, restarted or rotated containers. If the
+Loki query fails, is refused by admission control, or returns a body that
+cannot be read, the search falls back to direct pod log reading.
+
+Each (pod, container) log is read on the K8s thread pool with at most
+``LOG_FANOUT_CONCURRENCY`` reads in flight, so a search costs roughly the
+slowest pod rather than the sum of all pods. Results are merged in target
+order (pod name, then container spec order); once the targets read so far
+hold ``limit`` lines, reads that have not started yet are cancelled.
+
+Logs are streamed (``_preload_content=False``) and matched line by line
+against a compiled case-insensitive pattern, so memory per read is bounded by
+the chunk size and ``limit`` rather than by the pod's log volume.
 """
 
-from datetime import datetime, timedelta, timezone
-from typing import Optional
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator, Optional
 
+import httpx
 from kubernetes import client, config
 
+from .admission import BackendSaturated
+from .concurrency import run_k8s
+from .deadline import DeadlineExceeded
+from .http_pool import get_pool
+from .metrics import observe_backend
+
+log = logging.getLogger(__name__)
+
+LOG_BACKEND = os.environ.get("LOG_BACKEND", "kubernetes").lower()  # "kubernetes" | "loki"
+LOKI_URL = os.environ.get("LOKI_URL", "")
+LOKI_QUERY_PATH = os.environ.get("LOKI_QUERY_PATH", "/loki/api/v1/query_range")
+LOKI_TIMEOUT = float(os.environ.get("LOKI_TIMEOUT_SECONDS", "30"))
+LOKI_USE_SA_TOKEN = os.environ.get("LOKI_USE_SA_TOKEN", "true").lower() in ("1", "true", "yes")
+# Stream label names differ by collector (promtail: namespace/pod/container;
+# OpenShift logging: kubernetes_namespace_name/kubernetes_pod_name/kubernetes_container_name).
+LOKI_LABEL_NAMESPACE = os.environ.get("LOKI_LABEL_NAMESPACE", "namespace")
+LOKI_LABEL_POD = os.environ.get("LOKI_LABEL_POD", "pod")
+LOKI_LABEL_CONTAINER = os.environ.get("LOKI_LABEL_CONTAINER", "container")
+
+LOG_FANOUT_CONCURRENCY = int(os.environ.get("LOG_FANOUT_CONCURRENCY", "8"))
+LOG_STREAM_CHUNK_BYTES = int(os.environ.get("LOG_STREAM_CHUNK_BYTES", "65536"))
+LOG_MAX_LINE_BYTES = int(os.environ.get("LOG_MAX_LINE_BYTES", "8192"))
+LOG_SCAN_MAX_LINES = int(os.environ.get("LOG_SCAN_MAX_LINES", "10000"))
+
+# Loki failures that fall back to pod logs: transport/HTTP errors, a
+# malformed or partial body, and the pool refusing or timing out the call.
+_LOKI_FALLBACK_ERRORS = (
+    httpx.HTTPError, ValueError, KeyError, TypeError, AttributeError, BackendSaturated, DeadlineExceeded,
+)
+
+_core_v1: Optional[client.CoreV1Api] = None
+
 
 def _load_k8s():
     try:
@@ -16,52 +70,274 @@ def _load_k8s():
         config.load_kube_config()
 
 
-def search_logs(
-    namespace: str = "bookinfo",
+def _api() -> client.CoreV1Api:
+    """Shared CoreV1Api so concurrent reads reuse one urllib3 connection pool."""
+    global _core_v1
+    if _core_v1 is None:
+        _load_k8s()
+        _core_v1 = client.CoreV1Api()
+    return _core_v1
+
+
+def _resolve_targets(
+    namespace: str,
+    pod_name: Optional[str],
+    container: Optional[str],
+) -> list[tuple[str, Optional[str]]]:
+    """Return the (pod, container) pairs to read, in deterministic order."""
+    v1 = _api()
+    if pod_name:
+        if container:
+            return [(pod_name, container)]
+        try:
+            with observe_backend("kubernetes", "read_pod"):
+                pods = [v1.read_namespaced_pod(name=pod_name, namespace=namespace)]
+        except Exception:
+            # Let the log read surface the error for this pod.
+            return [(pod_name, None)]
+    else:
+        with observe_backend("kubernetes", "list_pods"):
+            pod_list = v1.list_namespaced_pod(namespace=namespace)
+        pods = [p for p in pod_list.items if p.status.phase == "Running"]
+        pods.sort(key=lambda p: p.metadata.name)
+
+    targets = []
+    for p in pods:
+        names = [c.name for c in p.spec.containers]
+        if container:
+            if container in names:
+                targets.append((p.metadata.name, container))
+        else:
+            targets.extend((p.metadata.name, name) for name in names)
+    return targets
+
+
+def compile_matcher(search_text: Optional[str] = None, search_regex: Optional[str] = None) -> Optional[re.Pattern]:
+    """Case-insensitive matcher for a regex or a literal substring (None matches everything).
+
+    Raises ``re.error`` for an invalid ``search_regex``.
+    """
+    if search_regex:
+        return re.compile(search_regex, re.IGNORECASE)
+    if search_text:
+        return re.compile(re.escape(search_text), re.IGNORECASE)
+    return None
+
+
+def _iter_lines(chunks: Iterator[bytes]) -> Iterator[str]:
+    """Split a byte stream into lines, truncating any line over LOG_MAX_LINE_BYTES."""
+    carry = b""
+    overflow = False
+    for chunk in chunks:
+        parts = (carry + chunk).split(b"\n")
+        carry = parts.pop()
+        for part in parts:
+            if not overflow:
+                yield part[:LOG_MAX_LINE_BYTES].decode("utf-8", errors="replace")
+            overflow = False
+        if len(carry) > LOG_MAX_LINE_BYTES:
+            if not overflow:
+                yield carry[:LOG_MAX_LINE_BYTES].decode("utf-8", errors="replace")
+            carry, overflow = b"", True
+    if carry and not overflow:
+        yield carry.decode("utf-8", errors="replace")
+
+
+def _read_target(
+    namespace: str,
+    pod: str,
+    container: Optional[str],
+    since_seconds: int,
+    matcher: Optional[re.Pattern],
+    limit: int,
+    scan_lines: int,
+) -> list[dict]:
+    """Stream and filter one container's log (runs on the K8s thread pool)."""
+    kwargs = {
+        "name": pod,
+        "namespace": namespace,
+        "since_seconds": since_seconds,
+        "tail_lines": scan_lines,
+        "_preload_content": False,
+    }
+    if container:
+        kwargs["container"] = container
+
+    results = []
+    resp = None
+    try:
+        # Latency covers the whole streamed read, not just the response headers.
+        with observe_backend("kubernetes", "read_pod_log"):
+            resp = _api().read_namespaced_pod_log(**kwargs)
+            for line in _iter_lines(resp.stream(LOG_STREAM_CHUNK_BYTES)):
+                if not line or (matcher is not None and not matcher.search(line)):
+                    continue
+                results.append({"pod": pod, "container": container, "log": line})
+                if len(results) >= limit:
+                    break
+    except Exception as e:
+        return [{"pod": pod, "container": container, "error": str(e)}]
+    finally:
+        if resp is not None:
+            resp.close()
+            resp.release_conn()
+    return results
+
+
+# ---------- Loki ----------
+
+def _logql_string(value: str) -> str:
+    """Quote a LogQL string literal (backticks need no escaping)."""
+    return f"`{value}`" if "`" not in value else json.dumps(value)
+
+
+def build_logql(
+    namespace: str,
     pod_name: Optional[str] = None,
     container: Optional[str] = None,
     search_text: Optional[str] = None,
-    since_minutes: int = 30,
-    limit: int = 100,
+    search_regex: Optional[str] = None,
+) -> str:
+    """Stream selector plus a case-insensitive line filter matching compile_matcher's semantics."""
+    selectors = [f"{LOKI_LABEL_NAMESPACE}={_logql_string(namespace)}"]
+    if pod_name:
+        selectors.append(f"{LOKI_LABEL_POD}={_logql_string(pod_name)}")
+    if container:
+        selectors.append(f"{LOKI_LABEL_CONTAINER}={_logql_string(container)}")
+    query = "{" + ", ".join(selectors) + "}"
+    pattern = search_regex or (re.escape(search_text) if search_text else None)
+    if pattern:
+        query += f" |~ {_logql_string('(?i)' + pattern)}"
+    return query
+
+
+async def _query_loki(
+    namespace: str,
+    pod_name: Optional[str],
+    container: Optional[str],
+    search_text: Optional[str],
+    search_regex: Optional[str],
+    since_minutes: int,
+    limit: int,
+    direction: str,
 ) -> list[dict]:
-    """Search pod logs via the Kubernetes API."""
-    _load_k8s()
-    v1 = client.CoreV1Api()
+    """One LogQL range query; streams are merged into a single time-ordered list."""
+    end = time.time()
+    resp = await get_pool("loki", LOKI_URL, timeout=LOKI_TIMEOUT, use_sa_token=LOKI_USE_SA_TOKEN).get(
+        LOKI_QUERY_PATH,
+        params={
+            "query": build_logql(namespace, pod_name, container, search_text, search_regex),
+            "start": str(int((end - since_minutes * 60) * 1e9)),
+            "end": str(int(end * 1e9)),
+            "limit": limit,
+            "direction": direction,
+        },
+        operation="query_range",
+    )
+    resp.raise_for_status()
 
-    since_seconds = since_minutes * 60
-    results = []
+    entries = []
+    for stream in resp.json().get("data", {}).get("result", []):
+        labels = stream.get("stream", {})
+        pod = labels.get(LOKI_LABEL_POD)
+        ctr = labels.get(LOKI_LABEL_CONTAINER)
+        for ts, line in stream.get("values", []):
+            entries.append((int(ts), pod, ctr, line))
+    entries.sort(key=lambda e: e[0], reverse=direction == "backward")
+    return [
+        {
+            "pod": pod,
+            "container": ctr,
+            "timestamp": datetime.fromtimestamp(ts / 1e9, tz=timezone.utc).isoformat(),
+            "log": line,
+        }
+        for ts, pod, ctr, line in entries[:limit]
+    ]
 
-    if pod_name:
-        pods = [pod_name]
-    else:
-        pod_list = v1.list_namespaced_pod(namespace=namespace)
-        pods = [p.metadata.name for p in pod_list.items if p.status.phase == "Running"]
 
-    for pname in pods:
+# ---------- Search ----------
+
+async def iter_logs(
+    namespace: str = "bookinfo",
+    pod_name: Optional[str] = None,
+    container: Optional[str] = None,
+    search_text: Optional[str] = None,
+    since_minutes: int = 30,
+    limit: int = 100,
+    search_regex: Optional[str] = None,
+    scan_lines: Optional[int] = None,
+    direction: str = "backward",
+) -> AsyncIterator[dict]:
+    """Yield matching log lines, from Loki when configured, else reading pods concurrently.
+
+    ``direction`` ("backward" = newest first) applies to Loki results.
+    ``scan_lines`` is how many trailing lines of each container the
+    Kubernetes path scans (default ``limit``, capped at LOG_SCAN_MAX_LINES).
+    """
+    if LOG_BACKEND == "loki" and LOKI_URL:
         try:
-            kwargs = {
-                "name": pname,
-                "namespace": namespace,
-                "since_seconds": since_seconds,
-                "tail_lines": limit,
-            }
-            if container:
-                kwargs["container"] = container
+            items = await _query_loki(
+                namespace, pod_name, container, search_text, search_regex, since_minutes, limit, direction
+            )
+        except _LOKI_FALLBACK_ERRORS as e:
+            log.warning(f"Loki query failed, falling back to pod logs: {type(e).__name__}: {e}")
+        else:
+            for item in items:
+                yield item
+            return
 
-            log_text = v1.read_namespaced_pod_log(**kwargs)
-        except Exception as e:
-            results.append({"pod": pname, "error": str(e)})
-            continue
+    matcher = compile_matcher(search_text, search_regex)
+    since_seconds = since_minutes * 60
+    scan = min(max(scan_lines or limit, limit), LOG_SCAN_MAX_LINES)
+    targets = await run_k8s(_resolve_targets, namespace, pod_name, container)
 
-        lines = log_text.strip().split("\n") if log_text else []
+    sem = asyncio.Semaphore(LOG_FANOUT_CONCURRENCY)
 
-        if search_text:
-            lines = [l for l in lines if search_text.lower() in l.lower()]
+    async def read(pod: str, ctr: Optional[str]) -> list[dict]:
+        async with sem:
+            try:
+                return await run_k8s(_read_target, namespace, pod, ctr, since_seconds, matcher, limit, scan)
+            except (BackendSaturated, DeadlineExceeded) as e:
+                # Same per-pod error record as _read_target, so other pods' lines still come back
+                return [{"pod": pod, "container": ctr, "error": str(e)}]
 
-        for line in lines[:limit]:
-            results.append({"pod": pname, "log": line})
+    tasks = [asyncio.create_task(read(pod, ctr)) for pod, ctr in targets]
+    emitted = 0
+    try:
+        for task in tasks:
+            for item in await task:
+                yield item
+                emitted += 1
+                if emitted >= limit:
+                    return
+    finally:
+        for task in tasks:
+            task.cancel()
 
-        if len(results) >= limit:
-            break
 
-    return results[:limit]
+async def search_logs(
+    namespace: str = "bookinfo",
+    pod_name: Optional[str] = None,
+    container: Optional[str] = None,
+    search_text: Optional[str] = None,
+    since_minutes: int = 30,
+    limit: int = 100,
+    search_regex: Optional[str] = None,
+    scan_lines: Optional[int] = None,
+    direction: str = "backward",
+) -> list[dict]:
+    """Search logs via Loki or the Kubernetes API (see iter_logs)."""
+    return [
+        item
+        async for item in iter_logs(
+            namespace=namespace,
+            pod_name=pod_name,
+            container=container,
+            search_text=search_text,
+            since_minutes=since_minutes,
+            limit=limit,
+            search_regex=search_regex,
+            scan_lines=scan_lines,
+            direction=direction,
+        )
+    ]
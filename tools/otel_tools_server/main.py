@@ -4,25 +4,84 @@ Provides four endpoints that the Llama Stack agent uses for tool-mediated
 evidence retrieval during incident investigation:
   - /tools/getMetricHistory   (Prometheus / Thanos)
   - /tools/getK8sEvents       (Kubernetes API)
-  - /tools/searchLogs          (placeholder)
-  - /tools/getTraceWaterfall   (placeholder)
+  - /tools/searchLogs          (Loki / Kubernetes pod logs)
+  - /tools/getTraceWaterfall   (Tempo / Jaeger)
+
+/tools/batch runs several of the above in one request, concurrently, and
+/tools/evidencePack assembles the harness's initial evidence bundle for a
+fault window in one call.
+
+Callers with a time budget send ``X-Request-Deadline-Ms`` (ms remaining);
+backend calls shrink their timeouts to fit and an exhausted budget returns
+504 (see deadline.py).
 """
 
+import asyncio
+import json
+import logging
 import os
+import re
+import time
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from pydantic import BaseModel, Field
-from typing import Optional
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel, Field, ValidationError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Any, Literal, Optional
 
+from .admission import BackendSaturated
+from .concurrency import monitor_event_loop_lag, shutdown_k8s_executor
+from .deadline import DEADLINE_HEADER, DeadlineExceeded, clamp_timeout, reset_deadline, set_deadline
+from .evidence_pack import build_evidence_pack
+from .http_pool import close_all as close_http_pools
 from .promql import query_prometheus, query_prometheus_range
-from .k8s_events import get_k8s_events
-from .loki_or_logs import search_logs
+from .singleflight import SingleFlight
+from .k8s_events import query_k8s_events, start_event_informers, stop_event_informers
+from .loki_or_logs import compile_matcher, iter_logs, search_logs
+from .metrics import (
+    TOOL_IN_FLIGHT,
+    TOOL_LATENCY,
+    TOOL_REQUESTS,
+    TOOL_RESPONSE_BYTES,
+    TOOL_RESULT_COUNT,
+)
 from .tempo_or_traces import get_trace_waterfall
+from .truncation import fit_to_budget
+
+
+log = logging.getLogger(__name__)
+
+BATCH_MAX_CALLS = int(os.environ.get("BATCH_MAX_CALLS", "32"))
+BATCH_ITEM_TIMEOUT = float(os.environ.get("BATCH_ITEM_TIMEOUT_SECONDS", "30"))
+
+# Concurrent identical requests share one backend call (metrics coalesce in promql.py).
+_events_flight = SingleFlight("k8s_events")
+_logs_flight = SingleFlight("logs")
+_traces_flight = SingleFlight("traces")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own process-lifetime resources (event informers, K8s thread pool, pooled HTTP clients)."""
+    try:
+        start_event_informers()
+    except Exception as e:
+        log.warning(f"Event informers not started, getK8sEvents will list per request: {e}")
+    lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+    yield
+    lag_monitor.cancel()
+    stop_event_informers()
+    shutdown_k8s_executor()
+    await close_http_pools()
+
 
 app = FastAPI(
     title="AIOps Tools Server",
     description="Tool-mediated evidence retrieval for AIOps harness",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -32,8 +91,11 @@ class MetricHistoryRequest(BaseModel):
     query: str = Field(..., description="PromQL query string")
     start: Optional[str] = Field(None, description="RFC-3339 start time")
     end: Optional[str] = Field(None, description="RFC-3339 end time")
-    step: Optional[str] = Field("60s", description="Query resolution step")
+    step: Optional[str] = Field(None, description="Query resolution step (omit or \"auto\" to size it from the window)")
+    target_points: Optional[int] = Field(None, description="Points-per-series budget for an automatic step")
+    threshold: Optional[float] = Field(None, description="Report when each series first reaches this value")
     namespace: Optional[str] = Field("bookinfo", description="Target namespace for context")
+    max_tokens: Optional[int] = Field(None, description="Token budget for the response (default TOOL_RESULT_TOKEN_BUDGET, 0 = unlimited)")
 
 
 class K8sEventsRequest(BaseModel):
@@ -41,6 +103,7 @@ class K8sEventsRequest(BaseModel):
     resource_type: Optional[str] = Field(None, description="Filter by involved object kind")
     resource_name: Optional[str] = Field(None, description="Filter by involved object name")
     since_minutes: Optional[int] = Field(30, description="Look back N minutes")
+    max_tokens: Optional[int] = Field(None, description="Token budget for the response (default TOOL_RESULT_TOKEN_BUDGET, 0 = unlimited)")
 
 
 class SearchLogsRequest(BaseModel):
@@ -48,8 +111,13 @@ class SearchLogsRequest(BaseModel):
     pod_name: Optional[str] = Field(None, description="Specific pod name")
     container: Optional[str] = Field(None, description="Container name")
     search_text: Optional[str] = Field(None, description="Text pattern to search for")
+    search_regex: Optional[str] = Field(None, description="Case-insensitive regex (overrides search_text)")
     since_minutes: Optional[int] = Field(30, description="Look back N minutes")
     limit: Optional[int] = Field(100, description="Max log lines to return")
+    scan_lines: Optional[int] = Field(None, description="Trailing lines to scan per container (default: limit)")
+    direction: Literal["backward", "forward"] = Field("backward", description="Loki result order: newest or oldest first")
+    stream: bool = Field(False, description="Stream results as NDJSON instead of one JSON body")
+    max_tokens: Optional[int] = Field(None, description="Token budget for the response (default TOOL_RESULT_TOKEN_BUDGET, 0 = unlimited)")
 
 
 class TraceWaterfallRequest(BaseModel):
@@ -57,6 +125,119 @@ class TraceWaterfallRequest(BaseModel):
     service: Optional[str] = Field(None, description="Service name")
     namespace: str = Field("bookinfo", description="Kubernetes namespace")
     since_minutes: Optional[int] = Field(30, description="Look back N minutes")
+    max_tokens: Optional[int] = Field(None, description="Token budget for the response (default TOOL_RESULT_TOKEN_BUDGET, 0 = unlimited)")
+
+
+class EvidencePackRequest(BaseModel):
+    namespace: str = Field("bookinfo", description="Kubernetes namespace")
+    target: str = Field(..., description="Target deployment name (pods matched by prefix)")
+    start: str = Field(..., description="RFC-3339 window start")
+    end: str = Field(..., description="RFC-3339 window end")
+    fault_type: str = Field("", description="Fault type selecting extra queries, e.g. crashloop_bad_config")
+    events_since_minutes: int = Field(15, description="Look-back for events and logs")
+    max_tokens: Optional[int] = Field(0, description="Token budget for the bundle (0 = unlimited)")
+
+
+class ToolInvocation(BaseModel):
+    id: Optional[str] = Field(None, description="Caller's correlation ID (e.g. the model's tool_call_id)")
+    tool: str = Field(..., description="Tool name, e.g. getMetricHistory")
+    arguments: dict[str, Any] = Field(default_factory=dict, description="Tool request body")
+
+
+class BatchRequest(BaseModel):
+    calls: list[ToolInvocation] = Field(..., description="Tool invocations to execute concurrently")
+    timeout_seconds: Optional[float] = Field(None, description="Per-item timeout (default BATCH_ITEM_TIMEOUT_SECONDS)")
+
+
+# ---------- Backpressure ----------
+
+@app.exception_handler(BackendSaturated)
+async def backend_saturated_handler(request: Request, exc: BackendSaturated):
+    """Fast 429 (queue full) / 503 (queue wait expired) with Retry-After."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": str(exc), "backend": exc.backend, "retry_after_seconds": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    """The caller's budget ran out; tell it promptly instead of finishing work nobody will read."""
+    return JSONResponse(status_code=504, content={"error": str(exc)})
+
+
+@app.middleware("http")
+async def request_deadline(request: Request, call_next):
+    """Apply the caller's X-Request-Deadline-Ms budget to everything this request does."""
+    header = request.headers.get(DEADLINE_HEADER)
+    if header is None:
+        return await call_next(request)
+    try:
+        remaining_ms = float(header)
+    except ValueError:
+        return JSONResponse(status_code=400, content={"error": f"Invalid {DEADLINE_HEADER}: {header!r}"})
+    if remaining_ms <= 0:
+        return JSONResponse(status_code=504, content={"error": "deadline exceeded before the request started"})
+    token = set_deadline(remaining_ms / 1000)
+    try:
+        return await call_next(request)
+    finally:
+        reset_deadline(token)
+
+
+# ---------- Instrumentation ----------
+
+class ToolMetricsMiddleware:
+    """Latency, status, in-flight and response-size metrics for /tools/* requests.
+
+    Pure ASGI, so it sees the messages actually sent: latency is recorded
+    when the app finishes sending (streamed NDJSON responses are measured end
+    to end) and the size only when the whole body went out. A client that
+    disconnects early, or an app that fails before responding (counted as
+    5xx), still settles the in-flight gauge.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/tools/"):
+            await self.app(scope, receive, send)
+            return
+        tool = path[len("/tools/"):]
+        if tool not in TOOL_HANDLERS and tool != "batch":
+            tool = "unknown"  # keep label cardinality bounded
+
+        TOOL_IN_FLIGHT.labels(tool=tool).inc()
+        start = time.perf_counter()
+        status, size, complete = 500, 0, False
+
+        async def counted_send(message: Message):
+            nonlocal status, size, complete
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, counted_send)
+        finally:
+            TOOL_LATENCY.labels(tool=tool, entry="http").observe(time.perf_counter() - start)
+            TOOL_REQUESTS.labels(tool=tool, status=f"{status // 100}xx").inc()
+            if complete:
+                TOOL_RESPONSE_BYTES.labels(tool=tool).observe(size)
+            TOOL_IN_FLIGHT.labels(tool=tool).dec()
+
+
+app.add_middleware(ToolMetricsMiddleware)
+
+
+def _observe_results(tool: str, count: int):
+    TOOL_RESULT_COUNT.labels(tool=tool).observe(count)
 
 
 # ---------- Endpoints ----------
@@ -66,6 +247,12 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus exposition of per-tool, backend, cache and event-loop metrics."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.post("/tools/getMetricHistory")
 async def get_metric_history(req: MetricHistoryRequest):
     """Query Prometheus/Thanos for metric history."""
@@ -74,46 +261,169 @@ async def get_metric_history(req: MetricHistoryRequest):
             query=req.query,
             start=req.start,
             end=req.end,
-            step=req.step or "60s",
+            step=req.step,
+            threshold=req.threshold,
+            target_points=req.target_points,
         )
     else:
         result = await query_prometheus(query=req.query)
-    return {"tool": "getMetricHistory", "query": req.query, "result": result}
+    _observe_results("getMetricHistory", result.get("resultCount", 0))
+    return fit_to_budget({"tool": "getMetricHistory", "query": req.query, "result": result}, req.max_tokens)
 
 
 @app.post("/tools/getK8sEvents")
 async def get_k8s_events_endpoint(req: K8sEventsRequest):
     """Retrieve Kubernetes events filtered by namespace and resource."""
-    events = get_k8s_events(
+    kwargs = dict(
         namespace=req.namespace,
         resource_type=req.resource_type,
         resource_name=req.resource_name,
         since_minutes=req.since_minutes or 30,
     )
-    return {"tool": "getK8sEvents", "namespace": req.namespace, "events": events}
+    events = await _events_flight.do(tuple(kwargs.items()), lambda: query_k8s_events(**kwargs))
+    _observe_results("getK8sEvents", len(events))
+    return fit_to_budget({"tool": "getK8sEvents", "namespace": req.namespace, "events": events}, req.max_tokens)
 
 
 @app.post("/tools/searchLogs")
 async def search_logs_endpoint(req: SearchLogsRequest):
     """Search pod logs for patterns."""
-    logs = search_logs(
+    try:
+        compile_matcher(req.search_text, req.search_regex)
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search_regex: {e}")
+
+    kwargs = dict(
         namespace=req.namespace,
         pod_name=req.pod_name,
         container=req.container,
         search_text=req.search_text,
         since_minutes=req.since_minutes or 30,
         limit=req.limit or 100,
+        search_regex=req.search_regex,
+        scan_lines=req.scan_lines,
+        direction=req.direction,
     )
-    return {"tool": "searchLogs", "namespace": req.namespace, "results": logs}
+    if req.stream:
+        items = iter_logs(**kwargs)
+        # Resolve targets and make the first backend call before the 200 goes
+        # out, so their errors keep their 4xx/5xx mapping.
+        try:
+            first = [await anext(items)]
+        except StopAsyncIteration:
+            first = []
+
+        async def ndjson():
+            count = 0
+            try:
+                for item in first:
+                    count += 1
+                    yield json.dumps(item) + "\n"
+                async for item in items:
+                    count += 1
+                    yield json.dumps(item) + "\n"
+            except Exception as e:
+                # Too late for a status code; end the stream with an error line instead.
+                log.warning(f"searchLogs stream failed after {count} lines: {e}")
+                yield json.dumps({"error": str(e)}) + "\n"
+            finally:
+                await items.aclose()
+                _observe_results("searchLogs", count)
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    logs = await _logs_flight.do(tuple(kwargs.items()), lambda: search_logs(**kwargs))
+    _observe_results("searchLogs", len(logs))
+    return fit_to_budget({"tool": "searchLogs", "namespace": req.namespace, "results": logs}, req.max_tokens)
 
 
 @app.post("/tools/getTraceWaterfall")
 async def get_trace_waterfall_endpoint(req: TraceWaterfallRequest):
-    """Retrieve distributed trace waterfall data."""
-    traces = get_trace_waterfall(
+    """Summarize distributed traces: waterfall, critical path and per-service latency."""
+    kwargs = dict(
         trace_id=req.trace_id,
         service=req.service,
         namespace=req.namespace,
         since_minutes=req.since_minutes or 30,
     )
-    return {"tool": "getTraceWaterfall", "namespace": req.namespace, "traces": traces}
+    traces = await _traces_flight.do(tuple(kwargs.items()), lambda: get_trace_waterfall(**kwargs))
+    _observe_results("getTraceWaterfall", len(traces))
+    return fit_to_budget({"tool": "getTraceWaterfall", "namespace": req.namespace, "traces": traces}, req.max_tokens)
+
+
+@app.post("/tools/evidencePack")
+async def evidence_pack_endpoint(req: EvidencePackRequest):
+    """Collect the fault window's metrics, events and logs concurrently in one bundle."""
+    pack = await build_evidence_pack(
+        namespace=req.namespace,
+        target=req.target,
+        start=req.start,
+        end=req.end,
+        fault_type=req.fault_type,
+        events_since_minutes=req.events_since_minutes,
+    )
+    _observe_results("evidencePack", len(pack["metrics"]) + len(pack["events"]) + len(pack["logs"]))
+    return fit_to_budget({"tool": "evidencePack", **pack}, req.max_tokens)
+
+
+# ---------- Batch ----------
+
+# Tool name -> (request model, endpoint handler). Handlers return the same
+# body whether invoked directly or through /tools/batch.
+TOOL_HANDLERS = {
+    "getMetricHistory": (MetricHistoryRequest, get_metric_history),
+    "getK8sEvents": (K8sEventsRequest, get_k8s_events_endpoint),
+    "searchLogs": (SearchLogsRequest, search_logs_endpoint),
+    "getTraceWaterfall": (TraceWaterfallRequest, get_trace_waterfall_endpoint),
+    "evidencePack": (EvidencePackRequest, evidence_pack_endpoint),
+}
+
+
+def _invocation_error(e: Exception, timeout: float) -> str:
+    """The error message a batch item reports for ``e``."""
+    if isinstance(e, asyncio.TimeoutError):
+        return f"Timed out after {timeout:.3g}s"
+    if isinstance(e, ValidationError):
+        return f"Invalid arguments: {e.errors(include_url=False)}"
+    if isinstance(e, HTTPException):
+        return str(e.detail)
+    return str(e)
+
+
+async def _run_invocation(call: ToolInvocation, timeout: float) -> dict:
+    """Execute one batch item; failures are reported in the item, never raised."""
+    item = {"id": call.id, "tool": call.tool}
+    entry = TOOL_HANDLERS.get(call.tool)
+    if entry is None:
+        return {**item, "status": "error", "error": f"Unknown tool: {call.tool}"}
+
+    model, handler = entry
+    start = time.perf_counter()
+    try:
+        req = model.model_validate(call.arguments)
+        if isinstance(req, SearchLogsRequest):
+            req.stream = False  # batch items always return a JSON body
+        response = await asyncio.wait_for(handler(req), timeout=timeout)
+        item.update(status="ok", response=response)
+    except Exception as e:
+        item.update(status="error", error=_invocation_error(e, timeout))
+        if isinstance(e, BackendSaturated):
+            item["retry_after_seconds"] = e.retry_after
+    elapsed = time.perf_counter() - start
+    TOOL_LATENCY.labels(tool=call.tool, entry="batch").observe(elapsed)
+    item["elapsed_ms"] = round(elapsed * 1000, 1)
+    return item
+
+
+@app.post("/tools/batch")
+async def batch_endpoint(req: BatchRequest):
+    """Execute several tool invocations concurrently; results are returned in request order."""
+    if len(req.calls) > BATCH_MAX_CALLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(req.calls)} calls, max is {BATCH_MAX_CALLS}",
+        )
+    timeout = clamp_timeout(req.timeout_seconds or BATCH_ITEM_TIMEOUT, "batch")
+    results = await asyncio.gather(*(_run_invocation(c, timeout) for c in req.calls))
+    _observe_results("batch", len(results))
+    return {"tool": "batch", "results": results}
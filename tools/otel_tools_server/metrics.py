@@ -0,0 +1,135 @@
+"""Prometheus metrics for the tools server.
+
+All collectors live here so every module records into the same registry and
+the /metrics endpoint in main.py exposes them in one scrape.
+"""
+
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Latency buckets tuned for backend API calls (sub-10ms keep-alive hits up to
+# slow range queries that approach the 30s client timeout).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+BACKEND_LATENCY = Histogram(
+    "aiops_tools_backend_request_seconds",
+    "Latency of calls from the tools server to backend APIs",
+    ["backend", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+BACKEND_IN_FLIGHT = Gauge(
+    "aiops_tools_backend_requests_in_flight",
+    "Backend API calls currently outstanding",
+    ["backend"],
+)
+
+ADMISSION_ACTIVE = Gauge(
+    "aiops_tools_admission_active",
+    "Backend calls currently holding an admission slot",
+    ["backend"],
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "aiops_tools_admission_queue_depth",
+    "Backend calls waiting for an admission slot",
+    ["backend"],
+)
+
+ADMISSION_WAIT = Histogram(
+    "aiops_tools_admission_wait_seconds",
+    "Time spent queued for an admission slot",
+    ["backend"],
+    buckets=(0.0, 0.005, 0.025, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+ADMISSION_REJECTED = Counter(
+    "aiops_tools_admission_rejected_total",
+    "Backend calls refused by admission control (queue_full -> 429, wait_timeout -> 503, deadline -> 504)",
+    ["backend", "reason"],
+)
+
+BACKEND_CLIENT_BUILDS = Counter(
+    "aiops_tools_backend_client_builds_total",
+    "HTTP client (re)builds per backend; each build pays fresh TCP/TLS handshakes",
+    ["backend"],
+)
+
+CACHE_REQUESTS = Counter(
+    "aiops_tools_cache_requests_total",
+    "Tool result cache lookups by outcome (hit/miss)",
+    ["cache", "result"],
+)
+
+CACHE_HIT_RATIO = Gauge(
+    "aiops_tools_cache_hit_ratio",
+    "Fraction of lookups served from cache since process start",
+    ["cache"],
+)
+
+SINGLEFLIGHT_REQUESTS = Counter(
+    "aiops_tools_singleflight_requests_total",
+    "Tool queries that started a backend call (leader) or joined an identical in-flight one (coalesced)",
+    ["group", "result"],
+)
+
+SINGLEFLIGHT_WAITERS = Gauge(
+    "aiops_tools_singleflight_waiters",
+    "Callers currently waiting on a shared in-flight backend call",
+    ["group"],
+)
+
+# ---------- Per-tool ----------
+
+TOOL_LATENCY = Histogram(
+    "aiops_tools_tool_request_seconds",
+    "End-to-end latency of tool invocations (entry: http or batch item)",
+    ["tool", "entry"],
+    buckets=LATENCY_BUCKETS,
+)
+
+TOOL_REQUESTS = Counter(
+    "aiops_tools_tool_requests_total",
+    "Tool invocations by HTTP status class (2xx/4xx/5xx)",
+    ["tool", "status"],
+)
+
+TOOL_IN_FLIGHT = Gauge(
+    "aiops_tools_tool_requests_in_flight",
+    "Tool requests currently being served",
+    ["tool"],
+)
+
+TOOL_RESPONSE_BYTES = Histogram(
+    "aiops_tools_tool_response_bytes",
+    "Size of tool response bodies; large bodies inflate the agent's context",
+    ["tool"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+TOOL_RESULT_COUNT = Histogram(
+    "aiops_tools_tool_result_count",
+    "Items returned per tool call (series, events, log lines, traces, batch items)",
+    ["tool"],
+    buckets=(0, 1, 5, 10, 20, 50, 100, 250, 500, 1000),
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "aiops_tools_event_loop_lag_seconds",
+    "Delay between a scheduled event-loop wake-up and when it actually ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+@contextmanager
+def observe_backend(backend: str, operation: str):
+    """Track one backend call in BACKEND_IN_FLIGHT and BACKEND_LATENCY."""
+    BACKEND_IN_FLIGHT.labels(backend=backend).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        BACKEND_LATENCY.labels(backend=backend, operation=operation).observe(time.perf_counter() - start)
+        BACKEND_IN_FLIGHT.labels(backend=backend).dec()
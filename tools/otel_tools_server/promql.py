@@ -1,97 +1,216 @@
-"""PromQL helpers — query Prometheus/Thanos for metric data."""
+"""PromQL helpers — query Prometheus/Thanos for metric data.
 
+Long range queries are split into step-aligned time shards of at most
+THANOS_SHARD_MAX_POINTS points per series, fetched concurrently (up to
+THANOS_SHARD_CONCURRENCY at once) and stitched back into one matrix before
+summarizing. If any shard fails the whole window is retried as a single
+query; if that fails too, the stitched successful shards are returned marked
+``partial``.
+
+When no step is given (or step is "auto") it is chosen by steps.plan_step from
+the window length and the query's range selectors.
+"""
+
+import asyncio
+import logging
+import math
 import os
-import httpx
+import re
+import time
+from typing import Optional
+
+from .cache import TTLCache
+from .http_pool import get_pool
+from .singleflight import SingleFlight
+from .steps import format_step, parse_duration, parse_timestamp, plan_step
+from .summarize import summarize_response
+
+log = logging.getLogger(__name__)
 
 THANOS_URL = os.environ.get(
     "THANOS_QUERIER_URL",
     "https://thanos-querier.openshift-monitoring.svc:9091",
 )
-# When running in-cluster, use the SA token for auth
-TOKEN_PATH = "/var/run/secrets/kubernetes.io/serviceaccount/token"
-CA_PATH = "/var/run/secrets/kubernetes.io/serviceaccount/service-ca.crt"
+THANOS_TIMEOUT = float(os.environ.get("THANOS_TIMEOUT_SECONDS", "30"))
 
+# Range-query result cache. Windows whose end is within one step of "now" are
+# still filling in, so they get the short live TTL.
+METRIC_CACHE_MAX_ENTRIES = int(os.environ.get("METRIC_CACHE_MAX_ENTRIES", "512"))
+METRIC_CACHE_TTL = float(os.environ.get("METRIC_CACHE_TTL_SECONDS", "300"))
+METRIC_CACHE_LIVE_TTL = float(os.environ.get("METRIC_CACHE_LIVE_TTL_SECONDS", "15"))
 
-def _get_headers() -> dict:
-    """Build auth headers using the in-cluster service account token."""
-    try:
-        with open(TOKEN_PATH) as f:
-            token = f.read().strip()
-        return {"Authorization": f"Bearer {token}"}
-    except FileNotFoundError:
-        return {}
+THANOS_SHARD_MAX_POINTS = int(os.environ.get("THANOS_SHARD_MAX_POINTS", "2000"))
+THANOS_SHARD_CONCURRENCY = int(os.environ.get("THANOS_SHARD_CONCURRENCY", "4"))
 
+_range_cache = TTLCache("metric_range", max_entries=METRIC_CACHE_MAX_ENTRIES)
 
-def _get_verify():
-    """Return CA bundle path if available, else disable TLS verify for dev."""
-    if os.path.exists(CA_PATH):
-        return CA_PATH
-    # Also check OpenShift injected CA
-    openshift_ca = "/var/run/secrets/kubernetes.io/serviceaccount/ca.crt"
-    if os.path.exists(openshift_ca):
-        return openshift_ca
-    return False
+# Identical queries already in flight share one Thanos call (keyed like the
+# cache, minus the summary-only threshold).
+_range_flight = SingleFlight("metric_range")
+_instant_flight = SingleFlight("metric_instant")
+
+
+def _thanos():
+    return get_pool("thanos", THANOS_URL, timeout=THANOS_TIMEOUT)
 
 
 async def query_prometheus(query: str) -> dict:
     """Execute an instant PromQL query."""
-    async with httpx.AsyncClient(verify=_get_verify(), timeout=30.0) as client:
-        resp = await client.get(
-            f"{THANOS_URL}/api/v1/query",
-            params={"query": query},
-            headers=_get_headers(),
-        )
-        resp.raise_for_status()
-        data = resp.json()
-    return _summarize(data)
-
-
-async def query_prometheus_range(query: str, start: str, end: str, step: str = "60s") -> dict:
-    """Execute a range PromQL query."""
-    async with httpx.AsyncClient(verify=_get_verify(), timeout=30.0) as client:
-        resp = await client.get(
-            f"{THANOS_URL}/api/v1/query_range",
-            params={"query": query, "start": start, "end": end, "step": step},
-            headers=_get_headers(),
-        )
-        resp.raise_for_status()
-        data = resp.json()
-    return _summarize(data)
-
-
-def _summarize(prom_response: dict) -> dict:
-    """Convert raw Prometheus JSON into a compact summary for the agent."""
-    status = prom_response.get("status", "unknown")
-    result_type = prom_response.get("data", {}).get("resultType", "unknown")
-    results = prom_response.get("data", {}).get("result", [])
-
-    summarized = []
-    for r in results[:20]:  # cap to avoid context overflow
-        metric = r.get("metric", {})
-        if result_type == "matrix":
-            values = r.get("values", [])
-            if values:
-                nums = [float(v[1]) for v in values if v[1] != "NaN"]
-                summary = {
-                    "metric": metric,
-                    "samples": len(values),
-                    "min": round(min(nums), 4) if nums else None,
-                    "max": round(max(nums), 4) if nums else None,
-                    "avg": round(sum(nums) / len(nums), 4) if nums else None,
-                    "latest": values[-1][1] if values else None,
-                }
-            else:
-                summary = {"metric": metric, "samples": 0}
-        elif result_type == "vector":
-            value = r.get("value", [None, None])
-            summary = {"metric": metric, "value": value[1] if len(value) > 1 else None}
+    return summarize_response(await _instant_flight.do(normalize_query(query), lambda: _fetch_instant(query)))
+
+
+async def _fetch_instant(query: str) -> dict:
+    resp = await _thanos().get("/api/v1/query", params={"query": query}, operation="query")
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def query_prometheus_range(
+    query: str,
+    start: str,
+    end: str,
+    step: Optional[str] = None,
+    threshold: Optional[float] = None,
+    target_points: Optional[int] = None,
+) -> dict:
+    """Execute a range PromQL query, served from the window-aligned cache when possible.
+
+    ``step`` None or "auto" plans one for ~``target_points`` points per series.
+    ``threshold`` adds each series' first crossing time to the summary.
+    """
+    if not step or step == "auto":
+        start_s, end_s = parse_timestamp(start), parse_timestamp(end)
+        if start_s is None or end_s is None:
+            step = "60s"
         else:
-            summary = {"metric": metric, "raw": r}
-        summarized.append(summary)
-
-    return {
-        "status": status,
-        "resultType": result_type,
-        "resultCount": len(results),
-        "data": summarized,
-    }
+            step = format_step(plan_step(query, start_s, end_s, target_points))
+
+    key = _range_cache_key(query, start, end, step)
+    if key is None:
+        # Unparseable times/step — pass through to Thanos untouched.
+        return summarize_response(await _fetch_range(query, start, end, step), threshold)
+
+    key = (*key, threshold)
+    cached = _range_cache.get(key)
+    if cached is not None:
+        return cached
+
+    _, step_s, start_a, end_a, _ = key
+    raw = await _range_flight.do(key[:4], lambda: _fetch_range_sharded(query, start_a, end_a, step_s))
+    result = summarize_response(raw, threshold)
+    result["step"] = format_step(step_s)
+    if raw.get("partial"):
+        result["partial"] = True
+        result["failedShards"] = raw["failedShards"]
+    elif result.get("status") == "success":
+        live = end_a >= time.time() - step_s
+        _range_cache.put(key, result, METRIC_CACHE_LIVE_TTL if live else METRIC_CACHE_TTL)
+    return result
+
+
+async def _fetch_range(query: str, start: str, end: str, step: str) -> dict:
+    """One /api/v1/query_range request; returns the raw Prometheus JSON."""
+    resp = await _thanos().get(
+        "/api/v1/query_range",
+        params={"query": query, "start": start, "end": end, "step": step},
+        operation="query_range",
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+# ---------- Time sharding ----------
+
+def plan_shards(start: float, end: float, step: float, max_points: int) -> list[tuple[float, float]]:
+    """Split [start, end] into consecutive step-aligned windows of at most ``max_points`` points.
+
+    Shards do not overlap: each ends one step before the next begins, so
+    stitched series contain every evaluation timestamp exactly once.
+    """
+    max_points = max(max_points, 1)
+    shards = []
+    shard_start = start
+    while shard_start <= end:
+        shard_end = min(shard_start + (max_points - 1) * step, end)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end + step
+    return shards
+
+
+def _stitch(responses: list[dict]) -> dict:
+    """Concatenate per-shard matrices (in time order) series by series."""
+    series: dict[tuple, dict] = {}
+    for resp in responses:
+        for r in resp.get("data", {}).get("result", []):
+            metric = r.get("metric", {})
+            key = tuple(sorted(metric.items()))
+            if key not in series:
+                series[key] = {"metric": metric, "values": []}
+            series[key]["values"].extend(r.get("values", []))
+    return {"status": "success", "data": {"resultType": "matrix", "result": list(series.values())}}
+
+
+async def _fetch_range_sharded(query: str, start: float, end: float, step: float) -> dict:
+    """Fetch a range query, sharding windows with more than THANOS_SHARD_MAX_POINTS points."""
+    shards = plan_shards(start, end, step, THANOS_SHARD_MAX_POINTS)
+    if len(shards) == 1:
+        return await _fetch_range(query, _fmt_ts(start), _fmt_ts(end), _fmt_ts(step))
+
+    sem = asyncio.Semaphore(THANOS_SHARD_CONCURRENCY)
+
+    async def fetch(shard_start: float, shard_end: float) -> dict:
+        async with sem:
+            return await _fetch_range(query, _fmt_ts(shard_start), _fmt_ts(shard_end), _fmt_ts(step))
+
+    outcomes = await asyncio.gather(*(fetch(s, e) for s, e in shards), return_exceptions=True)
+    ok = [o for o in outcomes if isinstance(o, dict) and o.get("status") == "success"]
+    if len(ok) == len(shards):
+        return _stitch(ok)
+
+    failed = [
+        {"start": _fmt_ts(s), "end": _fmt_ts(e),
+         "error": str(o) if isinstance(o, Exception) else o.get("error", o.get("status"))}
+        for (s, e), o in zip(shards, outcomes) if o not in ok
+    ]
+    log.warning(f"{len(failed)}/{len(shards)} shards failed for {query!r}, retrying unsharded")
+    try:
+        return await _fetch_range(query, _fmt_ts(start), _fmt_ts(end), _fmt_ts(step))
+    except Exception:
+        if not ok:
+            raise
+    partial = _stitch(ok)
+    partial.update(partial=True, failedShards=failed)
+    return partial
+
+
+# ---------- Cache key normalization ----------
+
+_QUOTED = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|`[^`]*`')
+_PUNCT_SPACE = re.compile(r"\s*([{}()\[\],=~!])\s*")
+
+
+def normalize_query(query: str) -> str:
+    """Canonicalize PromQL whitespace outside string literals."""
+    out, pos = [], 0
+    for m in _QUOTED.finditer(query):
+        out.append(_PUNCT_SPACE.sub(r"\1", " ".join(query[pos:m.start()].split())))
+        out.append(m.group())
+        pos = m.end()
+    out.append(_PUNCT_SPACE.sub(r"\1", " ".join(query[pos:].split())))
+    return "".join(out).strip()
+
+
+def _fmt_ts(value: float) -> str:
+    """Format epoch seconds (or a step in seconds) as Prometheus accepts them."""
+    return f"{value:.3f}"
+
+
+def _range_cache_key(query: str, start: str, end: str, step: str) -> Optional[tuple]:
+    """Key on (normalized query, step, start/end aligned outward to step boundaries)."""
+    step_s = parse_duration(step or "")
+    start_s, end_s = parse_timestamp(start), parse_timestamp(end)
+    if not step_s or step_s <= 0 or start_s is None or end_s is None:
+        return None
+    start_a = math.floor(start_s / step_s) * step_s
+    end_a = math.ceil(end_s / step_s) * step_s
+    return normalize_query(query), step_s, start_a, end_a
@@ -0,0 +1,53 @@
+"""Single-flight coalescing of identical concurrent tool queries.
+
+When several models investigate the same incident they often send
+byte-identical PromQL or event queries within milliseconds of each other.
+``SingleFlight.do`` runs the backend call once per key: the first caller
+starts it as a task, later callers with the same key await that same task and
+receive the same result (or exception). The key is forgotten as soon as the
+call finishes, so this only merges overlapping requests — caching is
+cache.py's job.
+
+Callers await the shared task through ``asyncio.shield``, so one caller
+timing out (e.g. a batch item deadline) does not cancel the call for the
+others. Shared results must be treated as read-only.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from .metrics import SINGLEFLIGHT_REQUESTS, SINGLEFLIGHT_WAITERS
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return ``await fn()``, sharing one in-flight call among concurrent callers with ``key``."""
+        task = self._calls.get(key)
+        if task is None:
+            SINGLEFLIGHT_REQUESTS.labels(group=self.name, result="leader").inc()
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+        else:
+            SINGLEFLIGHT_REQUESTS.labels(group=self.name, result="coalesced").inc()
+
+        SINGLEFLIGHT_WAITERS.labels(group=self.name).inc()
+        try:
+            return await asyncio.shield(task)
+        finally:
+            SINGLEFLIGHT_WAITERS.labels(group=self.name).dec()
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved so an unawaited failure is not logged as lost
@@ -0,0 +1,96 @@
+"""Range-query step planning.
+
+A fixed step makes payload size and query cost grow with the window: 30s over
+six hours is 720 points per series, while 60s over five minutes is barely
+enough to see a trend. ``plan_step`` instead divides the window by a
+points-per-series budget (``STEP_TARGET_POINTS``) and rounds up to a
+human-friendly step, never finer than the scrape interval
+(``STEP_MIN_SECONDS``).
+
+Range selectors in the query bound the step from above: with
+``rate(x[5m])`` evaluated every 10m, half of the samples would never fall in
+any window, so the step is capped at the shortest range even if that exceeds
+the points budget (long windows are then split by promql's time sharding).
+
+Dependency-free so the benchmark scripts can import it directly.
+"""
+
+import math
+import os
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+STEP_TARGET_POINTS = int(os.environ.get("STEP_TARGET_POINTS", "300"))
+STEP_MIN_SECONDS = float(os.environ.get("STEP_MIN_SECONDS", "15"))
+
+# Candidate steps in seconds; windows beyond the last one round up to whole days.
+STEP_LADDER = (15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 10800, 21600, 43200, 86400)
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h|d|w|y)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+_QUOTED = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|`[^`]*`')
+_RANGE_SELECTOR = re.compile(r"\[\s*([0-9a-z.]+)\s*(?::[^\]]*)?\]")
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse a Prometheus duration ("30s", "1h30m") or float seconds."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """Parse an RFC-3339 or unix timestamp into epoch seconds."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def range_selectors(query: str) -> list[float]:
+    """Durations (seconds) of the range selectors / subquery ranges in a PromQL query."""
+    unquoted = _QUOTED.sub('""', query)
+    ranges = []
+    for m in _RANGE_SELECTOR.finditer(unquoted):
+        seconds = parse_duration(m.group(1))
+        if seconds:
+            ranges.append(seconds)
+    return ranges
+
+
+def plan_step(query: str, start: float, end: float, target_points: Optional[int] = None) -> float:
+    """Pick a step (seconds) giving roughly ``target_points`` points per series over [start, end]."""
+    target = max(target_points or STEP_TARGET_POINTS, 2)
+    raw = max(end - start, 0.0) / (target - 1)
+    step = next((s for s in STEP_LADDER if s >= raw), math.ceil(raw / 86400) * 86400)
+    step = max(step, STEP_MIN_SECONDS)
+
+    ranges = range_selectors(query)
+    if ranges:
+        shortest = min(ranges)
+        if step > shortest:
+            # Largest ladder step the shortest range still covers, else the range itself.
+            step = max((s for s in STEP_LADDER if s <= shortest), default=shortest)
+    return float(step)
+
+
+def format_step(step: float) -> str:
+    """Render a step in seconds as a Prometheus duration ("30s", "5m", "1h")."""
+    for unit, seconds in (("d", 86400), ("h", 3600), ("m", 60)):
+        if step >= seconds and step % seconds == 0:
+            return f"{int(step // seconds)}{unit}"
+    return f"{step:g}s"
@@ -0,0 +1,153 @@
+"""Vectorized Prometheus result summarization.
+
+Each matrix series is converted to NumPy arrays once (timestamps and values,
+parsed in C-level passes) and every statistic is computed on those arrays,
+instead of building per-sample Python float lists. The values are sorted once;
+min, max and the percentiles are read off the sorted array.
+Besides min/max/avg the summary carries percentiles, a least-squares slope,
+an optional first threshold crossing and the strongest single step change,
+which usually answers the agent's follow-up question ("when did it start?")
+without another query.
+
+Dependency-light on purpose (NumPy only) so the benchmark scripts can import
+it directly.
+"""
+
+import os
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Optional
+
+import numpy as np
+
+# Compute cap only; what reaches the model is trimmed to a token budget by
+# truncation.fit_to_budget, which drops the least informative series first.
+MAX_SERIES = int(os.environ.get("SUMMARY_MAX_SERIES", "100"))
+
+# A step change is reported only when splitting the series at that point
+# explains at least this fraction of its variance.
+CHANGE_POINT_MIN_STRENGTH = 0.5
+
+
+_ts_of = itemgetter(0)
+_value_of = itemgetter(1)
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(float(ts), tz=timezone.utc).isoformat()
+
+
+def _r(x: float) -> float:
+    return round(float(x), 4)
+
+
+def _percentiles(ordered: np.ndarray, pcts: list) -> np.ndarray:
+    """``np.percentile(..., method="linear")`` on an already sorted array."""
+    pos = np.asarray(pcts, dtype=float) / 100 * (ordered.size - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, ordered.size - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize_series(values: list, threshold: Optional[float] = None) -> dict:
+    """Statistics for one matrix series given its ``[[ts, "value"], ...]`` samples."""
+    summary = {"samples": len(values)}
+    if not values:
+        return summary
+
+    n = len(values)
+    ys = np.fromiter(map(float, map(_value_of, values)), dtype=float, count=n)
+    # Always the real sample times: series with gaps (crash loops, scrape
+    # misses) are exactly the ones where a synthesized grid would be wrong.
+    ts = np.fromiter(map(_ts_of, values), dtype=float, count=n)
+    finite = np.isfinite(ys)
+    if not finite.all():
+        ts, ys = ts[finite], ys[finite]
+    summary["latest"] = values[-1][1]
+    if ys.size == 0:
+        summary.update(min=None, max=None, avg=None)
+        return summary
+
+    mean = ys.mean()
+    ordered = np.sort(ys)
+    p50, p95, p99 = _percentiles(ordered, [50, 95, 99])
+    summary.update(
+        min=_r(ordered[0]),
+        max=_r(ordered[-1]),
+        avg=_r(mean),
+        p50=_r(p50),
+        p95=_r(p95),
+        p99=_r(p99),
+    )
+
+    # Least-squares slope in value units per second.
+    yc = ys - mean
+    tc = ts - ts.mean()
+    denom = float(np.dot(tc, tc))
+    summary["slope_per_s"] = float(f"{np.dot(tc, yc) / denom:.6g}") if denom > 0 else 0.0
+
+    if threshold is not None:
+        above = np.flatnonzero(ys >= threshold)
+        summary["first_crossing"] = (
+            {"threshold": threshold, "time": _iso(ts[above[0]])} if above.size else None
+        )
+
+    change = _change_point(ts, yc, mean)
+    if change is not None:
+        summary["change_point"] = change
+    return summary
+
+
+def _change_point(ts: np.ndarray, yc: np.ndarray, mean: float) -> Optional[dict]:
+    """Best single split of the series into two constant segments (O(n) via cumsums).
+
+    ``yc`` is the series minus its ``mean``. Centered, the right-hand sum is
+    minus the left-hand one, so splitting after sample k-1 removes
+    ``n * left_sum**2 / (k * (n - k))`` of the sum of squares.
+    """
+    n = yc.size
+    if n < 4:
+        return None
+    total_ss = float(np.dot(yc, yc))
+    if total_ss <= 0:
+        return None
+
+    k = np.arange(1, n, dtype=float)
+    left_sum = np.cumsum(yc[:-1])
+    gain = left_sum * left_sum / (k * (n - k))
+    i = int(np.argmax(gain))
+    strength = n * float(gain[i]) / total_ss
+    if strength < CHANGE_POINT_MIN_STRENGTH:
+        return None
+    return {
+        "time": _iso(ts[i + 1]),
+        "before": _r(mean + left_sum[i] / k[i]),
+        "after": _r(mean - left_sum[i] / (n - k[i])),
+        "strength": round(strength, 3),
+    }
+
+
+def summarize_response(prom_response: dict, threshold: Optional[float] = None) -> dict:
+    """Convert raw Prometheus JSON into a compact summary for the agent."""
+    status = prom_response.get("status", "unknown")
+    result_type = prom_response.get("data", {}).get("resultType", "unknown")
+    results = prom_response.get("data", {}).get("result", [])
+
+    summarized = []
+    for r in results[:MAX_SERIES]:
+        metric = r.get("metric", {})
+        if result_type == "matrix":
+            summary = {"metric": metric, **summarize_series(r.get("values", []), threshold)}
+        elif result_type == "vector":
+            value = r.get("value", [None, None])
+            summary = {"metric": metric, "value": value[1] if len(value) > 1 else None}
+        else:
+            summary = {"metric": metric, "raw": r}
+        summarized.append(summary)
+
+    return {
+        "status": status,
+        "resultType": result_type,
+        "resultCount": len(results),
+        "data": summarized,
+    }
@@ -1,30 +1,359 @@
-"""Traces integration — placeholder for Tempo/Jaeger.
+"""Traces integration — Tempo or Jaeger query API.
 
-Returns a descriptive message when no tracing backend is configured.
-Implement Tempo or Jaeger queries when the backend is available.
+``TRACE_BACKEND`` selects the API flavour ("tempo" or "jaeger") spoken by
+``TRACE_QUERY_URL``; with no backend configured the tool returns a
+"not_configured" hint so the agent falls back to metrics and events.
+
+Traces never reach the model raw. Each fetched trace is normalized into flat
+span records, indexed once (span id -> span, parent id -> children sorted by
+start) and reduced server-side to a compact analysis: a depth-capped
+waterfall, the critical path, and per-service self/critical-path time.
+Fetched traces are immutable once complete, so normalized spans are cached by
+trace id.
 """
 
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
 from typing import Optional
 
+import httpx
+
+from .cache import TTLCache
+from .http_pool import get_pool
+
+log = logging.getLogger(__name__)
+
+TRACE_BACKEND = os.environ.get("TRACE_BACKEND", "").lower()  # "tempo" | "jaeger" | ""
+TRACE_QUERY_URL = os.environ.get("TRACE_QUERY_URL", "")
+TRACE_TIMEOUT = float(os.environ.get("TRACE_TIMEOUT_SECONDS", "30"))
+TRACE_USE_SA_TOKEN = os.environ.get("TRACE_USE_SA_TOKEN", "true").lower() in ("1", "true", "yes")
+TRACE_SEARCH_LIMIT = int(os.environ.get("TRACE_SEARCH_LIMIT", "20"))
+TRACE_MAX_TRACES = int(os.environ.get("TRACE_MAX_TRACES", "3"))  # slowest N searched traces analyzed
+TRACE_WATERFALL_MAX_SPANS = int(os.environ.get("TRACE_WATERFALL_MAX_SPANS", "40"))
+TRACE_CACHE_TTL = float(os.environ.get("TRACE_CACHE_TTL_SECONDS", "600"))
+
+_trace_cache = TTLCache("traces", max_entries=int(os.environ.get("TRACE_CACHE_MAX_ENTRIES", "256")))
+
+
+@dataclass
+class Span:
+    span_id: str
+    parent_id: Optional[str]
+    service: str
+    operation: str
+    start_us: float
+    end_us: float
+    error: bool
+
+    @property
+    def duration_us(self) -> float:
+        return self.end_us - self.start_us
+
+
+def _backend():
+    return get_pool("traces", TRACE_QUERY_URL, timeout=TRACE_TIMEOUT, use_sa_token=TRACE_USE_SA_TOKEN)
+
+
+# ---------- Backend payload normalization ----------
+
+def _otlp_attr(attributes: list, key: str) -> Optional[str]:
+    for attr in attributes or []:
+        if attr.get("key") == key:
+            value = attr.get("value", {})
+            return next(iter(value.values()), None) if value else None
+    return None
+
+
+def _spans_from_tempo(payload: dict) -> list[Span]:
+    """OTLP JSON as returned by Tempo's /api/traces/{id} (``batches`` or ``resourceSpans``)."""
+    spans = []
+    for batch in payload.get("batches") or payload.get("resourceSpans") or []:
+        service = _otlp_attr(batch.get("resource", {}).get("attributes"), "service.name") or "unknown"
+        for scope in batch.get("scopeSpans") or batch.get("instrumentationLibrarySpans") or []:
+            for s in scope.get("spans", []):
+                status = s.get("status", {}).get("code")
+                spans.append(Span(
+                    span_id=s["spanId"],
+                    parent_id=s.get("parentSpanId") or None,
+                    service=service,
+                    operation=s.get("name", ""),
+                    start_us=int(s["startTimeUnixNano"]) / 1000,
+                    end_us=int(s["endTimeUnixNano"]) / 1000,
+                    error=status in (2, "STATUS_CODE_ERROR"),
+                ))
+    return spans
+
+
+def _spans_from_jaeger(trace: dict) -> list[Span]:
+    """One element of Jaeger's ``data`` array."""
+    processes = trace.get("processes", {})
+    spans = []
+    for s in trace.get("spans", []):
+        parent = next(
+            (r["spanID"] for r in s.get("references", []) if r.get("refType") == "CHILD_OF"),
+            None,
+        )
+        tags = {t.get("key"): t.get("value") for t in s.get("tags", [])}
+        spans.append(Span(
+            span_id=s["spanID"],
+            parent_id=parent,
+            service=processes.get(s.get("processID"), {}).get("serviceName", "unknown"),
+            operation=s.get("operationName", ""),
+            start_us=float(s["startTime"]),
+            end_us=float(s["startTime"]) + float(s.get("duration", 0)),
+            error=tags.get("error") in (True, "true") or str(tags.get("http.status_code", "")).startswith("5"),
+        ))
+    return spans
+
+
+async def _fetch_trace(trace_id: str) -> Optional[list[Span]]:
+    """Spans of one trace, or None if the backend does not know it."""
+    cached = _trace_cache.get(trace_id)
+    if cached is not None:
+        return cached
+
+    resp = await _backend().get(f"/api/traces/{trace_id}", operation="trace")
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    payload = resp.json()
+    if TRACE_BACKEND == "jaeger":
+        data = payload.get("data") or []
+        spans = _spans_from_jaeger(data[0]) if data else []
+    else:
+        spans = _spans_from_tempo(payload)
+    if not spans:
+        return None
+    _trace_cache.put(trace_id, spans, TRACE_CACHE_TTL)
+    return spans
+
+
+async def _search_traces(service: str, since_minutes: int) -> list[tuple[str, float]]:
+    """(trace id, duration ms) of recent traces through ``service``, slowest first."""
+    end = time.time()
+    start = end - since_minutes * 60
+    found = []
+    if TRACE_BACKEND == "jaeger":
+        resp = await _backend().get(
+            "/api/traces",
+            params={"service": service, "start": int(start * 1e6), "end": int(end * 1e6),
+                    "limit": TRACE_SEARCH_LIMIT},
+            operation="search",
+        )
+        resp.raise_for_status()
+        for trace in resp.json().get("data") or []:
+            spans = _spans_from_jaeger(trace)
+            if spans:
+                # Search already returned full traces; keep them for the analysis step.
+                _trace_cache.put(trace["traceID"], spans, TRACE_CACHE_TTL)
+                duration = max(s.end_us for s in spans) - min(s.start_us for s in spans)
+                found.append((trace["traceID"], duration / 1000))
+    else:
+        resp = await _backend().get(
+            "/api/search",
+            params={"tags": f"service.name={service}", "start": int(start), "end": int(end),
+                    "limit": TRACE_SEARCH_LIMIT},
+            operation="search",
+        )
+        resp.raise_for_status()
+        for t in resp.json().get("traces") or []:
+            found.append((t["traceID"], float(t.get("durationMs") or 0)))
+    found.sort(key=lambda t: t[1], reverse=True)
+    return found
 
-def get_trace_waterfall(
+
+# ---------- Span tree analysis ----------
+
+def _ms(us: float) -> float:
+    return round(us / 1000, 2)
+
+
+def _break_parent_cycles(spans: list[Span], children: dict[str, list[Span]], roots: list[Span]):
+    """Make every span reachable from a root.
+
+    Spans whose parent links form a cycle are not reachable from any root
+    (and a trace made only of such spans has no root at all). Each cycle is
+    cut at its earliest span, which becomes a root.
+    """
+    reached: set[int] = set()
+
+    def reach(root: Span):
+        stack = [root]
+        while stack:
+            s = stack.pop()
+            if id(s) not in reached:
+                reached.add(id(s))
+                stack.extend(children.get(s.span_id, ()))
+
+    for r in roots:
+        reach(r)
+    if len(reached) == len(spans):
+        return
+    for s in sorted(spans, key=lambda s: s.start_us):
+        if id(s) not in reached:
+            children[s.parent_id].remove(s)
+            roots.append(s)
+            reach(s)
+
+
+def analyze_trace(trace_id: str, spans: list[Span]) -> dict:
+    """Waterfall, critical path and per-service breakdown from one pass over the span tree."""
+    by_id = {s.span_id: s for s in spans}
+    children: dict[str, list[Span]] = {}
+    roots = []
+    for s in spans:
+        if s.parent_id and s.parent_id != s.span_id and s.parent_id in by_id:
+            children.setdefault(s.parent_id, []).append(s)
+        else:
+            roots.append(s)  # true root, orphan whose parent was not collected, or self-parented
+    _break_parent_cycles(spans, children, roots)
+    for kids in children.values():
+        kids.sort(key=lambda s: s.start_us)
+    roots.sort(key=lambda s: s.start_us)
+
+    trace_start = min(s.start_us for s in spans)
+    trace_end = max(s.end_us for s in spans)
+
+    # Self time: span duration not covered by any child (children merged as intervals).
+    self_us: dict[str, float] = {}
+    for s in spans:
+        covered, cur_start, cur_end = 0.0, None, None
+        for c in children.get(s.span_id, ()):
+            lo, hi = max(c.start_us, s.start_us), min(c.end_us, s.end_us)
+            if hi <= lo:
+                continue
+            if cur_end is None or lo > cur_end:
+                if cur_end is not None:
+                    covered += cur_end - cur_start
+                cur_start, cur_end = lo, hi
+            else:
+                cur_end = max(cur_end, hi)
+        if cur_end is not None:
+            covered += cur_end - cur_start
+        self_us[s.span_id] = max(s.duration_us - covered, 0.0)
+
+    # Critical path: from the longest root, repeatedly descend into the child that finishes last.
+    critical = []
+    on_path: set[int] = set()
+    node = max(roots, key=lambda s: s.end_us)
+    while node is not None:
+        on_path.add(id(node))
+        kids = children.get(node.span_id)
+        nxt = max(kids, key=lambda s: s.end_us) if kids else None
+        if nxt is not None and id(nxt) in on_path:
+            nxt = None  # duplicate span ids can still close a loop
+        contribution = node.duration_us - (nxt.duration_us if nxt else 0.0)
+        critical.append((node, max(contribution, 0.0)))
+        node = nxt
+
+    services: dict[str, dict] = {}
+    for s in spans:
+        svc = services.setdefault(s.service, {
+            "service": s.service, "spans": 0, "errors": 0, "selfMs": 0.0, "criticalPathMs": 0.0, "maxSpanMs": 0.0,
+        })
+        svc["spans"] += 1
+        svc["errors"] += s.error
+        svc["selfMs"] += self_us[s.span_id]
+        svc["maxSpanMs"] = max(svc["maxSpanMs"], s.duration_us)
+    for s, contribution in critical:
+        services[s.service]["criticalPathMs"] += contribution
+    for svc in services.values():
+        svc["selfMs"], svc["criticalPathMs"], svc["maxSpanMs"] = (
+            _ms(svc["selfMs"]), _ms(svc["criticalPathMs"]), _ms(svc["maxSpanMs"])
+        )
+
+    # Waterfall: depth-first in start order, capped so huge traces stay compact.
+    waterfall = []
+    shown: set[int] = set()
+    stack = [(r, 0) for r in reversed(roots)]
+    while stack and len(waterfall) < TRACE_WATERFALL_MAX_SPANS:
+        s, depth = stack.pop()
+        if id(s) in shown:
+            continue  # reached twice through a duplicate span id
+        shown.add(id(s))
+        waterfall.append({
+            "depth": depth,
+            "service": s.service,
+            "operation": s.operation,
+            "offsetMs": _ms(s.start_us - trace_start),
+            "durationMs": _ms(s.duration_us),
+            "selfMs": _ms(self_us[s.span_id]),
+            **({"error": True} if s.error else {}),
+        })
+        stack.extend((c, depth + 1) for c in reversed(children.get(s.span_id, ())))
+
+    root = roots[0]
+    return {
+        "status": "ok",
+        "traceId": trace_id,
+        "rootService": root.service,
+        "rootOperation": root.operation,
+        "durationMs": _ms(trace_end - trace_start),
+        "spanCount": len(spans),
+        "errorCount": sum(s.error for s in spans),
+        "services": sorted(services.values(), key=lambda v: v["criticalPathMs"], reverse=True),
+        "criticalPath": [
+            {"service": s.service, "operation": s.operation,
+             "durationMs": _ms(s.duration_us), "contributionMs": _ms(c)}
+            for s, c in critical
+        ],
+        "waterfall": waterfall,
+        "waterfallOmittedSpans": len(spans) - len(waterfall),
+    }
+
+
+# ---------- Tool entry point ----------
+
+async def get_trace_waterfall(
     trace_id: Optional[str] = None,
     service: Optional[str] = None,
     namespace: str = "bookinfo",
     since_minutes: int = 30,
 ) -> list[dict]:
-    """Retrieve distributed trace data.
+    """Analyze one trace by id, or the slowest recent traces through ``service``.
 
-    Currently returns a placeholder indicating no tracing backend is configured.
-    When Tempo or Jaeger is deployed, this can be connected to their APIs.
+    Without a service, Istio's ``productpage.<namespace>`` (the Bookinfo entry
+    point) is searched.
     """
-    return [{
-        "status": "not_configured",
-        "message": (
-            "Distributed tracing backend (Tempo/Jaeger) is not configured. "
-            "Use getMetricHistory and getK8sEvents for evidence gathering. "
-            "Trace data will be available when a tracing backend is deployed."
-        ),
-        "requested_trace_id": trace_id,
-        "requested_service": service,
-    }]
+    if TRACE_BACKEND not in ("tempo", "jaeger") or not TRACE_QUERY_URL:
+        return [{
+            "status": "not_configured",
+            "message": (
+                "Distributed tracing backend (Tempo/Jaeger) is not configured. "
+                "Use getMetricHistory and getK8sEvents for evidence gathering. "
+                "Trace data will be available when a tracing backend is deployed."
+            ),
+            "requested_trace_id": trace_id,
+            "requested_service": service,
+        }]
+
+    if trace_id:
+        trace_ids = [trace_id]
+    else:
+        service = service or f"productpage.{namespace}"
+        try:
+            found = await _search_traces(service, since_minutes)
+        except httpx.HTTPError as e:
+            log.warning(f"Trace search for {service} failed: {e}")
+            return [{"status": "error", "requested_service": service, "since_minutes": since_minutes,
+                     "error": str(e)}]
+        if not found:
+            return [{"status": "not_found", "requested_service": service, "since_minutes": since_minutes}]
+        trace_ids = [t for t, _ in found[:TRACE_MAX_TRACES]]
+
+    fetched = await asyncio.gather(*(_fetch_trace(t) for t in trace_ids), return_exceptions=True)
+    results = []
+    for tid, spans in zip(trace_ids, fetched):
+        if isinstance(spans, httpx.HTTPError):
+            log.warning(f"Failed to fetch trace {tid}: {spans}")
+            results.append({"status": "error", "traceId": tid, "error": str(spans)})
+        elif isinstance(spans, BaseException):
+            raise spans
+        elif spans is None:
+            results.append({"status": "not_found", "traceId": tid})
+        else:
+            results.append(analyze_trace(tid, spans))
+    return results
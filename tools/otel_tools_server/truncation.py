@@ -0,0 +1,181 @@
+"""Token-budget truncation for tool results.
+
+Tool payloads used to be cut with fixed slices (``[:20]`` series, ``[:50]``
+events, ``json.dumps(...)[:2000]``); the string slices in particular handed
+the model half a JSON document. ``fit_to_budget`` instead shrinks a payload
+structurally until its estimated token count fits:
+
+1. over-long strings (log lines, messages) are shortened with a marker;
+2. list items are dropped lowest-value first — flat metric series before
+   ones with a change point, Normal events before Warnings, plain log lines
+   before errors — always keeping at least one item per list and the
+   original order of what remains;
+3. what was elided is recorded under ``_truncated`` so the model knows the
+   data is partial and can narrow its next query.
+
+The result is always valid JSON. Tokens are estimated from the compact JSON
+length (``CHARS_PER_TOKEN``), which is close enough for budgeting without a
+tokenizer. Dependency-free so the harness scripts can import it directly.
+"""
+
+import copy
+import json
+import math
+import os
+import re
+from typing import Any, Optional
+
+TOOL_RESULT_TOKEN_BUDGET = int(os.environ.get("TOOL_RESULT_TOKEN_BUDGET", "4000"))
+CHARS_PER_TOKEN = float(os.environ.get("TRUNCATION_CHARS_PER_TOKEN", "4"))
+MAX_STRING_CHARS = 400
+MIN_STRING_CHARS = 60
+
+# Room left for the ``_truncated`` note itself.
+_NOTE_RESERVE_CHARS = 240
+_SHORTENED = re.compile(r"…\[\+(\d+) chars\]$")
+
+_LOG_SEVERITY = ("panic", "fatal", "exception", "error", "fail", "timeout", "refused", "oomkilled", "warn")
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+def estimate_tokens(obj: Any) -> int:
+    """Approximate token count of ``obj`` serialized as compact JSON."""
+    return math.ceil(len(_dumps(obj)) / CHARS_PER_TOKEN)
+
+
+def _item_value(item: Any) -> float:
+    """Relative diagnostic value of one list item (higher is kept longer)."""
+    if not isinstance(item, dict):
+        return 0.0
+    if item.get("status") == "error" or "error" in item:
+        return 3.0  # failures are evidence too, and are small
+    if "metric" in item:
+        # Summarized series: step changes and wide ranges first, flat lines last.
+        score = 0.0
+        change = item.get("change_point")
+        if change:
+            score += 1.0 + float(change.get("strength", 0))
+        lo, hi = item.get("min"), item.get("max")
+        if isinstance(lo, (int, float)) and isinstance(hi, (int, float)):
+            score += (hi - lo) / (abs(hi) + abs(lo) + 1e-9)
+        if item.get("first_crossing"):
+            score += 1.0
+        return score
+    if "reason" in item and "involved_object" in item:
+        score = 2.0 if item.get("type") == "Warning" else 0.0
+        return score + min(math.log1p(item.get("count") or 1), 3.0) / 3.0
+    if "log" in item:
+        line = str(item["log"]).lower()
+        return next((2.0 - i / len(_LOG_SEVERITY) for i, word in enumerate(_LOG_SEVERITY) if word in line), 0.0)
+    return 0.0
+
+
+def _shorten_strings(obj: Any, limit: int) -> int:
+    """Shorten strings longer than ``limit`` in place; returns how many were cut."""
+    cut = 0
+    items = obj.items() if isinstance(obj, dict) else enumerate(obj) if isinstance(obj, list) else ()
+    for key, value in items:
+        if isinstance(value, str) and len(value) > limit:
+            marker = _SHORTENED.search(value)
+            if marker:  # already shortened once: count from the original length
+                total = marker.start() + int(marker.group(1))
+                if marker.start() <= limit:
+                    continue
+            else:
+                total = len(value)
+            obj[key] = f"{value[:limit]}…[+{total - limit} chars]"
+            cut += 1
+        elif isinstance(value, (dict, list)):
+            cut += _shorten_strings(value, limit)
+    return cut
+
+
+def _collect_lists(obj: Any, path: str, out: list):
+    """Every list with more than one element, with its dotted path (parents before children)."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key != "_truncated":
+                _collect_lists(value, f"{path}.{key}" if path else key, out)
+    elif isinstance(obj, list):
+        if len(obj) > 1:
+            out.append((path or "$", obj))
+        for i, value in enumerate(obj):
+            _collect_lists(value, f"{path}[{i}]", out)
+
+
+def _drop_items(payload: Any, excess_chars: int, elided: dict):
+    """Greedily drop the lowest-value item of the largest list until ~excess_chars are freed."""
+    lists = []
+    _collect_lists(payload, "", lists)
+    state = []
+    for path, items in lists:
+        sizes = [len(_dumps(v)) + 1 for v in items]
+        # Drop order: lowest value first, later items first among equals.
+        order = sorted(range(len(items)), key=lambda i: (_item_value(items[i]), -i))
+        state.append({"path": path, "items": items, "sizes": sizes, "order": order,
+                      "remaining": sum(sizes), "dropped": set()})
+
+    while excess_chars > 0:
+        candidates = [s for s in state if len(s["items"]) - len(s["dropped"]) > 1]
+        if not candidates:
+            break
+        s = max(candidates, key=lambda s: s["remaining"])
+        i = s["order"][len(s["dropped"])]
+        s["dropped"].add(i)
+        s["remaining"] -= s["sizes"][i]
+        excess_chars -= s["sizes"][i]
+
+    # Rebuild children before parents so list identities stay valid while we mutate.
+    for s in reversed(state):
+        if s["dropped"]:
+            items = s["items"]
+            kept = [v for i, v in enumerate(items) if i not in s["dropped"]]
+            entry = elided.setdefault(s["path"], {"path": s["path"], "kept": 0, "dropped": 0})
+            entry["dropped"] += len(s["dropped"])
+            entry["kept"] = len(kept)
+            items[:] = kept
+
+
+def fit_to_budget(payload: Any, max_tokens: Optional[int] = None) -> Any:
+    """Return ``payload`` shrunk to about ``max_tokens`` tokens (a copy if anything changed).
+
+    ``max_tokens`` defaults to TOOL_RESULT_TOKEN_BUDGET; 0 or less disables
+    truncation. A top-level list is wrapped as ``{"items": [...]}`` when it
+    has to be annotated.
+    """
+    budget = TOOL_RESULT_TOKEN_BUDGET if max_tokens is None else max_tokens
+    original_tokens = estimate_tokens(payload)
+    if budget <= 0 or original_tokens <= budget:
+        return payload
+
+    result = copy.deepcopy(payload)
+    budget_chars = max(int(budget * CHARS_PER_TOKEN) - _NOTE_RESERVE_CHARS, 0)
+    strings_cut = _shorten_strings(result, MAX_STRING_CHARS)
+    elided: dict[str, dict] = {}
+
+    # Sizes overlap between nested lists, so re-measure and repeat a few times.
+    for _ in range(3):
+        excess = len(_dumps(result)) - budget_chars
+        if excess <= 0:
+            break
+        _drop_items(result, excess, elided)
+
+    # Still over (e.g. one huge item): keep halving the string limit.
+    limit = MAX_STRING_CHARS
+    while len(_dumps(result)) > budget_chars and limit > MIN_STRING_CHARS:
+        limit = max(limit // 2, MIN_STRING_CHARS)
+        strings_cut += _shorten_strings(result, limit)
+
+    note = {
+        "budget_tokens": budget,
+        "original_tokens": original_tokens,
+        "elided": list(elided.values()),
+        "strings_shortened": strings_cut,
+    }
+    if isinstance(result, dict):
+        result["_truncated"] = note
+        return result
+    return {"items": result, "_truncated": note}